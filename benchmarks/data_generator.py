@@ -0,0 +1,65 @@
+"""Synthetic cohort data shaped like data.csv, generated lazily for bulk loading"""
+import random
+from typing import Iterator, List, Tuple
+
+FIRST_NAMES = ["Emma", "Liam", "Olivia", "Noah", "Ava", "Elijah", "Sophia", "James",
+               "Isabella", "Lucas", "Mia", "Mason", "Amelia", "Ethan", "Harper", "Logan"]
+LAST_NAMES = ["Johnson", "Smith", "Brown", "Davis", "Wilson", "Taylor", "Anderson", "Thomas",
+              "Moore", "Martin", "Clark", "Lewis", "Walker", "Hall", "Young", "King"]
+NOTES = ["", "", "", "Feeling good", "Exams coming up", "Project deadline", "Well rested",
+         "Very stressed", "Recovering"]
+
+
+class CohortGenerator:
+    """Deterministic generator of students, attendance, surveys and coursework
+
+    Each student gets a baseline stress level; sleep falls and absences rise as
+    stress goes up, similar to the relationships in data.csv.
+    """
+
+    def __init__(self, students: int, weeks: int = 12, modules: int = 4, seed: int = 42):
+        self.students = students
+        self.weeks = weeks
+        self.module_codes = [f"CS{101 + i}" for i in range(modules)]
+        self.seed = seed
+
+    def student_rows(self) -> Iterator[Tuple[str, str]]:
+        rng = random.Random(self.seed)
+        for i in range(self.students):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            yield f"{first} {last}", f"{first.lower()}.{last.lower()}.{i}@university.com"
+
+    def _baseline(self, student_id: int) -> float:
+        return random.Random(self.seed * 1_000_003 + student_id).uniform(1.5, 4.5)
+
+    def attendance_rows(self, student_ids: List[int]) -> Iterator[Tuple]:
+        rng = random.Random(self.seed + 1)
+        for student_id in student_ids:
+            absence_rate = 0.05 + (self._baseline(student_id) - 1.5) * 0.08
+            for week in range(1, self.weeks + 1):
+                for module_code in self.module_codes:
+                    yield (student_id, week, module_code,
+                           "Absent" if rng.random() < absence_rate else "Present")
+
+    def survey_rows(self, student_ids: List[int]) -> Iterator[Tuple]:
+        rng = random.Random(self.seed + 2)
+        for student_id in student_ids:
+            baseline = self._baseline(student_id)
+            for week in range(1, self.weeks + 1):
+                stress = min(5, max(1, round(baseline + rng.gauss(0, 0.8))))
+                sleep = round(min(10.0, max(3.0, 9.5 - stress * 0.8 + rng.gauss(0, 0.6))), 1)
+                yield student_id, week, stress, sleep, rng.choice(NOTES)
+
+    def coursework_rows(self, student_ids: List[int], assignments_per_module: int = 2) -> Iterator[Tuple]:
+        rng = random.Random(self.seed + 3)
+        for student_id in student_ids:
+            baseline = self._baseline(student_id)
+            for module_code in self.module_codes:
+                for n in range(1, assignments_per_module + 1):
+                    roll = rng.random()
+                    if roll < 0.05:
+                        yield student_id, module_code, f"Assignment {n}", None, "Missing", None
+                        continue
+                    status = "Late" if roll < 0.15 else "Submitted"
+                    grade = round(min(100.0, max(0.0, rng.gauss(80 - baseline * 6, 10))), 1)
+                    yield student_id, module_code, f"Assignment {n}", f"2025-0{n + 1}-15", status, grade
@@ -0,0 +1,222 @@
+"""Benchmark ingest, analytics and export throughput at scale
+
+Usage:
+    python benchmarks/run_benchmarks.py --preset medium --output bench.json
+
+Results are written as JSON so runs on different commits can be diffed.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+# Add src to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'src'))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from data_generator import FIRST_NAMES, LAST_NAMES, CohortGenerator
+from database.db_handler import DatabaseHandler
+from services.analytics_service import AnalyticsService
+from services.export_service import ExportService, pa
+
+# Student counts for the named scales (weeks and modules come from the CLI)
+PRESETS = {'small': 1_000, 'medium': 10_000, 'large': 100_000, 'huge': 1_000_000}
+
+
+class BenchmarkRunner:
+    def __init__(self, track_memory: bool = True):
+        self.track_memory = track_memory
+        self.results = []
+
+    def measure(self, name: str, func, rows: int = None):
+        """Time a single call of func, recording peak Python heap if enabled"""
+        if self.track_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        value = func()
+        seconds = time.perf_counter() - started
+        peak = None
+        if self.track_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        if rows is None and isinstance(value, int) and value >= 0:
+            rows = value
+        result = {'name': name, 'seconds': round(seconds, 6), 'peak_python_bytes': peak}
+        if rows is not None:
+            result['rows'] = rows
+            result['rows_per_second'] = round(rows / seconds, 1) if seconds > 0 else None
+        self.results.append(result)
+        print(f"  {name:<45} {seconds:>9.3f}s" + (f"  {rows:>10} rows" if rows is not None else ""))
+        return value
+
+    def measure_latency(self, name: str, func, arguments: list):
+        """Call func once per argument and record latency percentiles"""
+        latencies = []
+        for argument in arguments:
+            started = time.perf_counter()
+            func(argument)
+            latencies.append(time.perf_counter() - started)
+        latencies.sort()
+        result = {
+            'name': name,
+            'calls': len(latencies),
+            'p50_ms': round(statistics.median(latencies) * 1000, 4),
+            'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 4),
+            'max_ms': round(latencies[-1] * 1000, 4),
+            'seconds': round(sum(latencies), 6),
+        }
+        self.results.append(result)
+        print(f"  {name:<45} p50 {result['p50_ms']:.3f}ms  p95 {result['p95_ms']:.3f}ms")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(students: int, weeks: int, modules: int, samples: int, workdir: str,
+        track_memory: bool = True) -> dict:
+    # Some service methods write their output to the working directory
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        return _run(students, weeks, modules, samples, workdir, track_memory)
+    finally:
+        os.chdir(previous_cwd)
+
+
+def _run(students: int, weeks: int, modules: int, samples: int, workdir: str,
+         track_memory: bool) -> dict:
+    generator = CohortGenerator(students, weeks, modules)
+    runner = BenchmarkRunner(track_memory)
+    db_path = os.path.join(workdir, "benchmark.db")
+
+    print(f"\n📦 Ingest ({students} students x {weeks} weeks x {modules} modules)")
+    db = DatabaseHandler(db_path)
+    student_ids = runner.measure("ingest.bulk_add_students",
+                                 lambda: db.bulk_add_students(generator.student_rows()), students)
+    runner.measure("ingest.bulk_record_attendance",
+                   lambda: db.bulk_record_attendance(generator.attendance_rows(student_ids)))
+    runner.measure("ingest.bulk_add_surveys",
+                   lambda: db.bulk_add_surveys(generator.survey_rows(student_ids)))
+    runner.measure("ingest.bulk_add_coursework",
+                   lambda: db.bulk_add_coursework(generator.coursework_rows(student_ids)))
+
+    print("\n🔎 Search")
+    runner.measure("search.refresh_search_index", db.refresh_search_index)
+    terms = [name[:length] for name in FIRST_NAMES + LAST_NAMES for length in (1, 3)]
+    runner.measure_latency("search.search_students.prefix",
+                           lambda term: db.search_students(term, limit=20), terms)
+
+    print("\n📊 Analytics")
+    analytics = AnalyticsService(db_path)
+    sample = random.Random(7).sample(student_ids, min(samples, len(student_ids)))
+    analytics._cache.clear()
+    runner.measure_latency("analytics.get_student_performance_summary.cold",
+                           analytics.get_student_performance_summary, sample)
+    runner.measure_latency("analytics.get_student_performance_summary.warm",
+                           analytics.get_student_performance_summary, sample)
+    runner.measure_latency("analytics.get_stress_trends.cold", analytics.get_stress_trends, sample)
+    runner.measure_latency("analytics.identify_high_stress_weeks.cold",
+                           analytics.identify_high_stress_weeks, sample)
+    runner.measure("analytics.get_cohort_summary", lambda: len(analytics.get_cohort_summary()))
+    runner.measure("analytics.get_cohort_summary.module",
+                   lambda: len(analytics.get_cohort_summary(module_code=generator.module_codes[0])))
+
+    print("\n📤 Export")
+    export = ExportService(db_path)
+    out = os.path.join(workdir, "exports")
+    os.makedirs(out, exist_ok=True)
+    total_attendance = students * weeks * modules
+    total_surveys = students * weeks
+    runner.measure("export.export_students_to_csv",
+                   lambda: export.export_students_to_csv(os.path.join(out, "students.csv")), students)
+    runner.measure("export.export_attendance_report",
+                   lambda: export.export_attendance_report(os.path.join(out, "attendance.csv")), students)
+    runner.measure("export.export_wellbeing_data",
+                   lambda: export.export_wellbeing_data(os.path.join(out, "wellbeing.csv")), total_surveys)
+    runner.measure("export.export_wellbeing_data.gzip",
+                   lambda: export.export_wellbeing_data(os.path.join(out, "wellbeing.csv.gz"), compress=True),
+                   total_surveys)
+    runner.measure("export.export_high_stress_report",
+                   lambda: export.export_high_stress_report(4, os.path.join(out, "high_stress.csv")))
+    runner.measure("export.stream_csv.wellbeing_data",
+                   lambda: sum(1 for _ in export.stream_csv('wellbeing_data')), total_surveys)
+    runner.measure("export.generate_comprehensive_report", export.generate_comprehensive_report)
+    if pa is not None:
+        runner.measure("export.export_attendance_to_parquet",
+                       lambda: export.export_attendance_to_parquet(os.path.join(out, "attendance_parquet")),
+                       total_attendance)
+        runner.measure("export.import_attendance_from_parquet",
+                       lambda: len(export.import_attendance_from_parquet(os.path.join(out, "attendance_parquet"))))
+
+    export.close()
+    analytics.close()
+    db.close()
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'students': students,
+            'weeks': weeks,
+            'modules': modules,
+            'latency_samples': len(sample),
+            'memory_tracked': track_memory,
+            'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'database_bytes': os.path.getsize(db_path),
+        },
+        'results': runner.results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--preset', choices=sorted(PRESETS, key=PRESETS.get), default='small')
+    parser.add_argument('--students', type=int, help="overrides the preset's student count")
+    parser.add_argument('--weeks', type=int, default=12)
+    parser.add_argument('--modules', type=int, default=4)
+    parser.add_argument('--samples', type=int, default=200, help="students timed per latency benchmark")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="skip tracemalloc (its bookkeeping slows allocation-heavy paths)")
+    parser.add_argument('--workdir', help="keep the generated database and exports here")
+    parser.add_argument('--output', help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    students = args.students or PRESETS[args.preset]
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        report = run(students, args.weeks, args.modules, args.samples, args.workdir, not args.no_memory)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            report = run(students, args.weeks, args.modules, args.samples, workdir, not args.no_memory)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"\n✅ Benchmark results written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Import CSV files shaped like data.csv into the wellbeing database
+
+Usage:
+    python import_data.py data.csv [more.csv ...] --db student_wellbeing.db --rejects rejects.csv
+    python import_data.py --staff staff.csv
+
+Files are streamed in chunks and upserted, so re-running an import or appending
+new weeks is safe. Invalid rows are reported and skipped.
+"""
+import argparse
+import logging
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from database.db_handler import DatabaseHandler
+from services.auth_service import AuthService
+from services.import_service import DEFAULT_CHUNK_SIZE, DEFAULT_MODULE_CODE, ImportService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('csv_files', nargs='*')
+    parser.add_argument('--db', default="student_wellbeing.db")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--module', default=DEFAULT_MODULE_CODE,
+                        help="module code recorded for attendance and coursework rows")
+    parser.add_argument('--rejects', help="write every rejected row, with its reason, to this CSV")
+    parser.add_argument('--recorded-on', metavar='YYYY-MM-DD',
+                        help="date for new attendance and survey rows (default today), e.g. for a past term")
+    parser.add_argument('--staff', help="create login accounts from a staff CSV such as staff.csv")
+    args = parser.parse_args()
+    if not args.csv_files and not args.staff:
+        parser.error("give at least one data CSV or --staff")
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    # Creates the tables and applies migrations on first use
+    db = DatabaseHandler(args.db)
+    importer = ImportService(args.db, args.chunk_size)
+    try:
+        for csv_file in args.csv_files:
+            rejects = args.rejects
+            if rejects and len(args.csv_files) > 1:
+                root, ext = os.path.splitext(rejects)
+                rejects = f"{root}_{os.path.splitext(os.path.basename(csv_file))[0]}{ext}"
+            report = importer.import_csv(csv_file, args.module, rejects, args.recorded_on)
+
+            print(f"\n📥 {csv_file}: {report['rows_loaded']}/{report['rows_read']} rows loaded "
+                  f"in {report['seconds']:.2f}s")
+            print(f"   Students: {report['students_created']} new, {report['students_updated']} updated")
+            for table in ('attendance', 'surveys', 'coursework'):
+                print(f"   {table.capitalize()}: {report[f'{table}_inserted']} new, "
+                      f"{report[f'{table}_updated']} updated")
+            if report['rows_rejected']:
+                print(f"   ⚠️  {report['rows_rejected']} rows rejected")
+                for reject in report['rejects'][:10]:
+                    print(f"     line {reject['line']}: {reject['reason']}")
+                if rejects:
+                    print(f"   All rejected rows written to {rejects}")
+        # Index the imported students now rather than on the first search
+        db.refresh_search_index()
+
+        if args.staff:
+            auth = AuthService(args.db)
+            try:
+                counts = auth.import_staff(args.staff)
+            finally:
+                auth.close()
+            print(f"\n👤 {args.staff}: {counts['created']} accounts created, {counts['updated']} updated, "
+                  f"{counts['skipped']} skipped")
+    finally:
+        importer.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
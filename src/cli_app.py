@@ -1,7 +1,11 @@
+import logging
+
 from cli_interface import CLIInterface
 
 def main():
     """CLI Application Entry Point"""
+    # Service status messages go through logging; show them like the old prints
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     try:
         cli = CLIInterface()
         cli.run()
@@ -1,6 +1,9 @@
 from database.db_handler import DatabaseHandler
 from services.analytics_service import AnalyticsService
 
+# Rows shown per page when listing or searching students
+PAGE_SIZE = 20
+
 class CLIInterface:
     def __init__(self):
         self.db = DatabaseHandler()
@@ -34,9 +37,15 @@ class CLIInterface:
             student_id = self.db.add_student(name, email)
             print(f"✅ Student added with ID: {student_id}")
         elif choice == "2":
-            students = self.db.get_all_students()
-            for student in students:
-                print(f"ID: {student['student_id']}, Name: {student['name']}")
+            after_id = 0
+            while True:
+                # One extra row tells whether another page exists
+                students = self.db.get_students_page(after_id, PAGE_SIZE + 1)
+                for student in students[:PAGE_SIZE]:
+                    print(f"ID: {student['student_id']}, Name: {student['name']}")
+                if len(students) <= PAGE_SIZE or input("Show more? (y/n): ").strip().lower() != "y":
+                    break
+                after_id = students[PAGE_SIZE - 1]['student_id']
     
     def analytics_menu(self):
         """Simple analytics menu"""
@@ -46,15 +55,23 @@ class CLIInterface:
     def search_menu(self):
         """Simple search"""
         search_term = input("Enter search term: ")
-        results = self.db.search_students(search_term)
-        for student in results:
-            print(f"ID: {student['student_id']}, Name: {student['name']}")
+        offset = 0
+        while True:
+            results = self.db.search_students(search_term, limit=PAGE_SIZE + 1, offset=offset)
+            for student in results[:PAGE_SIZE]:
+                print(f"ID: {student['student_id']}, Name: {student['name']}")
+            if not results:
+                print("No matching students")
+            if len(results) <= PAGE_SIZE or input("Show more? (y/n): ").strip().lower() != "y":
+                break
+            offset += PAGE_SIZE
     
     def export_menu(self):
         """Simple export menu"""
         from services.export_service import ExportService
         export = ExportService()
         export.export_students_to_csv()
+        export.close()
         print("✅ Students exported to CSV")
     
     def authentication_menu(self):
@@ -67,6 +84,7 @@ class CLIInterface:
             print(f"✅ Welcome {auth.current_user['full_name']}!")
         else:
             print("❌ Login failed")
+        auth.close()
     
     def run(self):
         """Main application loop"""
@@ -0,0 +1,161 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from .db_handler import DEFAULT_CHUNK_SIZE, DEFAULT_PAGE_SIZE, DatabaseHandler
+
+class AsyncDatabaseHandler:
+    """Awaitable wrapper around DatabaseHandler for async front ends
+
+    Reads run on a small pool of worker threads. Each thread gets its own pooled
+    WAL connection, so lookups proceed concurrently and are not held up by a
+    long-running read elsewhere. Writes go through a single writer thread and
+    are therefore serialised in submission order.
+
+    Because every worker thread opens its own connection, db_path must be a
+    file: each connection to ':memory:' would see a separate, empty database.
+    """
+
+    def __init__(self, db_path: str = "student_wellbeing.db", read_workers: int = 4):
+        if db_path == ":memory:":
+            raise ValueError("AsyncDatabaseHandler needs a database file; "
+                             "':memory:' would give every worker thread its own empty database")
+        self.db_path = db_path
+        self._db = DatabaseHandler(db_path)
+        self._readers = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix="db-read")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-write")
+
+    async def _read(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, partial(func, *args, **kwargs))
+
+    async def _write(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, partial(func, *args, **kwargs))
+
+    def close(self):
+        """Wait for queued work to finish, then release the database connection"""
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        self._db.close()
+
+    async def _iter_pages(self, fetch_page, key: str, after_id: int, limit: Optional[int],
+                          page_size: int) -> AsyncIterator[Dict]:
+        """Async counterpart of DatabaseHandler._iter_pages, one reader call per page"""
+        if page_size < 1:
+            raise ValueError(f"page_size must be a positive integer, got {page_size}")
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            page = await self._read(fetch_page, after_id, size)
+            for row in page:
+                yield row
+            if len(page) < size:
+                return
+            after_id = page[-1][key]
+            if remaining is not None:
+                remaining -= len(page)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # Shutting down blocks until in-flight work completes; keep the loop free
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    # Student operations
+    async def add_student(self, name: str, email: str) -> int:
+        return await self._write(self._db.add_student, name, email)
+
+    async def get_all_students(self) -> List[Dict]:
+        return await self._read(self._db.get_all_students)
+
+    async def get_students_page(self, after_id: int = 0, limit: int = DEFAULT_PAGE_SIZE) -> List[Dict]:
+        return await self._read(self._db.get_students_page, after_id, limit)
+
+    def iter_students(self, after_id: int = 0, limit: Optional[int] = None,
+                      page_size: int = DEFAULT_PAGE_SIZE) -> AsyncIterator[Dict]:
+        return self._iter_pages(self._db.get_students_page, 'student_id', after_id, limit, page_size)
+
+    async def get_student_by_id(self, student_id: int) -> Optional[Dict]:
+        return await self._read(self._db.get_student_by_id, student_id)
+
+    async def search_students(self, search_term: str, limit: Optional[int] = None,
+                              offset: int = 0) -> List[Dict]:
+        # Not a pure read: it first brings the FTS index up to date, so it queues with the writes
+        return await self._write(self._db.search_students, search_term, limit, offset)
+
+    async def update_student(self, student_id: int, name: str = None, email: str = None) -> bool:
+        return await self._write(self._db.update_student, student_id, name, email)
+
+    async def delete_student(self, student_id: int) -> bool:
+        return await self._write(self._db.delete_student, student_id)
+
+    async def bulk_add_students(self, students: Iterable,
+                                chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[int]:
+        return await self._write(self._db.bulk_add_students, students, chunk_size)
+
+    # Attendance operations
+    async def record_attendance(self, student_id: int, week_number: int,
+                                module_code: str, status: str) -> int:
+        return await self._write(self._db.record_attendance, student_id, week_number, module_code, status)
+
+    async def get_attendance_by_student(self, student_id: int) -> List[Dict]:
+        return await self._read(self._db.get_attendance_by_student, student_id)
+
+    async def get_all_attendance(self) -> List[Dict]:
+        return await self._read(self._db.get_all_attendance)
+
+    async def get_attendance_page(self, after_id: int = 0, limit: int = DEFAULT_PAGE_SIZE,
+                                  student_id: Optional[int] = None) -> List[Dict]:
+        return await self._read(self._db.get_attendance_page, after_id, limit, student_id)
+
+    def iter_attendance(self, after_id: int = 0, limit: Optional[int] = None,
+                        student_id: Optional[int] = None,
+                        page_size: int = DEFAULT_PAGE_SIZE) -> AsyncIterator[Dict]:
+        return self._iter_pages(partial(self._db.get_attendance_page, student_id=student_id),
+                                'attendance_id', after_id, limit, page_size)
+
+    async def update_attendance(self, attendance_id: int, status: str = None) -> bool:
+        return await self._write(self._db.update_attendance, attendance_id, status)
+
+    async def delete_attendance(self, attendance_id: int) -> bool:
+        return await self._write(self._db.delete_attendance, attendance_id)
+
+    async def bulk_record_attendance(self, records: Iterable,
+                                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        return await self._write(self._db.bulk_record_attendance, records, chunk_size)
+
+    # Wellbeing survey operations
+    async def add_wellbeing_survey(self, student_id: int, week_number: int, stress_level: int,
+                                   hours_slept: float, additional_notes: str = "") -> int:
+        return await self._write(self._db.add_wellbeing_survey, student_id, week_number,
+                                 stress_level, hours_slept, additional_notes)
+
+    async def get_surveys_by_student(self, student_id: int) -> List[Dict]:
+        return await self._read(self._db.get_surveys_by_student, student_id)
+
+    async def get_surveys_page(self, after_id: int = 0, limit: int = DEFAULT_PAGE_SIZE,
+                               student_id: Optional[int] = None) -> List[Dict]:
+        return await self._read(self._db.get_surveys_page, after_id, limit, student_id)
+
+    async def delete_wellbeing_survey(self, survey_id: int) -> bool:
+        return await self._write(self._db.delete_wellbeing_survey, survey_id)
+
+    async def bulk_add_surveys(self, surveys: Iterable,
+                               chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        return await self._write(self._db.bulk_add_surveys, surveys, chunk_size)
+
+    # Coursework operations
+    async def add_coursework(self, student_id: int, module_code: str, assignment_name: str,
+                             submission_date: str, status: str, grade: float = None) -> int:
+        return await self._write(self._db.add_coursework, student_id, module_code, assignment_name,
+                                 submission_date, status, grade)
+
+    async def get_coursework_by_student(self, student_id: int) -> List[Dict]:
+        return await self._read(self._db.get_coursework_by_student, student_id)
+
+    async def bulk_add_coursework(self, coursework: Iterable,
+                                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        return await self._write(self._db.bulk_add_coursework, coursework, chunk_size)
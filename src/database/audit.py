@@ -0,0 +1,273 @@
+import atexit
+import functools
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .connection_pool import get_pool
+from .migrations import AUDIT_LOG_STEPS, AUDIT_TABLE
+from models.ActionType import ActionType
+from models.AuditLog import AuditLog
+from utils.instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+# Entries waiting to be written; producers block (never drop) when it is full
+DEFAULT_QUEUE_SIZE = 10000
+
+# Most entries written per transaction
+DEFAULT_AUDIT_BATCH_SIZE = 500
+
+# Seconds atexit waits for pending entries to be written
+SHUTDOWN_TIMEOUT = 10.0
+
+# Recorded as the user when nobody has signed in (imports, scripts)
+SYSTEM_ACTOR = "system"
+
+_actor: ContextVar[str] = ContextVar("audit_actor", default=SYSTEM_ACTOR)
+
+_STOP = object()
+
+
+def current_actor() -> str:
+    """User that audit entries recorded in this context are attributed to"""
+    return _actor.get()
+
+
+def set_actor(user_id: Optional[str]):
+    """Attribute this context's audit entries to user_id (None for SYSTEM_ACTOR)"""
+    return _actor.set(SYSTEM_ACTOR if user_id is None else str(user_id))
+
+
+@contextmanager
+def acting_as(user_id: str) -> Iterator[None]:
+    """Attribute audit entries recorded inside the with-block to user_id
+
+    For servers handling several signed-in users, e.g. around each request.
+    """
+    token = set_actor(user_id)
+    try:
+        yield
+    finally:
+        _actor.reset(token)
+
+
+def audited_view(entity_type: str):
+    """Record a VIEW of entity_type on every call of a method taking student_id first
+
+    Applied outside cached_per_student, so answers served from the result
+    cache are audited as well. The instance needs an _audit writer.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, student_id, *args, **kwargs):
+            result = func(self, student_id, *args, **kwargs)
+            self._audit.record(ActionType.VIEW, entity_type, student_id)
+            return result
+        return wrapper
+    return decorator
+
+
+class AuditWriter:
+    """Append-only audit trail written by a background thread
+
+    record() only stamps the entry and puts it on a bounded queue, so
+    auditing a lookup or export adds no commit to the caller's latency.
+    A writer thread drains the queue and inserts everything that has
+    accumulated in one transaction (up to batch_size entries), so a burst
+    of events costs one commit instead of one each. When the queue is full
+    record() blocks until there is room rather than losing entries.
+    flush() waits for every queued entry to be written; all writers are
+    flushed and stopped at interpreter exit.
+    """
+
+    def __init__(self, db_path: str, max_queue: int = DEFAULT_QUEUE_SIZE,
+                 batch_size: int = DEFAULT_AUDIT_BATCH_SIZE):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self._pool = get_pool(db_path)
+        self._queue: "queue.Queue" = queue.Queue(max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._table_ready = False
+        self.written = 0
+        self.failed = 0
+        self.waits = 0
+
+    # Producer side
+    def record(self, action: ActionType, entity_type: str, entity_id, details: str = "",
+               user_id: Optional[str] = None):
+        """Queue an audit entry, attributed to user_id or else the current actor"""
+        entry = (current_actor() if user_id is None else str(user_id), entity_type,
+                 "" if entity_id is None else str(entity_id), ActionType(action).value,
+                 datetime.now(timezone.utc).isoformat(sep=' ', timespec='milliseconds'), details)
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.waits += 1
+            self._queue.put(entry)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every entry queued so far has been written (False on timeout)"""
+        if self._thread is None:
+            return True
+        if timeout is None:
+            self._queue.join()
+            return True
+        done = threading.Event()
+
+        def wait():
+            self._queue.join()
+            done.set()
+
+        threading.Thread(target=wait, daemon=True).start()
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Write what is queued and stop the writer thread (record() restarts it)"""
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    # Writer thread
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"audit-writer:{self.db_path}",
+                                                daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            # Block for one entry, then take whatever else is already waiting
+            batch = []
+            entry = self._queue.get()
+            while True:
+                if entry is _STOP:
+                    stop = True
+                    break
+                batch.append(entry)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                if batch:
+                    self._write(batch)
+            except Exception:
+                # Keep the thread alive: flush() waits on it for every entry
+                self.failed += len(batch)
+                logger.exception("❌ Unexpected error writing %s audit log entries", len(batch))
+            finally:
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+
+    def _ensure_table(self, conn: sqlite3.Connection):
+        if not self._table_ready:
+            for statement in AUDIT_LOG_STEPS:
+                conn.execute(statement)
+            conn.commit()
+            self._table_ready = True
+
+    def _write(self, batch: List[Tuple]):
+        try:
+            # A lease per batch: the pool is only kept open while services use it
+            with self._pool.lease() as conn:
+                self._ensure_table(conn)
+                conn.executemany(
+                    f"INSERT INTO {AUDIT_TABLE} (user_id, entity_type, entity_id, action_type, timestamp, details) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", batch
+                )
+                conn.commit()
+            self.written += len(batch)
+        except sqlite3.Error as e:
+            self.failed += len(batch)
+            logger.error("❌ Error writing %s audit log entries: %s", len(batch), e)
+
+    # Reading
+    def entries(self, entity_type: Optional[str] = None, entity_id=None,
+                user_id: Optional[str] = None, action: Optional[ActionType] = None,
+                limit: int = 100) -> List[AuditLog]:
+        """Most recent entries first, optionally filtered; flushes the queue first"""
+        self.flush()
+        filters, params = [], []
+        for column, value in (('entity_type', entity_type), ('entity_id', entity_id),
+                              ('user_id', user_id), ('action_type', action)):
+            if value is not None:
+                filters.append(f"{column} = ?")
+                params.append(ActionType(value).value if column == 'action_type' else str(value))
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+        try:
+            with self._pool.lease() as conn:
+                self._ensure_table(conn)
+                rows = conn.execute(
+                    f"SELECT log_id, user_id, entity_type, entity_id, action_type, timestamp, details "
+                    f"FROM {AUDIT_TABLE} {where} ORDER BY log_id DESC LIMIT ?", params + [limit]
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.error("❌ Error reading audit log: %s", e)
+            return []
+        return [AuditLog(row[0], row[1], row[2], row[3], row[4],
+                         datetime.fromisoformat(row[5]), row[6]) for row in rows]
+
+
+_writers: Dict[str, AuditWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_audit_writer(db_path: str) -> AuditWriter:
+    """Return the process-wide audit writer for db_path
+
+    Shared like the connection pool, so every service auditing a database
+    feeds the same queue and writer thread.
+    """
+    if db_path == ":memory:":
+        return AuditWriter(db_path)
+
+    key = os.path.abspath(db_path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = AuditWriter(db_path)
+        return writer
+
+
+@atexit.register
+def _close_writers():
+    """Write every queued entry before the interpreter exits"""
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.close(SHUTDOWN_TIMEOUT)
+
+
+def _audit_gauges() -> List[Tuple[str, Dict, float]]:
+    with _writers_lock:
+        writers = list(_writers.items())
+    gauges = []
+    for db_path, writer in writers:
+        gauges.append(("audit_queue_depth", {'database': db_path}, writer.pending()))
+        gauges.append(("audit_entries_written", {'database': db_path}, writer.written))
+        gauges.append(("audit_entries_failed", {'database': db_path}, writer.failed))
+        gauges.append(("audit_producer_waits", {'database': db_path}, writer.waits))
+    return gauges
+
+
+metrics.register_collector(_audit_gauges)
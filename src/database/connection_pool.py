@@ -0,0 +1,146 @@
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from utils.instrumentation import InstrumentedConnection
+
+# Applied to every pooled connection when it is opened
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',        # readers no longer block the writer (and vice versa)
+    'synchronous': 'NORMAL',      # safe with WAL, one fsync per checkpoint instead of per commit
+    'cache_size': -64000,         # negative = KiB, i.e. ~64 MB page cache per connection
+    'mmap_size': 268435456,       # 256 MB memory-mapped I/O
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,         # ms to wait for a competing writer before SQLITE_BUSY
+}
+
+# Prepared statements kept per connection by the sqlite3 module (its default is 128)
+STATEMENT_CACHE_SIZE = 512
+
+
+class _ThreadToken:
+    """Stored in a pool's thread-local; collected, and so finalized, when its thread exits"""
+
+
+class ConnectionPool:
+    """Hands out one tuned sqlite3 connection per thread for a single database file
+
+    Services take a lease with acquire()/release() for as long as they live and
+    call connection() whenever they need to talk to the database, so each thread
+    transparently gets (and keeps reusing) its own connection. A thread's
+    connection is closed when that thread exits, so short-lived worker threads
+    do not leave connections behind. When the last lease is released every
+    connection the pool opened is closed.
+    """
+
+    def __init__(self, db_path: str, pragmas: Optional[Dict] = None,
+                 cached_statements: int = STATEMENT_CACHE_SIZE):
+        self.db_path = db_path
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        # Reentrant: a thread's connection may be finalized by garbage collection
+        # that happens to run while this thread already holds the lock
+        self._lock = threading.RLock()
+        self._connections = []
+        self._leases = 0
+
+    def _open(self) -> sqlite3.Connection:
+        # check_same_thread is off so close_all() can run from any thread; each
+        # connection is still only handed to the thread that opened it
+        conn = sqlite3.connect(self.db_path, cached_statements=self.cached_statements,
+                               check_same_thread=False, factory=InstrumentedConnection)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            conn = self._open()
+            token = _ThreadToken()
+            # Not at interpreter exit: daemon threads (the audit writer) may still be using theirs
+            weakref.finalize(token, self._close_thread_connection, conn).atexit = False
+            self._local.connection, self._local.token = conn, token
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _close_thread_connection(self, conn: sqlite3.Connection):
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+
+    def acquire(self) -> sqlite3.Connection:
+        """Register a long-lived user of the pool and return this thread's connection"""
+        conn = self.connection()
+        with self._lock:
+            self._leases += 1
+        return conn
+
+    def release(self):
+        """Drop a lease; the last release closes every pooled connection"""
+        with self._lock:
+            self._leases = max(self._leases - 1, 0)
+            if self._leases:
+                return
+        self.close_all()
+
+    @contextmanager
+    def lease(self) -> Iterator[sqlite3.Connection]:
+        """Hold a lease for the duration of a with-block"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release()
+
+    def close_all(self):
+        """Close all connections opened by this pool"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """Return the process-wide pool for db_path, creating it if necessary
+
+    In-memory databases are private to each connection, so every call for
+    ':memory:' gets its own pool rather than a shared one.
+    """
+    if db_path == ":memory:":
+        return ConnectionPool(db_path)
+
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path)
+        return pool
+
+
+def open_read_only(db_path: str) -> sqlite3.Connection:
+    """Open a private read-only connection, e.g. one per worker process
+
+    Connections must not cross process boundaries, so batch workers open their
+    own instead of drawing from the pool. mode=ro guarantees they never write.
+    """
+    conn = sqlite3.connect(f"{Path(db_path).absolute().as_uri()}?mode=ro", uri=True,
+                           cached_statements=STATEMENT_CACHE_SIZE, factory=InstrumentedConnection)
+    conn.row_factory = sqlite3.Row
+    for name in ('cache_size', 'mmap_size', 'temp_store'):
+        conn.execute(f"PRAGMA {name} = {DEFAULT_PRAGMAS[name]}")
+    return conn
@@ -1,23 +1,89 @@
+import json
+import logging
 import sqlite3
 import os
-from typing import List, Dict, Optional
+import re
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
 
+from .audit import get_audit_writer
+from .connection_pool import get_pool
+from .listeners import WriteListener, get_listeners
+from .migrations import SEARCH_DIRTY_TABLE, SEARCH_TABLE, apply_migrations, get_schema_version
+from .result_cache import get_result_cache
+from models.ActionType import ActionType
+from models.RecordBatch import RecordBatch
+from utils.instrumentation import instrument_class
+
+logger = logging.getLogger(__name__)
+
+# Default number of rows sent to executemany() per round trip in bulk loads
+DEFAULT_CHUNK_SIZE = 1000
+
+# Rows fetched per keyset page by the iter_* generators
+DEFAULT_PAGE_SIZE = 500
+
+# bm25 weights for the name, email and notes columns of the search index
+SEARCH_WEIGHTS = (10.0, 5.0, 1.0)
+
+_SEARCH_TOKEN = re.compile(r"\w+")
+
+
+def _prefix_query(search_term: str) -> Optional[str]:
+    """FTS5 query matching every word of search_term as a prefix (None if it has no words)"""
+    tokens = _SEARCH_TOKEN.findall(search_term)
+    return " ".join(f'"{token}"*' for token in tokens) if tokens else None
+
+
+def _iter_chunks(rows: Iterable, columns: Sequence[str], defaults: Dict,
+                 chunk_size: int) -> Iterator[List[tuple]]:
+    """Normalise rows (tuples or dicts) into parameter tuples, chunk_size at a time"""
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be a positive integer, got {chunk_size}")
+
+    iterator = iter(rows)
+    while True:
+        chunk = []
+        for row in islice(iterator, chunk_size):
+            if isinstance(row, dict):
+                chunk.append(tuple(
+                    row.get(column, defaults[column]) if column in defaults else row[column]
+                    for column in columns
+                ))
+            else:
+                values = tuple(row)
+                chunk.append(values + tuple(defaults[column] for column in columns[len(values):]))
+        if not chunk:
+            return
+        yield chunk
+
+@instrument_class
 class DatabaseHandler:
     def __init__(self, db_path: str = "student_wellbeing.db"):
         self.db_path = db_path
-        self.connection = None
+        self._pool = None
+        self._cache = get_result_cache(db_path)
+        self._listeners = get_listeners(db_path)
+        self._audit = get_audit_writer(db_path)
         self.connect()
         self.create_tables()
     
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """The calling thread's pooled connection (None once closed)"""
+        return self._pool.connection() if self._pool else None
+    
     def connect(self) -> bool:
         """Establish database connection"""
         try:
-            self.connection = sqlite3.connect(self.db_path)
-            self.connection.row_factory = sqlite3.Row  # This enables column access by name
-            print(f"✅ Connected to database: {self.db_path}")
+            if self._pool is None:
+                pool = get_pool(self.db_path)
+                pool.acquire()
+                self._pool = pool
+            logger.info("✅ Connected to database: %s", self.db_path)
             return True
         except sqlite3.Error as e:
-            print(f"❌ Database connection error: {e}")
+            logger.error("❌ Database connection error: %s", e)
             return False
     
     def create_tables(self) -> bool:
@@ -77,19 +143,42 @@ class DatabaseHandler:
             ''')
             
             self.connection.commit()
-            print("✅ Database tables created successfully")
+            logger.info("✅ Database tables created successfully")
+
+            # Bring existing databases up to date (indexes etc.) without rebuilding them
+            previous_version = get_schema_version(self.connection)
+            current_version = apply_migrations(self.connection)
+            if current_version != previous_version:
+                logger.info("✅ Database schema migrated from version %s to %s", previous_version, current_version)
             return True
             
         except sqlite3.Error as e:
-            print(f"❌ Error creating tables: {e}")
+            logger.error("❌ Error creating tables: %s", e)
             return False
     
     def close(self):
         """Close database connection"""
-        if self.connection:
-            self.connection.close()
-            print("✅ Database connection closed")
+        if self._pool:
+            # Write our queued audit entries while the pool is still open, not after
+            self._audit.flush()
+            self._pool.release()
+            self._pool = None
+            logger.info("✅ Database connection closed")
+
+    def add_listener(self, listener: WriteListener):
+        """Notify listener of every write committed to this database in this process"""
+        self._listeners.add(listener)
+
+    def remove_listener(self, listener: WriteListener):
+        self._listeners.remove(listener)
     
+    def _owner_of(self, table: str, id_column: str, row_id: int) -> Optional[int]:
+        """student_id of a row, so writes by row ID can invalidate that student's cache"""
+        row = self.connection.execute(
+            f"SELECT student_id FROM {table} WHERE {id_column} = ?", (row_id,)
+        ).fetchone()
+        return row['student_id'] if row else None
+
     # Student CRUD operations
     def add_student(self, name: str, email: str) -> int:
         """Add a new student and return their ID"""
@@ -101,20 +190,23 @@ class DatabaseHandler:
             )
             self.connection.commit()
             student_id = cursor.lastrowid
-            print(f"✅ Student added with ID: {student_id}")
+            self._cache.invalidate_student(student_id)
+            logger.info("✅ Student added with ID: %s", student_id)
             return student_id
         except sqlite3.Error as e:
-            print(f"❌ Error adding student: {e}")
+            logger.error("❌ Error adding student: %s", e)
             return -1
     
     def get_all_students(self) -> List[Dict]:
-        """Get all students"""
+        """Get all students (iter_students() streams large tables page by page)"""
         try:
             cursor = self.connection.cursor()
             cursor.execute("SELECT * FROM students")
-            return [dict(row) for row in cursor.fetchall()]
+            rows = [dict(row) for row in cursor.fetchall()]
+            self._audit.record(ActionType.VIEW, 'students', None, f"all students: {len(rows)} rows")
+            return rows
         except sqlite3.Error as e:
-            print(f"❌ Error fetching students: {e}")
+            logger.error("❌ Error fetching students: %s", e)
             return []
     
     def get_student_by_id(self, student_id: int) -> Optional[Dict]:
@@ -123,9 +215,12 @@ class DatabaseHandler:
             cursor = self.connection.cursor()
             cursor.execute("SELECT * FROM students WHERE student_id = ?", (student_id,))
             row = cursor.fetchone()
-            return dict(row) if row else None
+            if row is None:
+                return None
+            self._audit.record(ActionType.VIEW, 'students', student_id)
+            return dict(row)
         except sqlite3.Error as e:
-            print(f"❌ Error fetching student: {e}")
+            logger.error("❌ Error fetching student: %s", e)
             return None
 
     # Attendance CRUD operations
@@ -138,12 +233,14 @@ class DatabaseHandler:
                    VALUES (?, ?, ?, ?)""",
                 (student_id, week_number, module_code, status)
             )
-            self.connection.commit()
+            sequence = self._listeners.commit(self.connection)
+            self._cache.invalidate_student(student_id)
+            self._listeners.attendance_recorded([(student_id, week_number, module_code, status)], sequence)
             attendance_id = cursor.lastrowid
-            print(f"✅ Attendance recorded with ID: {attendance_id}")
+            logger.info("✅ Attendance recorded with ID: %s", attendance_id)
             return attendance_id
         except sqlite3.Error as e:
-            print(f"❌ Error recording attendance: {e}")
+            logger.error("❌ Error recording attendance: %s", e)
             return -1
 
     def get_attendance_by_student(self, student_id: int) -> List[Dict]:
@@ -154,9 +251,10 @@ class DatabaseHandler:
                 "SELECT * FROM attendance WHERE student_id = ? ORDER BY week_number",
                 (student_id,)
             )
+            self._audit.record(ActionType.VIEW, 'attendance', student_id)
             return [dict(row) for row in cursor.fetchall()]
         except sqlite3.Error as e:
-            print(f"❌ Error fetching attendance: {e}")
+            logger.error("❌ Error fetching attendance: %s", e)
             return []
 
     # Wellbeing survey CRUD operations
@@ -170,12 +268,14 @@ class DatabaseHandler:
                    VALUES (?, ?, ?, ?, ?)""",
                 (student_id, week_number, stress_level, hours_slept, additional_notes)
             )
-            self.connection.commit()
+            sequence = self._listeners.commit(self.connection)
+            self._cache.invalidate_student(student_id)
+            self._listeners.surveys_added([(student_id, week_number, stress_level, hours_slept)], sequence)
             survey_id = cursor.lastrowid
-            print(f"✅ Wellbeing survey added with ID: {survey_id}")
+            logger.info("✅ Wellbeing survey added with ID: %s", survey_id)
             return survey_id
         except sqlite3.Error as e:
-            print(f"❌ Error adding wellbeing survey: {e}")
+            logger.error("❌ Error adding wellbeing survey: %s", e)
             return -1
 
     def get_surveys_by_student(self, student_id: int) -> List[Dict]:
@@ -186,9 +286,10 @@ class DatabaseHandler:
                 "SELECT * FROM wellbeing_surveys WHERE student_id = ? ORDER BY week_number",
                 (student_id,)
             )
+            self._audit.record(ActionType.VIEW, 'wellbeing_surveys', student_id)
             return [dict(row) for row in cursor.fetchall()]
         except sqlite3.Error as e:
-            print(f"❌ Error fetching wellbeing surveys: {e}")
+            logger.error("❌ Error fetching wellbeing surveys: %s", e)
             return []
 
     # Coursework CRUD operations
@@ -202,12 +303,14 @@ class DatabaseHandler:
                    VALUES (?, ?, ?, ?, ?, ?)""",
                 (student_id, module_code, assignment_name, submission_date, status, grade)
             )
-            self.connection.commit()
+            sequence = self._listeners.commit(self.connection)
+            self._cache.invalidate_student(student_id)
+            self._listeners.coursework_added([(student_id, module_code, status, grade)], sequence)
             coursework_id = cursor.lastrowid
-            print(f"✅ Coursework added with ID: {coursework_id}")
+            logger.info("✅ Coursework added with ID: %s", coursework_id)
             return coursework_id
         except sqlite3.Error as e:
-            print(f"❌ Error adding coursework: {e}")
+            logger.error("❌ Error adding coursework: %s", e)
             return -1
 
     def get_coursework_by_student(self, student_id: int) -> List[Dict]:
@@ -218,9 +321,10 @@ class DatabaseHandler:
                 "SELECT * FROM coursework WHERE student_id = ? ORDER BY submission_date",
                 (student_id,)
             )
+            self._audit.record(ActionType.VIEW, 'coursework', student_id)
             return [dict(row) for row in cursor.fetchall()]
         except sqlite3.Error as e:
-            print(f"❌ Error fetching coursework: {e}")
+            logger.error("❌ Error fetching coursework: %s", e)
             return []
             # Update operations
     def update_student(self, student_id: int, name: str = None, email: str = None) -> bool:
@@ -244,31 +348,35 @@ class DatabaseHandler:
             query = f"UPDATE students SET {', '.join(updates)} WHERE student_id = ?"
             cursor.execute(query, params)
             self.connection.commit()
+            self._cache.invalidate_student(student_id)
             
             if cursor.rowcount > 0:
-                print(f"✅ Student {student_id} updated successfully")
+                logger.info("✅ Student %s updated successfully", student_id)
                 return True
             return False
             
         except sqlite3.Error as e:
-            print(f"❌ Error updating student: {e}")
+            logger.error("❌ Error updating student: %s", e)
             return False
 
     def update_attendance(self, attendance_id: int, status: str = None) -> bool:
         """Update attendance record"""
         try:
             cursor = self.connection.cursor()
+            student_id = self._owner_of("attendance", "attendance_id", attendance_id)
             query = "UPDATE attendance SET status = ? WHERE attendance_id = ?"
             cursor.execute(query, (status, attendance_id))
             self.connection.commit()
+            self._cache.invalidate_student(student_id)
+            self._listeners.students_changed([student_id])
             
             if cursor.rowcount > 0:
-                print(f"✅ Attendance record {attendance_id} updated")
+                logger.info("✅ Attendance record %s updated", attendance_id)
                 return True
             return False
             
         except sqlite3.Error as e:
-            print(f"❌ Error updating attendance: {e}")
+            logger.error("❌ Error updating attendance: %s", e)
             return False
 
     # Delete operations
@@ -285,67 +393,140 @@ class DatabaseHandler:
             # Delete student
             cursor.execute("DELETE FROM students WHERE student_id = ?", (student_id,))
             self.connection.commit()
+            self._cache.invalidate_student(student_id)
+            self._listeners.students_changed([student_id])
             
             if cursor.rowcount > 0:
-                print(f"✅ Student {student_id} and all related records deleted")
+                logger.info("✅ Student %s and all related records deleted", student_id)
                 return True
             return False
             
         except sqlite3.Error as e:
-            print(f"❌ Error deleting student: {e}")
+            logger.error("❌ Error deleting student: %s", e)
             return False
 
     def delete_attendance(self, attendance_id: int) -> bool:
         """Delete a specific attendance record"""
         try:
             cursor = self.connection.cursor()
+            student_id = self._owner_of("attendance", "attendance_id", attendance_id)
             cursor.execute("DELETE FROM attendance WHERE attendance_id = ?", (attendance_id,))
             self.connection.commit()
+            self._cache.invalidate_student(student_id)
+            self._listeners.students_changed([student_id])
             
             if cursor.rowcount > 0:
-                print(f"✅ Attendance record {attendance_id} deleted")
+                logger.info("✅ Attendance record %s deleted", attendance_id)
                 return True
             return False
             
         except sqlite3.Error as e:
-            print(f"❌ Error deleting attendance: {e}")
+            logger.error("❌ Error deleting attendance: %s", e)
             return False
 
     def delete_wellbeing_survey(self, survey_id: int) -> bool:
         """Delete a wellbeing survey record"""
         try:
             cursor = self.connection.cursor()
+            student_id = self._owner_of("wellbeing_surveys", "survey_id", survey_id)
             cursor.execute("DELETE FROM wellbeing_surveys WHERE survey_id = ?", (survey_id,))
             self.connection.commit()
+            self._cache.invalidate_student(student_id)
+            self._listeners.students_changed([student_id])
             
             if cursor.rowcount > 0:
-                print(f"✅ Wellbeing survey {survey_id} deleted")
+                logger.info("✅ Wellbeing survey %s deleted", survey_id)
                 return True
             return False
             
         except sqlite3.Error as e:
-            print(f"❌ Error deleting wellbeing survey: {e}")
+            logger.error("❌ Error deleting wellbeing survey: %s", e)
             return False
 
     # Enhanced read operations
-    def search_students(self, search_term: str) -> List[Dict]:
-        """Search students by name or email"""
+    def _has_search_index(self) -> bool:
+        """Whether migration 5 created the FTS5 index (SQLite may lack FTS5)"""
+        return self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_TABLE,)
+        ).fetchone() is not None
+
+    def refresh_search_index(self) -> int:
+        """Re-index the students marked since the last refresh, in one pass
+
+        search_students() calls this first, so results are never stale; call
+        it after a bulk load to keep that cost off the first search. Returns
+        the number of students re-indexed, or -1 on error.
+        """
         try:
+            if not self._has_search_index():
+                return 0
             cursor = self.connection.cursor()
-            query = """
-                SELECT * FROM students 
-                WHERE name LIKE ? OR email LIKE ?
-                ORDER BY name
-            """
-            search_pattern = f"%{search_term}%"
-            cursor.execute(query, (search_pattern, search_pattern))
-            return [dict(row) for row in cursor.fetchall()]
+            if cursor.execute(f"SELECT 1 FROM {SEARCH_DIRTY_TABLE} LIMIT 1").fetchone() is None:
+                return 0
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(f"DELETE FROM {SEARCH_DIRTY_TABLE} RETURNING student_id")
+            dirty = json.dumps([row[0] for row in cursor.fetchall()])
+            cursor.execute(f"""DELETE FROM {SEARCH_TABLE}
+                               WHERE rowid IN (SELECT value FROM json_each(?))""", (dirty,))
+            # Deleted students are marked too; the join leaves them out of the index
+            cursor.execute(f"""
+                INSERT INTO {SEARCH_TABLE} (rowid, name, email, notes)
+                SELECT s.student_id, s.name, s.email,
+                       (SELECT COALESCE(group_concat(w.additional_notes, ' '), '')
+                        FROM wellbeing_surveys w
+                        WHERE w.student_id = s.student_id AND w.additional_notes <> '')
+                FROM json_each(?) d
+                CROSS JOIN students s ON s.student_id = d.value
+            """, (dirty,))
+            self.connection.commit()
+            return len(json.loads(dirty))
+        except sqlite3.Error as e:
+            if self.connection.in_transaction:
+                self.connection.rollback()
+            logger.error("❌ Error refreshing search index: %s", e)
+            return -1
+
+    def search_students(self, search_term: str, limit: Optional[int] = None,
+                        offset: int = 0) -> List[Dict]:
+        """Search students by name, email or survey notes, best matches first
+
+        Every word in search_term must start a word in the student's name,
+        email or notes, so "ali jo" finds "Alice Jones". Matches are ranked
+        by bm25 with name hits above email and notes hits; limit and offset
+        page through them. Without the FTS5 index (or for a term with no
+        words) this falls back to a LIKE scan over name and email.
+        """
+        match = _prefix_query(search_term)
+        page = (-1 if limit is None else limit, offset)
+        try:
+            cursor = self.connection.cursor()
+            if match is not None and self._has_search_index() and self.refresh_search_index() >= 0:
+                cursor.execute(f"""
+                    SELECT s.*
+                    FROM {SEARCH_TABLE} f
+                    JOIN students s ON s.student_id = f.rowid
+                    WHERE {SEARCH_TABLE} MATCH ?
+                    ORDER BY bm25({SEARCH_TABLE}, {', '.join(map(str, SEARCH_WEIGHTS))}), s.name
+                    LIMIT ? OFFSET ?
+                """, (match, *page))
+            else:
+                search_pattern = f"%{search_term}%"
+                cursor.execute("""
+                    SELECT * FROM students
+                    WHERE name LIKE ? OR email LIKE ?
+                    ORDER BY name
+                    LIMIT ? OFFSET ?
+                """, (search_pattern, search_pattern, *page))
+            rows = [dict(row) for row in cursor.fetchall()]
+            self._audit.record(ActionType.VIEW, 'students', None,
+                               f"search {search_term!r}: {len(rows)} rows")
+            return rows
         except sqlite3.Error as e:
-            print(f"❌ Error searching students: {e}")
+            logger.error("❌ Error searching students: %s", e)
             return []
 
     def get_all_attendance(self) -> List[Dict]:
-        """Get all attendance records with student names"""
+        """Get all attendance records with student names (see iter_attendance() for large tables)"""
         try:
             cursor = self.connection.cursor()
             query = """
@@ -355,7 +536,265 @@ class DatabaseHandler:
                 ORDER BY a.week_number, s.name
             """
             cursor.execute(query)
-            return [dict(row) for row in cursor.fetchall()]
+            rows = [dict(row) for row in cursor.fetchall()]
+            self._audit.record(ActionType.VIEW, 'attendance', None, f"all attendance: {len(rows)} rows")
+            return rows
+        except sqlite3.Error as e:
+            logger.error("❌ Error fetching all attendance: %s", e)
+            return []
+
+    # Keyset-paginated reads: each page is one short indexed query, so memory per
+    # page and latency per page stay flat however far into the table a caller is.
+    # Every page is audited as one VIEW of table (of student_id, if given).
+    def _page(self, query: str, params: Sequence, label: str, table: str,
+              student_id: Optional[int] = None) -> List[Dict]:
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(query, params)
+            rows = [dict(row) for row in cursor.fetchall()]
         except sqlite3.Error as e:
-            print(f"❌ Error fetching all attendance: {e}")
-            return []
\ No newline at end of file
+            logger.error("❌ Error fetching %s page: %s", label, e)
+            return []
+        self._audit.record(ActionType.VIEW, table, student_id, f"page after {params[0]}: {len(rows)} rows")
+        return rows
+
+    @staticmethod
+    def _iter_pages(fetch_page, key: str, after_id: int, limit: Optional[int],
+                    page_size: int) -> Iterator[Dict]:
+        """Yield rows page by page, resuming each page after the last key seen"""
+        if page_size < 1:
+            raise ValueError(f"page_size must be a positive integer, got {page_size}")
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            page = fetch_page(after_id, size)
+            yield from page
+            if len(page) < size:
+                return
+            after_id = page[-1][key]
+            if remaining is not None:
+                remaining -= len(page)
+
+    def get_students_page(self, after_id: int = 0, limit: int = DEFAULT_PAGE_SIZE) -> List[Dict]:
+        """Up to limit students with student_id > after_id, in student_id order
+
+        Pass the last student_id of a page as after_id to get the next one.
+        """
+        return self._page(
+            "SELECT * FROM students WHERE student_id > ? ORDER BY student_id LIMIT ?",
+            (after_id, limit), "students", 'students'
+        )
+
+    def get_attendance_page(self, after_id: int = 0, limit: int = DEFAULT_PAGE_SIZE,
+                            student_id: Optional[int] = None) -> List[Dict]:
+        """Up to limit attendance rows (with student_name) after attendance_id after_id
+
+        Optionally restricted to one student. Rows come in attendance_id order.
+        """
+        student_filter = "AND a.student_id = ?" if student_id is not None else ""
+        params = (after_id, student_id, limit) if student_id is not None else (after_id, limit)
+        return self._page(f"""
+            SELECT a.*, s.name AS student_name
+            FROM attendance a
+            LEFT JOIN students s ON s.student_id = a.student_id
+            WHERE a.attendance_id > ? {student_filter}
+            ORDER BY a.attendance_id
+            LIMIT ?
+        """, params, "attendance", 'attendance', student_id)
+
+    def get_surveys_page(self, after_id: int = 0, limit: int = DEFAULT_PAGE_SIZE,
+                         student_id: Optional[int] = None) -> List[Dict]:
+        """Up to limit wellbeing surveys after survey_id after_id, optionally for one student"""
+        student_filter = "AND student_id = ?" if student_id is not None else ""
+        params = (after_id, student_id, limit) if student_id is not None else (after_id, limit)
+        return self._page(f"""
+            SELECT * FROM wellbeing_surveys
+            WHERE survey_id > ? {student_filter}
+            ORDER BY survey_id
+            LIMIT ?
+        """, params, "wellbeing survey", 'wellbeing_surveys', student_id)
+
+    def iter_students(self, after_id: int = 0, limit: Optional[int] = None,
+                      page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict]:
+        """Stream students in student_id order, at most limit of them (default all)
+
+        Rows are fetched page_size at a time. Pages that fail are logged and
+        end the iteration, like the list getters return [] on error.
+        """
+        yield from self._iter_pages(self.get_students_page, 'student_id', after_id, limit, page_size)
+
+    def iter_attendance(self, after_id: int = 0, limit: Optional[int] = None,
+                        student_id: Optional[int] = None,
+                        page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict]:
+        """Stream attendance rows (with student_name) in attendance_id order"""
+        yield from self._iter_pages(
+            lambda after, size: self.get_attendance_page(after, size, student_id),
+            'attendance_id', after_id, limit, page_size
+        )
+
+    def iter_surveys(self, after_id: int = 0, limit: Optional[int] = None,
+                     student_id: Optional[int] = None,
+                     page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict]:
+        """Stream wellbeing surveys in survey_id order"""
+        yield from self._iter_pages(
+            lambda after, size: self.get_surveys_page(after, size, student_id),
+            'survey_id', after_id, limit, page_size
+        )
+
+    # Columnar reads for analytics over many students
+    def _record_batch(self, query: str, student_ids: Optional[Iterable[int]],
+                      label: str, table: str) -> Optional[RecordBatch]:
+        """Fetch (student_id, week_number, stress_level, hours_slept, status) rows as a batch
+
+        Audited as a single VIEW of table naming how many students were read.
+        """
+        if student_ids is None:
+            query, params = query.format(filter=""), []
+            scope = "all students"
+        else:
+            student_ids = [int(student_id) for student_id in student_ids]
+            query = query.format(filter="WHERE student_id IN (SELECT value FROM json_each(?))")
+            params = [json.dumps(student_ids)]
+            scope = f"{len(student_ids)} students"
+        try:
+            cursor = self.connection.cursor()
+            cursor.row_factory = None  # plain tuples, far cheaper than sqlite3.Row at this size
+            cursor.execute(query, params)
+            # Stored rows were validated on the way in
+            batch = RecordBatch.from_rows(cursor.fetchall(), validate=False)
+        except sqlite3.Error as e:
+            logger.error("❌ Error fetching %s batch: %s", label, e)
+            return None
+        self._audit.record(ActionType.VIEW, table, None, f"batch of {scope}")
+        return batch
+
+    def get_survey_batch(self, student_ids: Optional[Iterable[int]] = None) -> Optional[RecordBatch]:
+        """Wellbeing surveys as a RecordBatch (status column missing), ordered by student and week"""
+        return self._record_batch(
+            """SELECT student_id, week_number, stress_level, hours_slept, NULL
+               FROM wellbeing_surveys {filter}
+               ORDER BY student_id, week_number""",
+            student_ids, "survey", 'wellbeing_surveys'
+        )
+
+    def get_attendance_batch(self, student_ids: Optional[Iterable[int]] = None) -> Optional[RecordBatch]:
+        """Attendance as a RecordBatch (stress and sleep missing), ordered by student and week"""
+        return self._record_batch(
+            """SELECT student_id, week_number, NULL, NULL, status
+               FROM attendance {filter}
+               ORDER BY student_id, week_number""",
+            student_ids, "attendance", 'attendance'
+        )
+
+    # Bulk ingestion operations
+    def _bulk_insert(self, query: str, rows: Iterable, columns: Sequence[str],
+                     defaults: Dict, chunk_size: int, label: str,
+                     notify: Optional[Callable[[List[tuple], int], None]] = None,
+                     notify_columns: Optional[Sequence[str]] = None) -> int:
+        """Insert rows with executemany in chunks inside a single transaction
+
+        notify, if given, receives the inserted rows (trimmed to notify_columns,
+        by default the first four columns) and the commit's sequence number
+        after the commit, but only while listeners are attached.
+        """
+        picked = [columns.index(column) for column in notify_columns or columns[:4]]
+        cursor = self.connection.cursor()
+        total = 0
+        student_ids = set()  # columns[0] is student_id for every bulk loader
+        written = [] if notify is not None and self._listeners else None
+        try:
+            for chunk in _iter_chunks(rows, columns, defaults, chunk_size):
+                cursor.executemany(query, chunk)
+                total += len(chunk)
+                student_ids.update(row[0] for row in chunk)
+                if written is not None:
+                    written.extend(tuple(row[i] for i in picked) for row in chunk)
+            sequence = self._listeners.commit(self.connection)
+            self._cache.invalidate_students(student_ids)
+            if written:
+                notify(written, sequence)
+        except sqlite3.Error as e:
+            self.connection.rollback()
+            logger.error("❌ Error bulk loading %s: %s", label, e)
+            return -1
+        except Exception:
+            self.connection.rollback()
+            raise
+
+        logger.info("✅ Bulk loaded %s %s", total, label)
+        return total
+
+    def bulk_add_students(self, students: Iterable,
+                          chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[int]:
+        """Add many students in one transaction and return their IDs in input order
+
+        Each row is a (name, email) tuple or a dict with those keys.
+        Returns an empty list if the load fails; nothing is committed in that case.
+        """
+        cursor = self.connection.cursor()
+        student_ids = []
+        try:
+            for chunk in _iter_chunks(students, ("name", "email"), {}, chunk_size):
+                cursor.executemany("INSERT INTO students (name, email) VALUES (?, ?)", chunk)
+                emails = [email for _, email in chunk]
+                cursor.execute(
+                    f"SELECT student_id, email FROM students WHERE email IN ({', '.join('?' * len(emails))})",
+                    emails
+                )
+                ids_by_email = {row['email']: row['student_id'] for row in cursor.fetchall()}
+                student_ids.extend(ids_by_email[email] for email in emails)
+            self.connection.commit()
+            self._cache.invalidate_students(student_ids)
+        except sqlite3.Error as e:
+            self.connection.rollback()
+            logger.error("❌ Error bulk loading students: %s", e)
+            return []
+        except Exception:
+            self.connection.rollback()
+            raise
+
+        logger.info("✅ Bulk loaded %s students", len(student_ids))
+        return student_ids
+
+    def bulk_record_attendance(self, records: Iterable,
+                               chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """Record many attendance rows in one transaction and return the row count
+
+        Each row is a (student_id, week_number, module_code, status) tuple or a dict
+        with those keys. Returns -1 if the load fails; nothing is committed in that case.
+        """
+        return self._bulk_insert(
+            """INSERT INTO attendance (student_id, week_number, module_code, status)
+               VALUES (?, ?, ?, ?)""",
+            records, ("student_id", "week_number", "module_code", "status"), {},
+            chunk_size, "attendance records", self._listeners.attendance_recorded
+        )
+
+    def bulk_add_surveys(self, surveys: Iterable,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """Add many wellbeing surveys in one transaction and return the row count
+
+        Each row is a (student_id, week_number, stress_level, hours_slept[, additional_notes])
+        tuple or a dict with those keys. Returns -1 if the load fails.
+        """
+        return self._bulk_insert(
+            """INSERT INTO wellbeing_surveys (student_id, week_number, stress_level, hours_slept, additional_notes)
+               VALUES (?, ?, ?, ?, ?)""",
+            surveys, ("student_id", "week_number", "stress_level", "hours_slept", "additional_notes"),
+            {"additional_notes": ""}, chunk_size, "wellbeing surveys", self._listeners.surveys_added
+        )
+
+    def bulk_add_coursework(self, coursework: Iterable,
+                            chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """Add many coursework rows in one transaction and return the row count
+
+        Each row is a (student_id, module_code, assignment_name, submission_date, status[, grade])
+        tuple or a dict with those keys. Returns -1 if the load fails.
+        """
+        return self._bulk_insert(
+            """INSERT INTO coursework (student_id, module_code, assignment_name, submission_date, status, grade)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            coursework, ("student_id", "module_code", "assignment_name", "submission_date", "status", "grade"),
+            {"grade": None}, chunk_size, "coursework records", self._listeners.coursework_added,
+            ("student_id", "module_code", "status", "grade")
+        )
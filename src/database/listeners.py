@@ -0,0 +1,126 @@
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class WriteListener:
+    """Base class for in-process consumers of committed writes
+
+    DatabaseHandler calls these hooks after a write has been committed, on the
+    writing thread, with the rows that were written. Override the ones you
+    need; the defaults do nothing. Hooks should be quick and must not write
+    back to the database.
+
+    sequence numbers the commit (see ListenerRegistry.commit). A listener
+    that loads state with ListenerRegistry.snapshot() ignores announcements
+    with a sequence at or below its load's: those rows are already counted.
+    """
+
+    def on_attendance(self, records: Sequence[tuple], sequence: Optional[int] = None):
+        """records: (student_id, week_number, module_code, status) tuples"""
+
+    def on_surveys(self, surveys: Sequence[tuple], sequence: Optional[int] = None):
+        """surveys: (student_id, week_number, stress_level, hours_slept) tuples"""
+
+    def on_coursework(self, coursework: Sequence[tuple], sequence: Optional[int] = None):
+        """coursework: (student_id, module_code, status, grade) tuples"""
+
+    def on_students_changed(self, student_ids: Iterable[int]):
+        """Existing records of these students were updated, deleted or upserted"""
+
+
+class ListenerRegistry:
+    """The listeners attached to one database, notified in registration order
+
+    A failing listener is logged and skipped so it can never undo or block a
+    write that has already been committed.
+
+    Announcements arrive after the commit, so a listener loading from the
+    database in between would count a write twice. Writers therefore commit
+    through commit(), which numbers the commit, and listeners read inside
+    snapshot(), which holds commits off while their read starts.
+    """
+
+    def __init__(self):
+        self._listeners: List[WriteListener] = []
+        self._lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        self._sequence = 0
+
+    def __bool__(self) -> bool:
+        # Lets bulk loaders skip collecting rows when nobody is listening
+        return bool(self._listeners)
+
+    def add(self, listener: WriteListener):
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners = self._listeners + [listener]
+
+    def remove(self, listener: WriteListener):
+        with self._lock:
+            self._listeners = [l for l in self._listeners if l is not listener]
+
+    def commit(self, connection: sqlite3.Connection) -> int:
+        """Commit connection's transaction and return the commit's sequence number"""
+        with self._commit_lock:
+            connection.commit()
+            self._sequence += 1
+            return self._sequence
+
+    @contextmanager
+    def snapshot(self) -> Iterator[int]:
+        """Hold off commit() for the with-block, yielding the last commit's sequence number
+
+        Start (and finish) the loading query inside the block: it then sees
+        exactly the commits numbered up to the yielded sequence.
+        """
+        with self._commit_lock:
+            yield self._sequence
+
+    def _notify(self, hook: str, rows, *args):
+        if not rows:
+            return
+        for listener in self._listeners:
+            try:
+                getattr(listener, hook)(rows, *args)
+            except Exception:
+                logger.exception("❌ Write listener %r failed in %s", listener, hook)
+
+    def attendance_recorded(self, records: Sequence[tuple], sequence: Optional[int] = None):
+        self._notify('on_attendance', records, sequence)
+
+    def surveys_added(self, surveys: Sequence[tuple], sequence: Optional[int] = None):
+        self._notify('on_surveys', surveys, sequence)
+
+    def coursework_added(self, coursework: Sequence[tuple], sequence: Optional[int] = None):
+        self._notify('on_coursework', coursework, sequence)
+
+    def students_changed(self, student_ids: Iterable[int]):
+        self._notify('on_students_changed', {s for s in student_ids if s is not None})
+
+
+_registries: Dict[str, ListenerRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_listeners(db_path: str) -> ListenerRegistry:
+    """Return the process-wide listener registry for db_path
+
+    Shared the same way as the result cache, so every DatabaseHandler or
+    ImportService writing to a database notifies the same listeners. Writes
+    made by other processes are not seen.
+    """
+    if db_path == ":memory:":
+        return ListenerRegistry()
+
+    key = os.path.abspath(db_path)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = ListenerRegistry()
+        return registry
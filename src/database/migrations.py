@@ -0,0 +1,291 @@
+import sqlite3
+from typing import Callable, List, Optional, Tuple, Union
+
+# A migration step is either a SQL statement or a callable that receives the cursor
+MigrationStep = Union[str, Callable[[sqlite3.Cursor], None]]
+
+# Stress level at or above which a survey counts as high stress in the aggregates
+HIGH_STRESS_THRESHOLD = 4
+
+
+def _aggregate_table_steps(table: str, source: str, key: str,
+                           measures: List[Tuple[str, str, str]]) -> List[str]:
+    """Statements for a summary table kept current by triggers on its source table
+
+    measures are (column, SQL type, per-row expression); "{row}" in the expression
+    is replaced by NEW/OLD inside triggers and by the source table in the backfill.
+    Rows with a NULL key are not aggregated.
+    """
+    columns = [column for column, _, _ in measures]
+
+    def values(row: str) -> str:
+        return ", ".join(expression.format(row=row) for _, _, expression in measures)
+
+    def apply(sign: str) -> str:
+        return ", ".join(f"{column} = {column} {sign} excluded.{column}" for column in columns)
+
+    add_new = (f"INSERT INTO {table} ({key}, {', '.join(columns)}) "
+               f"SELECT NEW.{key}, {values('NEW')} WHERE NEW.{key} IS NOT NULL "
+               f"ON CONFLICT({key}) DO UPDATE SET {apply('+')};")
+    remove_old = (f"UPDATE {table} SET "
+                  + ", ".join(f"{column} = {column} - ({expression.format(row='OLD')})"
+                              for column, _, expression in measures)
+                  + f" WHERE {key} = OLD.{key};")
+
+    return [
+        f"""CREATE TABLE IF NOT EXISTS {table} (
+            {key} INTEGER PRIMARY KEY,
+            {', '.join(f'{column} {sql_type} NOT NULL DEFAULT 0' for column, sql_type, _ in measures)}
+        )""",
+        f"""INSERT INTO {table} ({key}, {', '.join(columns)})
+            SELECT {key}, {', '.join(f'SUM({expression.format(row=source)})' for _, _, expression in measures)}
+            FROM {source} WHERE {key} IS NOT NULL GROUP BY {key}""",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_insert AFTER INSERT ON {source} BEGIN {add_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_delete AFTER DELETE ON {source} BEGIN {remove_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_update AFTER UPDATE ON {source} BEGIN {remove_old} {add_new} END",
+    ]
+
+
+def _dirty_student_steps(table: str, sources: List[str]) -> List[str]:
+    """Statements for a set of student IDs whose records changed since it was last drained
+
+    Triggers on every source table add the affected student(s); consumers delete
+    the IDs they have processed. Starts out holding every existing student.
+    """
+    steps = [
+        f"CREATE TABLE IF NOT EXISTS {table} (student_id INTEGER PRIMARY KEY)",
+        f"INSERT OR IGNORE INTO {table} (student_id) SELECT student_id FROM students",
+    ]
+    mark = f"INSERT OR IGNORE INTO {table} (student_id) SELECT {{row}}.student_id WHERE {{row}}.student_id IS NOT NULL;"
+    for source in sources:
+        steps += [
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{source}_insert AFTER INSERT ON {source} "
+            f"BEGIN {mark.format(row='NEW')} END",
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{source}_delete AFTER DELETE ON {source} "
+            f"BEGIN {mark.format(row='OLD')} END",
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{source}_update AFTER UPDATE ON {source} "
+            f"BEGIN {mark.format(row='OLD')} {mark.format(row='NEW')} END",
+        ]
+    return steps
+
+
+SEARCH_TABLE = "student_search"
+SEARCH_DIRTY_TABLE = "search_dirty_students"
+
+
+def _student_search_steps(cursor: sqlite3.Cursor):
+    """FTS5 index over student names, emails and survey notes
+
+    One document per student (rowid = student_id). Writing to FTS5 from a
+    per-row trigger flushes the index on every statement, which made bulk
+    loads several times slower, so triggers only mark students in
+    SEARCH_DIRTY_TABLE and DatabaseHandler re-indexes them in one pass
+    before searching. Every existing student starts out marked. SQLite
+    builds without FTS5 skip the index and search falls back to LIKE.
+    """
+    try:
+        cursor.execute(f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+            name, email, notes,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '1 2 3'
+        )""")
+    except sqlite3.OperationalError as e:
+        if "fts5" in str(e):
+            return
+        raise
+
+    mark = (f"INSERT OR IGNORE INTO {SEARCH_DIRTY_TABLE} (student_id) "
+            "SELECT {row}.student_id WHERE {row}.student_id IS NOT NULL;")
+    # Surveys without notes (nearly all of them) leave the index alone
+    steps = _dirty_student_steps(SEARCH_DIRTY_TABLE, ["students"]) + [
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{SEARCH_DIRTY_TABLE}_wellbeing_surveys_insert
+            AFTER INSERT ON wellbeing_surveys WHEN NEW.additional_notes <> ''
+            BEGIN {mark.format(row='NEW')} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{SEARCH_DIRTY_TABLE}_wellbeing_surveys_delete
+            AFTER DELETE ON wellbeing_surveys WHEN OLD.additional_notes <> ''
+            BEGIN {mark.format(row='OLD')} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{SEARCH_DIRTY_TABLE}_wellbeing_surveys_update
+            AFTER UPDATE OF student_id, additional_notes ON wellbeing_surveys
+            WHEN OLD.additional_notes <> '' OR NEW.additional_notes <> ''
+            BEGIN {mark.format(row='OLD')} {mark.format(row='NEW')} END""",
+    ]
+    for statement in steps:
+        cursor.execute(statement)
+
+
+AUDIT_TABLE = "audit_log"
+AUDIT_ACTIONS = ('CREATE', 'UPDATE', 'DELETE', 'LOGIN', 'LOGOUT', 'VIEW', 'EXPORT', 'IMPORT')
+
+# Also run by the audit writer, so databases not managed by DatabaseHandler get the table
+AUDIT_LOG_STEPS = [
+    f"""CREATE TABLE IF NOT EXISTS {AUDIT_TABLE} (
+        log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        entity_type TEXT NOT NULL,
+        entity_id TEXT NOT NULL,
+        action_type TEXT NOT NULL CHECK(action_type IN ({', '.join(repr(a) for a in AUDIT_ACTIONS)})),
+        timestamp TIMESTAMP NOT NULL,
+        details TEXT NOT NULL DEFAULT ''
+    )""",
+    f"CREATE INDEX IF NOT EXISTS idx_audit_log_entity ON {AUDIT_TABLE} (entity_type, entity_id)",
+    f"CREATE INDEX IF NOT EXISTS idx_audit_log_user ON {AUDIT_TABLE} (user_id, timestamp)",
+    # Append-only: entries can be added but never changed or removed
+    f"""CREATE TRIGGER IF NOT EXISTS trg_{AUDIT_TABLE}_no_update BEFORE UPDATE ON {AUDIT_TABLE}
+        BEGIN SELECT RAISE(ABORT, '{AUDIT_TABLE} is append-only'); END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_{AUDIT_TABLE}_no_delete BEFORE DELETE ON {AUDIT_TABLE}
+        BEGIN SELECT RAISE(ABORT, '{AUDIT_TABLE} is append-only'); END""",
+]
+
+
+def _dimension_steps(table: str, key: str, sources: List[str]) -> List[str]:
+    """Statements for a dimension table holding every distinct key seen in sources
+
+    Backfilled from the sources and extended by insert/update triggers on them;
+    keys are never removed, so a dimension outlives the rows that introduced it.
+    """
+    steps = [
+        f"INSERT OR IGNORE INTO {table} ({key}) "
+        + " UNION ".join(f"SELECT {key} FROM {source} WHERE {key} IS NOT NULL" for source in sources),
+    ]
+    add = f"INSERT OR IGNORE INTO {table} ({key}) VALUES (NEW.{key});"
+    for source in sources:
+        steps += [
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{source}_insert AFTER INSERT ON {source} "
+            f"WHEN NEW.{key} IS NOT NULL BEGIN {add} END",
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{source}_update AFTER UPDATE OF {key} ON {source} "
+            f"WHEN NEW.{key} IS NOT NULL BEGIN {add} END",
+        ]
+    return steps
+
+
+ATTENDANCE_MEASURES = [
+    ("present_count", "INTEGER", "CASE WHEN {row}.status = 'Present' THEN 1 ELSE 0 END"),
+    ("total_count", "INTEGER", "1"),
+]
+
+WELLBEING_MEASURES = [
+    ("survey_count", "INTEGER", "1"),
+    ("stress_sum", "INTEGER", "COALESCE({row}.stress_level, 0)"),
+    ("stress_count", "INTEGER", "CASE WHEN {row}.stress_level IS NULL THEN 0 ELSE 1 END"),
+    ("sleep_sum", "REAL", "COALESCE({row}.hours_slept, 0)"),
+    ("sleep_count", "INTEGER", "CASE WHEN {row}.hours_slept IS NULL THEN 0 ELSE 1 END"),
+    ("high_stress_count", "INTEGER",
+     f"CASE WHEN {{row}}.stress_level >= {HIGH_STRESS_THRESHOLD} THEN 1 ELSE 0 END"),
+]
+
+# Ordered (version, description, steps). Never edit a released migration;
+# append a new one with the next version number instead.
+MIGRATIONS: List[Tuple[int, str, List[MigrationStep]]] = [
+    (1, "Secondary indexes for per-student and per-module lookups", [
+        """CREATE INDEX IF NOT EXISTS idx_attendance_student_week
+           ON attendance (student_id, week_number, status)""",
+        """CREATE INDEX IF NOT EXISTS idx_attendance_module_week
+           ON attendance (module_code, week_number, status)""",
+        """CREATE INDEX IF NOT EXISTS idx_surveys_student_week
+           ON wellbeing_surveys (student_id, week_number, stress_level, hours_slept)""",
+        """CREATE INDEX IF NOT EXISTS idx_coursework_student_date
+           ON coursework (student_id, submission_date)""",
+        """CREATE INDEX IF NOT EXISTS idx_coursework_module
+           ON coursework (module_code, student_id)""",
+    ]),
+    (2, "Trigger-maintained per-student and per-week attendance/wellbeing aggregates",
+        _aggregate_table_steps("student_attendance_stats", "attendance", "student_id", ATTENDANCE_MEASURES)
+        + _aggregate_table_steps("weekly_attendance_stats", "attendance", "week_number", ATTENDANCE_MEASURES)
+        + _aggregate_table_steps("student_wellbeing_stats", "wellbeing_surveys", "student_id", WELLBEING_MEASURES)
+        + _aggregate_table_steps("weekly_wellbeing_stats", "wellbeing_surveys", "week_number", WELLBEING_MEASURES)),
+    (3, "External student identifiers (e.g. 'S01' in data.csv) and upsert keys for imports", [
+        "ALTER TABLE students ADD COLUMN external_id TEXT",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_students_external_id ON students (external_id)",
+        """CREATE INDEX IF NOT EXISTS idx_coursework_student_assignment
+           ON coursework (student_id, module_code, assignment_name)""",
+    ]),
+    (4, "Risk alerts and the set of students awaiting re-evaluation", [
+        """CREATE TABLE IF NOT EXISTS alerts (
+            alert_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            alert_type TEXT NOT NULL CHECK(alert_type IN ('Academic', 'Attendance', 'Wellbeing', 'Other')),
+            rule TEXT NOT NULL,
+            reason TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            resolved INTEGER NOT NULL DEFAULT 0,
+            resolved_at TIMESTAMP,
+            FOREIGN KEY (student_id) REFERENCES students(student_id)
+        )""",
+        # At most one open alert per student and rule; resolved ones are history
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_alerts_open ON alerts (student_id, rule) WHERE resolved = 0",
+    ] + _dirty_student_steps("risk_dirty_students", ["attendance", "wellbeing_surveys", "coursework"]) + [
+        """CREATE TRIGGER IF NOT EXISTS trg_students_delete_risk AFTER DELETE ON students BEGIN
+            DELETE FROM alerts WHERE student_id = OLD.student_id;
+            DELETE FROM risk_dirty_students WHERE student_id = OLD.student_id;
+        END""",
+    ]),
+    (5, "Full-text search index over students and survey notes", [_student_search_steps]),
+    (6, "Append-only audit log of views, exports and account activity", AUDIT_LOG_STEPS),
+    (7, "Catalog of closed terms moved out to archive databases", [
+        """CREATE TABLE IF NOT EXISTS archive_terms (
+            term TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            archived_before DATE NOT NULL,
+            attendance_rows INTEGER NOT NULL DEFAULT 0,
+            survey_rows INTEGER NOT NULL DEFAULT 0,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+    ]),
+    (8, "Module and week dimension tables for module-level analytics", [
+        """CREATE TABLE IF NOT EXISTS modules (
+            module_code TEXT PRIMARY KEY,
+            module_name TEXT
+        )""",
+        "CREATE TABLE IF NOT EXISTS weeks (week_number INTEGER PRIMARY KEY)",
+    ] + _dimension_steps("modules", "module_code", ["attendance", "coursework"])
+      + _dimension_steps("weeks", "week_number", ["attendance", "wellbeing_surveys"])),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(connection: sqlite3.Connection) -> int:
+    """Return the schema version stored in PRAGMA user_version"""
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(connection: sqlite3.Connection, target_version: Optional[int] = None) -> int:
+    """Upgrade the database in place to target_version (default: latest)
+
+    Each migration runs in its own transaction together with the user_version
+    bump, so an interrupted upgrade never leaves a half-applied version behind.
+    The transaction takes the write lock up front and re-reads user_version,
+    so when several connections open a fresh database at once each migration
+    runs exactly once. Returns the schema version after the upgrade.
+    """
+    target = LATEST_VERSION if target_version is None else target_version
+    current = get_schema_version(connection)
+
+    if connection.in_transaction:
+        connection.commit()
+
+    for version, description, steps in MIGRATIONS:
+        if version <= current or version > target:
+            continue
+
+        cursor = connection.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            current = get_schema_version(connection)
+            if version <= current:  # another connection got there first
+                connection.commit()
+                continue
+            for step in steps:
+                if callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+            # PRAGMA does not accept bound parameters; version is an int from MIGRATIONS
+            cursor.execute(f"PRAGMA user_version = {int(version)}")
+            connection.commit()
+        except sqlite3.Error:
+            connection.rollback()
+            raise
+        current = version
+
+    return current
@@ -0,0 +1,196 @@
+import copy
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from utils.instrumentation import metrics
+
+# Defaults for the shared per-database cache
+DEFAULT_MAX_SIZE = 1024
+DEFAULT_TTL_SECONDS = 300.0
+
+_MISSING = object()
+
+
+class ResultCache:
+    """Bounded LRU cache with per-entry TTL, indexed by student for invalidation
+
+    Keys are (method, student_id, args) tuples. Entries cached with
+    student_id=None are cohort-wide and are dropped by any invalidation.
+    Values are deep-copied on the way in and out, so callers can mutate what
+    they get back without corrupting the cache.
+
+    Every invalidation bumps the generation of the students it covers. A
+    caller computing a value on a miss reads generation() first and passes it
+    to set(), which then skips caching a value an invalidation has overtaken.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, ttl: Optional[float] = DEFAULT_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._keys_by_student: Dict[Any, set] = {}
+        # Per-student invalidation counts; None counts every invalidation,
+        # since any of them drops the cohort-wide entries
+        self._generations: Dict[Any, int] = {}
+        self._clears = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _discard(self, key: Hashable):
+        self._entries.pop(key, None)
+        keys = self._keys_by_student.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_student[key[1]]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key (default on a miss or expired entry)"""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._discard(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(value)
+
+    def generation(self, student_id) -> Tuple[int, int]:
+        """Token that changes whenever entries for student_id are invalidated"""
+        with self._lock:
+            return self._clears, self._generations.get(student_id, 0)
+
+    def _bump(self, student_id):
+        self._generations[None] = self._generations.get(None, 0) + 1
+        if student_id is not None:
+            self._generations[student_id] = self._generations.get(student_id, 0) + 1
+
+    def set(self, key: Hashable, value: Any, generation: Optional[Tuple[int, int]] = None):
+        """Cache value under key, evicting least recently used entries beyond max_size
+
+        With generation (from generation(key[1]) taken before computing value),
+        the value is dropped instead if key's student was invalidated since.
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if generation is not None and generation != self.generation(key[1]):
+                return
+            self._entries[key] = (expires_at, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            self._keys_by_student.setdefault(key[1], set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop the single entry for key; True if there was one"""
+        with self._lock:
+            self._generations[key[1]] = self._generations.get(key[1], 0) + 1
+            if key not in self._entries:
+                return False
+            self._discard(key)
+            self.invalidations += 1
+            return True
+
+    def invalidate_student(self, student_id) -> int:
+        """Drop every entry for student_id plus all cohort-wide entries"""
+        with self._lock:
+            self._bump(student_id)
+            keys = set(self._keys_by_student.get(student_id, ()))
+            keys |= self._keys_by_student.get(None, set())
+            for key in keys:
+                self._discard(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def invalidate_students(self, student_ids) -> int:
+        """Invalidate several students at once (e.g. after a bulk load)"""
+        with self._lock:
+            return sum(self.invalidate_student(student_id) for student_id in set(student_ids))
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._clears += 1
+            self._entries.clear()
+            self._keys_by_student.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss/eviction counters and the current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+
+def cached_per_student(func):
+    """Cache a method whose first argument is a student_id in self._cache"""
+    @functools.wraps(func)
+    def wrapper(self, student_id, *args, **kwargs):
+        key = (func.__name__, student_id, args, tuple(sorted(kwargs.items())))
+        generation = self._cache.generation(student_id)
+        value = self._cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = func(self, student_id, *args, **kwargs)
+            self._cache.set(key, value, generation)
+        return value
+    return wrapper
+
+
+_caches: Dict[str, ResultCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_result_cache(db_path: str) -> ResultCache:
+    """Return the process-wide result cache for db_path
+
+    Readers and writers of the same database share it, so a write through
+    DatabaseHandler invalidates what AnalyticsService has cached. Writes made
+    by other processes are not seen; the TTL bounds how stale entries get.
+    """
+    if db_path == ":memory:":
+        return ResultCache()
+
+    key = os.path.abspath(db_path)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = ResultCache()
+        return cache
+
+
+def _cache_gauges() -> List[Tuple[str, Dict, float]]:
+    """Expose every shared cache's counters to the metrics registry"""
+    with _caches_lock:
+        caches = list(_caches.items())
+    gauges = []
+    for db_path, cache in caches:
+        for name, value in cache.stats().items():
+            gauges.append((f"result_cache_{name}", {'database': db_path}, value))
+    return gauges
+
+
+metrics.register_collector(_cache_gauges)
@@ -1,3 +1,5 @@
+import logging
+
 from database.db_handler import DatabaseHandler
 from services.analytics_service import AnalyticsService
 
@@ -37,6 +39,7 @@ def setup_sample_data():
     return student_id
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     print("Student Wellbeing Analytics System")
     print("==================================")
     
@@ -4,7 +4,7 @@ from datetime import datetime
 from re import I
 from .AlertType import AlertType
 
-@dataclass
+@dataclass(slots=True)
 class Alert:
     alert_id: int
     student_id: str
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from datetime import date
 from .AttendanceStatus import AttendanceStatus
 
-@dataclass
+@dataclass(slots=True)
 class AttendanceRecord:
     attendance_id: int
     student_id: str 
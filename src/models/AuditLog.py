@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from .ActionType import ActionType
 
-@dataclass
+@dataclass(slots=True)
 class AuditLog:
     log_id: int
     user_id: str      # changed from int to str
@@ -0,0 +1,166 @@
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .AttendanceStatus import AttendanceStatus
+from .WellbeingRecord import SLEEP_HOURS_RANGE, STRESS_LEVEL_RANGE
+
+# Attendance statuses are stored as int8 codes into this tuple
+STATUSES = tuple(AttendanceStatus)
+
+# Sentinels for "no value" in the integer columns (hours_slept uses NaN)
+MISSING_STRESS = 0
+MISSING_STATUS = -1
+
+DTYPES = {
+    'student_id': np.int64,
+    'week_number': np.int16,
+    'stress_level': np.int8,
+    'hours_slept': np.float32,
+    'status': np.int8,
+}
+
+_CODES = {status.value: code for code, status in enumerate(STATUSES)}
+
+
+def encode_statuses(values: Iterable) -> np.ndarray:
+    """Map status strings/enums (any case, None/NA for missing) to int8 codes"""
+    codes = []
+    for value in values:
+        if value is None or pd.isna(value):
+            codes.append(MISSING_STATUS)
+            continue
+        code = _CODES.get(str(value).upper())
+        if code is None:
+            raise ValueError(f"Invalid status: {value}")
+        codes.append(code)
+    return np.array(codes, dtype=DTYPES['status'])
+
+
+def _read_only(column: np.ndarray) -> np.ndarray:
+    view = column.view()
+    view.flags.writeable = False
+    return view
+
+
+class RecordBatch:
+    """Columnar batch of weekly wellbeing and attendance records
+
+    Each column is a typed NumPy array of the same length: 16 bytes per row
+    instead of a dataclass or dict per record. Missing stress levels are
+    MISSING_STRESS, missing sleep is NaN and missing statuses are
+    MISSING_STATUS. Validation runs over whole columns when the batch is
+    built; pass validate=False for data that is already known to be clean.
+    """
+
+    __slots__ = tuple(DTYPES)
+
+    def __init__(self, student_id, week_number, stress_level=None, hours_slept=None,
+                 status=None, validate: bool = True):
+        size = len(student_id)
+        columns = {
+            'student_id': student_id,
+            'week_number': week_number,
+            'stress_level': np.full(size, MISSING_STRESS) if stress_level is None else stress_level,
+            'hours_slept': np.full(size, np.nan) if hours_slept is None else hours_slept,
+            'status': np.full(size, MISSING_STATUS) if status is None else status,
+        }
+        for name, values in columns.items():
+            if name == 'status' and not (isinstance(values, np.ndarray) and values.dtype.kind == 'i'):
+                values = encode_statuses(values)
+            raw = np.asarray(values)
+            # Only copies when the dtype has to change; a narrowing cast must not wrap around
+            column = raw.astype(DTYPES[name], copy=False)
+            if column is not raw and name != 'hours_slept' and not np.array_equal(column, raw):
+                raise ValueError(f"Column {name} has values that do not fit {np.dtype(DTYPES[name])}")
+            if column.shape != (size,):
+                raise ValueError(f"Column {name} has shape {column.shape}, expected ({size},)")
+            setattr(self, name, column)
+        if validate:
+            self.validate()
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple], validate: bool = True) -> "RecordBatch":
+        """Build from (student_id, week_number, stress_level, hours_slept, status) tuples"""
+        rows = list(rows)
+        if not rows:
+            return cls([], [], validate=validate)
+        student_id, week_number, stress_level, hours_slept, status = zip(*rows)
+        return cls(student_id, week_number,
+                   [MISSING_STRESS if value is None else value for value in stress_level],
+                   [np.nan if value is None else value for value in hours_slept],
+                   status, validate=validate)
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, validate: bool = True) -> "RecordBatch":
+        """Build from a DataFrame with student_id and week_number plus any of the other columns"""
+        columns = {}
+        if 'stress_level' in frame:
+            columns['stress_level'] = frame['stress_level'].fillna(MISSING_STRESS).to_numpy()
+        if 'hours_slept' in frame:
+            columns['hours_slept'] = frame['hours_slept'].to_numpy(dtype=float, na_value=np.nan)
+        if 'status' in frame:
+            columns['status'] = encode_statuses(frame['status'])
+        return cls(frame['student_id'].to_numpy(), frame['week_number'].to_numpy(),
+                   validate=validate, **columns)
+
+    def validate(self):
+        """Check every column at once, reporting the first offending row"""
+        def check(valid: np.ndarray, message: str, column: np.ndarray):
+            bad = np.flatnonzero(~valid)
+            if len(bad):
+                raise ValueError(f"{message}, got {column[bad[0]]} (row {bad[0]}, {len(bad)} invalid)")
+
+        stress = self.stress_level
+        check((stress == MISSING_STRESS)
+              | ((stress >= STRESS_LEVEL_RANGE[0]) & (stress <= STRESS_LEVEL_RANGE[1])),
+              "Stress level must be between 1 and 5", stress)
+        sleep = self.hours_slept
+        check(np.isnan(sleep) | ((sleep >= SLEEP_HOURS_RANGE[0]) & (sleep <= SLEEP_HOURS_RANGE[1])),
+              "Sleep hours must be between 0 and 24", sleep)
+        check((self.status >= MISSING_STATUS) & (self.status < len(STATUSES)),
+              "Invalid status code", self.status)
+        check(self.week_number >= 1, "Week number must be positive", self.week_number)
+
+    def __len__(self) -> int:
+        return len(self.student_id)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in DTYPES)
+
+    @property
+    def present(self) -> np.ndarray:
+        """Boolean mask of rows recorded as present"""
+        return self.status == STATUSES.index(AttendanceStatus.PRESENT)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Read-only views of the columns (no copies)"""
+        return {name: _read_only(getattr(self, name)) for name in DTYPES}
+
+    def slice(self, start: int, stop: Optional[int] = None) -> "RecordBatch":
+        """Rows start:stop as a batch of views sharing this batch's memory"""
+        batch = RecordBatch.__new__(RecordBatch)
+        for name in DTYPES:
+            setattr(batch, name, getattr(self, name)[start:stop])
+        return batch
+
+    def select(self, rows) -> "RecordBatch":
+        """Rows picked by a boolean mask or index array (copies)"""
+        batch = RecordBatch.__new__(RecordBatch)
+        for name in DTYPES:
+            setattr(batch, name, getattr(self, name)[rows])
+        return batch
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame sharing the student_id, week_number and hours_slept arrays
+
+        stress_level and status are decoded (missing values become NA),
+        so those two columns are copies.
+        """
+        frame = pd.DataFrame({name: getattr(self, name) for name in DTYPES}, copy=False)
+        frame['stress_level'] = frame['stress_level'].where(self.stress_level != MISSING_STRESS)
+        labels = np.array([status.value for status in STATUSES] + [None], dtype=object)
+        frame['status'] = labels[self.status]  # -1 picks the trailing None
+        return frame
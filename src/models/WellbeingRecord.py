@@ -1,8 +1,12 @@
 from dataclasses import dataclass
 from datetime import date
 
+# Valid ranges (inclusive); also applied column-wise by services.import_service
+STRESS_LEVEL_RANGE = (1, 5)
+SLEEP_HOURS_RANGE = (0, 24)
 
-@dataclass
+
+@dataclass(slots=True)
 class WellbeingRecord:
     record_id: int
     student_id: int
@@ -15,9 +19,9 @@ class WellbeingRecord:
         # Data Validation Logic
         
         # Stress level must be between 1 and 5
-        if not (1 <= self.stress_level <= 5):
+        if not (STRESS_LEVEL_RANGE[0] <= self.stress_level <= STRESS_LEVEL_RANGE[1]):
             raise ValueError(f"Stress level must be between 1 and 5, got {self.stress_level}")
 
         # Sleep hours must be between 0 and 24
-        if not (0 <= self.sleep_hours <= 24):
+        if not (SLEEP_HOURS_RANGE[0] <= self.sleep_hours <= SLEEP_HOURS_RANGE[1]):
             raise ValueError(f"Sleep hours must be between 0 and 24, got {self.sleep_hours}")
\ No newline at end of file
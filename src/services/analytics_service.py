@@ -1,29 +1,69 @@
+import logging
 import sqlite3
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Iterable, Optional, Sequence
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from database.audit import audited_view, get_audit_writer
+from database.connection_pool import get_pool
+from database.result_cache import cached_per_student, get_result_cache
+from models.ActionType import ActionType
+from services.chart_renderer import render_cohort_charts
+from services.report_generator import format_report, generate_cohort_reports
+from services.summary import cohort_summary_query, summary_from_row
+from utils.instrumentation import instrument_class
+
+logger = logging.getLogger(__name__)
+
+
+@instrument_class
 class AnalyticsService:
     def __init__(self, db_path: str = "student_wellbeing.db"):
         self.db_path = db_path
-        self.connection = sqlite3.connect(db_path)
-        self.connection.row_factory = sqlite3.Row
+        self._pool = get_pool(db_path)
+        self._pool.acquire()
+        # Shared with DatabaseHandler, whose writes invalidate the affected student
+        self._cache = get_result_cache(db_path)
+        self._audit = get_audit_writer(db_path)
+    
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """The calling thread's pooled connection (None once closed)"""
+        return self._pool.connection() if self._pool else None
     
+    def get_cohort_summary(self, student_ids: Optional[Iterable[int]] = None,
+                           module_code: Optional[str] = None) -> pd.DataFrame:
+        """Performance summary for many students in a single grouped query
+
+        Returns a DataFrame indexed by student_id with attendance_rate, average_stress,
+        average_sleep, average_grade and assignments_completed (plus the raw
+        total_classes/attended counts). With student_ids=None the whole students table
+        is summarised. module_code restricts attendance and coursework to one module.
+        Means are NaN for students with no matching records.
+        """
+        query, params = cohort_summary_query(student_ids, module_code)
+        cursor = self.connection.cursor()
+        cursor.execute(query, params)
+        columns = [description[0] for description in cursor.description]
+        summary = pd.DataFrame.from_records(
+            [tuple(row) for row in cursor.fetchall()], columns=columns
+        ).set_index('student_id')
+
+        means = ['average_stress', 'average_sleep', 'average_grade']
+        summary[means] = summary[means].astype(float)
+        total = summary['total_classes'].astype(float)
+        summary['attendance_rate'] = (summary['attended'] / total.where(total > 0) * 100).fillna(0.0)
+        self._audit.record(ActionType.VIEW, 'student_summary', None,
+                           f"cohort of {len(summary)} students" + (f" in {module_code}" if module_code else ""))
+        return summary[['attendance_rate', 'average_stress', 'average_sleep', 'average_grade',
+                        'assignments_completed', 'total_classes', 'attended']]
+
     def calculate_average_attendance(self, student_id: int) -> float:
         """Calculate average attendance percentage for a student"""
-        cursor = self.connection.cursor()
-        cursor.execute('''
-            SELECT COUNT(*) as total, 
-                   SUM(CASE WHEN status = 'Present' THEN 1 ELSE 0 END) as present
-            FROM attendance 
-            WHERE student_id = ?
-        ''', (student_id,))
-        
-        result = cursor.fetchone()
-        if result['total'] > 0:
-            return (result['present'] / result['total']) * 100
-        return 0.0
+        return self.get_student_performance_summary(student_id)['attendance_rate']
     
+    @audited_view('wellbeing_surveys')
+    @cached_per_student
     def get_stress_trends(self, student_id: int) -> List[Dict]:
         """Get stress level trends over time for a student"""
         cursor = self.connection.cursor()
@@ -36,6 +76,8 @@ class AnalyticsService:
         
         return [dict(row) for row in cursor.fetchall()]
     
+    @audited_view('wellbeing_surveys')
+    @cached_per_student
     def identify_high_stress_weeks(self, student_id: int, threshold: int = 4) -> List[Dict]:
         """Identify weeks where stress level is above threshold"""
         cursor = self.connection.cursor()
@@ -48,48 +90,22 @@ class AnalyticsService:
         
         return [dict(row) for row in cursor.fetchall()]
     
+    @audited_view('student_summary')
+    @cached_per_student
     def get_student_performance_summary(self, student_id: int) -> Dict:
         """Get comprehensive performance summary for a student"""
+        # Same grouped query as get_cohort_summary, read straight from the row:
+        # building a one-row DataFrame would cost more than the query itself
+        query, params = cohort_summary_query([student_id])
         cursor = self.connection.cursor()
-        
-        # Attendance summary
-        cursor.execute('''
-            SELECT COUNT(*) as total_classes,
-                   SUM(CASE WHEN status = 'Present' THEN 1 ELSE 0 END) as attended
-            FROM attendance WHERE student_id = ?
-        ''', (student_id,))
-        attendance = cursor.fetchone()
-        
-        # Wellbeing summary
-        cursor.execute('''
-            SELECT AVG(stress_level) as avg_stress,
-                   AVG(hours_slept) as avg_sleep
-            FROM wellbeing_surveys WHERE student_id = ?
-        ''', (student_id,))
-        wellbeing = cursor.fetchone()
-        
-        # Coursework summary
-        cursor.execute('''
-            SELECT COUNT(*) as total_assignments,
-                   AVG(grade) as avg_grade
-            FROM coursework 
-            WHERE student_id = ? AND grade IS NOT NULL
-        ''', (student_id,))
-        coursework = cursor.fetchone()
-        
-        return {
-            'attendance_rate': (attendance['attended'] / attendance['total_classes'] * 100) if attendance['total_classes'] > 0 else 0,
-            'average_stress': wellbeing['avg_stress'] or 0,
-            'average_sleep': wellbeing['avg_sleep'] or 0,
-            'average_grade': coursework['avg_grade'] or 0,
-            'assignments_completed': coursework['total_assignments'] or 0
-        }
+        cursor.execute(query, params)
+        return summary_from_row(cursor.fetchone())
     
-    def plot_stress_over_time(self, student_id: int):
+    def plot_stress_over_time(self, student_id: int, show: bool = True):
         """Generate stress level visualization over time"""
         trends = self.get_stress_trends(student_id)
         if not trends:
-            print("No survey data available for this student")
+            logger.warning("No survey data available for student %s", student_id)
             return
         
         weeks = [item['week_number'] for item in trends]
@@ -115,9 +131,12 @@ class AnalyticsService:
         
         plt.tight_layout()
         plt.savefig(f'student_{student_id}_wellbeing.png')
-        plt.show()
+        if show:
+            plt.show()
+        else:
+            plt.close(fig)
     
-    def plot_attendance_trend(self, student_id: int):
+    def plot_attendance_trend(self, student_id: int, show: bool = True):
         """Generate attendance trend visualization"""
         cursor = self.connection.cursor()
         cursor.execute('''
@@ -131,14 +150,15 @@ class AnalyticsService:
         ''', (student_id,))
         
         data = cursor.fetchall()
+        self._audit.record(ActionType.VIEW, 'attendance', student_id)
         if not data:
-            print("No attendance data available for this student")
+            logger.warning("No attendance data available for student %s", student_id)
             return
         
         weeks = [item['week_number'] for item in data]
         attendance_rates = [(item['present'] / item['total']) * 100 for item in data]
         
-        plt.figure(figsize=(10, 6))
+        fig = plt.figure(figsize=(10, 6))
         plt.plot(weeks, attendance_rates, marker='o', color='green', linewidth=2)
         plt.title(f'Attendance Rate Over Time - Student {student_id}')
         plt.xlabel('Week Number')
@@ -148,31 +168,46 @@ class AnalyticsService:
         
         plt.tight_layout()
         plt.savefig(f'student_{student_id}_attendance.png')
-        plt.show()
+        if show:
+            plt.show()
+        else:
+            plt.close(fig)
+    
+    def render_cohort_charts(self, student_ids: Optional[Iterable[int]] = None, output_dir: str = "charts",
+                             workers: Optional[int] = None, pdf_path: Optional[str] = None) -> Dict:
+        """Headless batch version of the plot_* methods for many students at once
+
+        See chart_renderer.render_cohort_charts; returns its timing statistics.
+        """
+        return render_cohort_charts(self.db_path, student_ids, output_dir, workers, pdf_path)
     
-    def generate_wellbeing_report(self, student_id: int):
+    def generate_cohort_reports(self, student_ids: Optional[Iterable[int]] = None, workers: Optional[int] = None,
+                                output_dir: str = "reports", formats: Sequence[str] = ('txt', 'json', 'pdf'),
+                                progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+        """generate_wellbeing_report for many students at once, written to output_dir
+
+        See report_generator.generate_cohort_reports; returns its throughput statistics.
+        """
+        return generate_cohort_reports(self.db_path, student_ids, output_dir, workers, formats, progress)
+
+    def generate_wellbeing_report(self, student_id: int, show_plots: bool = True):
         """Generate a comprehensive wellbeing report"""
         summary = self.get_student_performance_summary(student_id)
         high_stress_weeks = self.identify_high_stress_weeks(student_id)
         
-        print(f"\n📊 Wellbeing Report - Student {student_id}")
-        print("=" * 40)
-        print(f"Attendance Rate: {summary['attendance_rate']:.1f}%")
-        print(f"Average Stress Level: {summary['average_stress']:.1f}/5")
-        print(f"Average Sleep: {summary['average_sleep']:.1f} hours")
-        print(f"Average Grade: {summary['average_grade']:.1f}%")
-        print(f"Assignments Completed: {summary['assignments_completed']}")
-        
-        if high_stress_weeks:
-            print(f"\n⚠️  High Stress Weeks ({len(high_stress_weeks)}):")
-            for week in high_stress_weeks:
-                print(f"  Week {week['week_number']}: Stress {week['stress_level']}/5, Sleep {week['hours_slept']} hours")
+        print("\n" + format_report(student_id, summary, high_stress_weeks), end="")
         
         # Generate visualizations
-        self.plot_stress_over_time(student_id)
-        self.plot_attendance_trend(student_id)
+        self.plot_stress_over_time(student_id, show_plots)
+        self.plot_attendance_trend(student_id, show_plots)
+    
+    def cache_stats(self) -> Dict:
+        """Hit/miss/eviction statistics of the shared result cache"""
+        return self._cache.stats()
     
     def close(self):
         """Close database connection"""
-        if self.connection:
-            self.connection.close()
\ No newline at end of file
+        if self._pool:
+            self._audit.flush()
+            self._pool.release()
+            self._pool = None
\ No newline at end of file
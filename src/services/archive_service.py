@@ -0,0 +1,241 @@
+import logging
+import os
+import re
+import sqlite3
+from datetime import date
+from typing import Dict, List, Optional
+
+from database.audit import get_audit_writer
+from database.connection_pool import get_pool
+from database.listeners import get_listeners
+from database.result_cache import get_result_cache
+from models.ActionType import ActionType
+from utils.instrumentation import instrument_class
+
+logger = logging.getLogger(__name__)
+
+# Archived tables: key column and the date column that decides a row's term
+# (a row without a date counts as older than any cut-off, see _before)
+ARCHIVED_TABLES = {
+    'attendance': ('attendance_id', 'date_recorded'),
+    'wellbeing_surveys': ('survey_id', 'survey_date'),
+}
+
+# Same columns as the live tables, without the triggers and constraints
+ARCHIVE_SCHEMA = {
+    'attendance': """
+        attendance_id INTEGER PRIMARY KEY,
+        student_id INTEGER,
+        week_number INTEGER,
+        module_code TEXT,
+        status TEXT,
+        date_recorded DATE""",
+    'wellbeing_surveys': """
+        survey_id INTEGER PRIMARY KEY,
+        student_id INTEGER,
+        week_number INTEGER,
+        stress_level INTEGER,
+        hours_slept REAL,
+        additional_notes TEXT,
+        survey_date DATE""",
+}
+
+# TEMP views over the live table plus every attached archive
+HISTORY_VIEWS = {
+    'attendance': 'attendance_history',
+    'wellbeing_surveys': 'wellbeing_surveys_history',
+}
+
+_TERM_NAME = re.compile(r"[A-Za-z0-9_]+")
+
+
+def _schema(term: str) -> str:
+    return f"archive_{term}"
+
+
+def _before(date_column: str) -> str:
+    """Condition selecting rows dated before the bound cut-off, undated rows included
+
+    NULL < ? is never true, so undated rows would otherwise stay live forever.
+    They can only be legacy rows written without a date, so the next closed
+    term takes them.
+    """
+    return f"COALESCE({date_column}, '') < ?"
+
+
+@instrument_class
+class ArchiveService:
+    """Moves closed terms out of the live attendance and survey tables
+
+    archive_term() moves every row dated before a cut-off into its own SQLite
+    file, so the live tables (and the trigger-maintained aggregates, the
+    analytics and the exports built on them) only hold the current term.
+    Archives are listed in the archive_terms table and attached on demand,
+    with TEMP views attendance_history and wellbeing_surveys_history that
+    union the live table with every archive for historic queries.
+
+    SQLite attaches at most 10 databases per connection by default, so
+    archive whole academic years rather than individual weeks.
+    """
+
+    def __init__(self, db_path: str = "student_wellbeing.db", archive_dir: Optional[str] = None):
+        self.db_path = db_path
+        self.archive_dir = archive_dir or os.path.dirname(os.path.abspath(db_path))
+        self._cache = get_result_cache(db_path)
+        self._listeners = get_listeners(db_path)
+        self._audit = get_audit_writer(db_path)
+        self._pool = get_pool(db_path)
+        self._pool.acquire()
+
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """The calling thread's pooled connection (None once closed)"""
+        return self._pool.connection() if self._pool else None
+
+    def close(self):
+        """Detach the archives and release the pooled database connection"""
+        if self._pool:
+            conn = self.connection
+            for view in HISTORY_VIEWS.values():
+                conn.execute(f"DROP VIEW IF EXISTS temp.{view}")
+            for schema in self._attached(conn):
+                conn.execute(f"DETACH DATABASE {schema}")
+            self._audit.flush()
+            self._pool.release()
+            self._pool = None
+
+    def _archive_path(self, stored_path: str) -> str:
+        # Catalog paths are relative to the live database, so both can move together
+        base = os.path.dirname(os.path.abspath(self.db_path))
+        return os.path.normpath(os.path.join(base, stored_path))
+
+    @staticmethod
+    def _attached(conn: sqlite3.Connection) -> List[str]:
+        return [row[1] for row in conn.execute("PRAGMA database_list") if row[1].startswith("archive_")]
+
+    def _attach(self, conn: sqlite3.Connection, term: str, path: str):
+        schema = _schema(term)
+        if schema not in self._attached(conn):
+            conn.execute("ATTACH DATABASE ? AS " + schema, (path,))
+        for table, columns in ARCHIVE_SCHEMA.items():
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {schema}.{table} ({columns})")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_{table}_student "
+                         f"ON {table} (student_id, week_number)")
+
+    def _create_history_views(self, conn: sqlite3.Connection, terms: List[str]):
+        for table, view in HISTORY_VIEWS.items():
+            parts = [f"SELECT *, NULL AS term FROM main.{table}"]
+            parts += [f"SELECT *, '{term}' AS term FROM {_schema(term)}.{table}" for term in terms]
+            conn.execute(f"DROP VIEW IF EXISTS temp.{view}")
+            conn.execute(f"CREATE TEMP VIEW {view} AS " + " UNION ALL ".join(parts))
+
+    def attach(self) -> sqlite3.Connection:
+        """Attach every archive to this thread's connection and (re)create the history views
+
+        Returns the connection, ready for ad-hoc historic queries against
+        attendance_history and wellbeing_surveys_history; rows from the live
+        tables have term NULL.
+        """
+        conn = self.connection
+        archives = conn.execute("SELECT term, path FROM archive_terms ORDER BY archived_before").fetchall()
+        for term, path in archives:
+            self._attach(conn, term, self._archive_path(path))
+        self._create_history_views(conn, [term for term, _ in archives])
+        return conn
+
+    def archive_term(self, term: str, before: str) -> Optional[Dict[str, int]]:
+        """Move attendance and surveys dated before `before` (YYYY-MM-DD) into the archive for term
+
+        Rows loaded by ImportService are dated by its recorded_on argument;
+        rows without any date are moved too.
+
+        Rows are copied and committed to the archive first, then deleted from
+        the live tables only if the archive holds them, so an interrupted run
+        never loses data and simply needs repeating. Archiving into an
+        existing term adds to it. Returns the rows moved per table, or None
+        on a database error.
+        """
+        if not _TERM_NAME.fullmatch(term):
+            raise ValueError(f"Term names may only use letters, digits and _, got {term!r}")
+        date.fromisoformat(before)
+
+        conn = self.connection
+        path = os.path.join(self.archive_dir, f"{os.path.splitext(os.path.basename(self.db_path))[0]}_{term}.db")
+        schema = _schema(term)
+        try:
+            os.makedirs(self.archive_dir, exist_ok=True)
+            self._attach(conn, term, path)
+            conn.commit()
+
+            conn.execute("BEGIN IMMEDIATE")
+            for table, (_, date_column) in ARCHIVED_TABLES.items():
+                conn.execute(f"INSERT OR IGNORE INTO {schema}.{table} "
+                             f"SELECT * FROM main.{table} WHERE {_before(date_column)}", (before,))
+            conn.commit()
+
+            conn.execute("BEGIN IMMEDIATE")
+            student_ids = [row[0] for row in conn.execute(
+                " UNION ".join(f"SELECT student_id FROM main.{table} WHERE {_before(date_column)}"
+                               for table, (_, date_column) in ARCHIVED_TABLES.items()),
+                (before,) * len(ARCHIVED_TABLES)
+            )]
+            moved = {}
+            for table, (key, date_column) in ARCHIVED_TABLES.items():
+                moved[table] = conn.execute(
+                    f"DELETE FROM main.{table} WHERE {_before(date_column)} "
+                    f"AND {key} IN (SELECT {key} FROM {schema}.{table})", (before,)
+                ).rowcount
+            conn.execute("""
+                INSERT INTO archive_terms (term, path, archived_before, attendance_rows, survey_rows)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(term) DO UPDATE SET
+                    archived_before = MAX(archived_before, excluded.archived_before),
+                    attendance_rows = attendance_rows + excluded.attendance_rows,
+                    survey_rows = survey_rows + excluded.survey_rows,
+                    archived_at = CURRENT_TIMESTAMP
+            """, (term, os.path.relpath(path, os.path.dirname(os.path.abspath(self.db_path))), before,
+                  moved['attendance'], moved['wellbeing_surveys']))
+            conn.commit()
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            logger.error("❌ Error archiving term %s: %s", term, e)
+            return None
+
+        self._cache.invalidate_students(student_ids)
+        self._listeners.students_changed(student_ids)
+        self._audit.record(ActionType.UPDATE, 'archive_terms', term,
+                           f"{moved['attendance']} attendance, {moved['wellbeing_surveys']} surveys before {before}")
+        self.attach()
+        logger.info("✅ Archived %s attendance records and %s surveys before %s into %s",
+                    moved['attendance'], moved['wellbeing_surveys'], before, path)
+        return moved
+
+    def list_archives(self) -> List[Dict]:
+        """Archived terms, oldest first"""
+        try:
+            rows = self.connection.execute("SELECT * FROM archive_terms ORDER BY archived_before").fetchall()
+            return [dict(row) for row in rows]
+        except sqlite3.Error as e:
+            logger.error("❌ Error listing archives: %s", e)
+            return []
+
+    def _history(self, table: str, student_id: int, order_by: str) -> List[Dict]:
+        try:
+            rows = self.attach().execute(
+                f"SELECT * FROM {HISTORY_VIEWS[table]} WHERE student_id = ? ORDER BY {order_by}",
+                (student_id,)
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.error("❌ Error fetching %s history: %s", table, e)
+            return []
+        self._audit.record(ActionType.VIEW, HISTORY_VIEWS[table], student_id)
+        return [dict(row) for row in rows]
+
+    def get_attendance_history(self, student_id: int) -> List[Dict]:
+        """Live and archived attendance of a student, each row with its term (None = live)"""
+        return self._history('attendance', student_id, "date_recorded, week_number")
+
+    def get_survey_history(self, student_id: int) -> List[Dict]:
+        """Live and archived wellbeing surveys of a student, each row with its term (None = live)"""
+        return self._history('wellbeing_surveys', student_id, "survey_date, week_number")
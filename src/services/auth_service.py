@@ -1,17 +1,109 @@
+import csv
 import hashlib
+import hmac
+import logging
+import os
 import secrets
+import sqlite3
+import threading
 from typing import Dict, Optional
 
+from database.audit import get_audit_writer, set_actor
+from database.connection_pool import get_pool
+from database.result_cache import ResultCache
+from models.ActionType import ActionType
+from services.session_store import SessionStore, get_session_store
+from utils.instrumentation import instrument_class
+from utils.passwords import hash_password, needs_rehash, require_bcrypt, verify_password
+
+logger = logging.getLogger(__name__)
+
+# Successful logins are remembered this long, so signing in again skips the KDF
+CREDENTIAL_CACHE_TTL = 300.0
+CREDENTIAL_CACHE_SIZE = 1024
+
+ROLE_LEVELS = {'admin': 3, 'officer': 2, 'director': 1}
+
+# staff.csv roles mapped onto users.role
+STAFF_ROLES = {
+    'admin': 'admin',
+    'wellbeing_officer': 'officer',
+    'module_leader': 'director',
+    'course_director': 'director',
+}
+
+# Per-process key: cached credential digests are worthless outside this process
+_CACHE_KEY = secrets.token_bytes(32)
+_credential_caches: Dict[str, ResultCache] = {}
+_credential_caches_lock = threading.Lock()
+_dummy_hash = None
+
+
+def _credential_cache(db_path: str) -> ResultCache:
+    """Process-wide cache of recent successful logins for db_path"""
+    if db_path == ":memory:":
+        return ResultCache(CREDENTIAL_CACHE_SIZE, CREDENTIAL_CACHE_TTL)
+    key = os.path.abspath(db_path)
+    with _credential_caches_lock:
+        cache = _credential_caches.get(key)
+        if cache is None:
+            cache = _credential_caches[key] = ResultCache(CREDENTIAL_CACHE_SIZE, CREDENTIAL_CACHE_TTL)
+        return cache
+
+
+def _login_key(username: str):
+    return ('login', username, ())
+
+
+def _credential_digest(username: str, password: str) -> bytes:
+    return hmac.new(_CACHE_KEY, f"{username}\0{password}".encode(), hashlib.sha256).digest()
+
+
+def _burn_kdf(password: str):
+    """Verify against a throwaway hash so unknown usernames take as long as wrong passwords"""
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password(secrets.token_hex(16))
+    verify_password(password, _dummy_hash)
+
+@instrument_class
 class AuthService:
-    def __init__(self, db_path: str = "student_wellbeing.db"):
+    """Staff login, password management and role checks
+
+    login()/logout() keep the single current_user of interactive front ends
+    (and give it a session token, current_token). Servers handling many staff
+    use authenticate() to get a token per user and pass it to
+    has_permission()/logout(); tokens are checked against the session store
+    in memory, without touching the database.
+    """
+
+    def __init__(self, db_path: str = "student_wellbeing.db",
+                 session_store: Optional[SessionStore] = None):
         self.db_path = db_path
         self.current_user = None
+        self.current_token = None
+        self.sessions = session_store if session_store is not None else get_session_store(db_path)
+        self._credentials = _credential_cache(db_path)
+        self._audit = get_audit_writer(db_path)
+        self._pool = get_pool(db_path)
+        self._pool.acquire()
         self._create_users_table()
     
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """The calling thread's pooled connection (None once closed)"""
+        return self._pool.connection() if self._pool else None
+    
+    def close(self):
+        """Release the pooled database connection"""
+        if self._pool:
+            self._audit.flush()
+            self._pool.release()
+            self._pool = None
+    
     def _create_users_table(self):
         """Create users table if it doesn't exist"""
-        import sqlite3
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connection
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -31,7 +123,6 @@ class AuthService:
             self._create_default_users(cursor)
         
         conn.commit()
-        conn.close()
     
     def _create_default_users(self, cursor):
         """Create default users for the system"""
@@ -49,80 +140,135 @@ class AuthService:
             )
     
     def _hash_password(self, password: str) -> str:
-        """Hash password using SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Salted scrypt hash (see utils.passwords)"""
+        return hash_password(password)
     
+    def _verify_credentials(self, username: str, password: str) -> Optional[Dict]:
+        """The user for valid credentials, else None
+
+        Accepts scrypt, bcrypt (imported staff) and legacy SHA-256 hashes and
+        upgrades anything but current-cost scrypt on success. Repeating valid
+        credentials within CREDENTIAL_CACHE_TTL is answered from memory
+        without the database or the KDF.
+        """
+        key = _login_key(username)
+        digest = _credential_digest(username, password)
+        cached = self._credentials.get(key)
+        if cached is not None and hmac.compare_digest(cached[0], digest):
+            user = cached[1]
+        else:
+            cursor = self.connection.cursor()
+            cursor.execute(
+                "SELECT user_id, username, role, full_name, password_hash FROM users WHERE username = ?",
+                (username,)
+            )
+            row = cursor.fetchone()
+            if row is None:
+                _burn_kdf(password)
+            if row is None or not verify_password(password, row[4]):
+                logger.error("❌ Invalid username or password")
+                self._audit.record(ActionType.LOGIN, 'users', username, "failed", user_id=username)
+                return None
+
+            user = {
+                'user_id': row[0],
+                'username': row[1],
+                'role': row[2],
+                'full_name': row[3]
+            }
+            if needs_rehash(row[4]):
+                cursor.execute("UPDATE users SET password_hash = ? WHERE user_id = ?",
+                               (self._hash_password(password), row[0]))
+                self.connection.commit()
+                logger.info("🔐 Upgraded password hash for %s", username)
+            self._credentials.set(key, (digest, user))
+        return user
+
     def login(self, username: str, password: str) -> bool:
         """Authenticate user"""
-        import sqlite3
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        password_hash = self._hash_password(password)
-        cursor.execute(
-            "SELECT user_id, username, role, full_name FROM users WHERE username = ? AND password_hash = ?",
-            (username, password_hash)
-        )
-        
-        user = cursor.fetchone()
-        conn.close()
-        
-        if user:
-            self.current_user = {
-                'user_id': user[0],
-                'username': user[1],
-                'role': user[2],
-                'full_name': user[3]
-            }
-            print(f"✅ Welcome, {user[3]} ({user[2]})!")
-            return True
-        else:
-            print("❌ Invalid username or password")
+        user = self._verify_credentials(username, password)
+        if user is None:
             return False
+        self.current_user = user
+        self.current_token = self.sessions.create(user)
+        # Later audit entries from this front end are attributed to the signed-in user
+        set_actor(user['username'])
+        self._audit.record(ActionType.LOGIN, 'users', username)
+        logger.info("✅ Welcome, %s (%s)!", user['full_name'], user['role'])
+        return True
+
+    def authenticate(self, username: str, password: str) -> Optional[str]:
+        """Start a session for username and return its token (None if the credentials are wrong)
+
+        Does not change current_user, so one service can serve many users.
+        """
+        user = self._verify_credentials(username, password)
+        if user is None:
+            return None
+        self._audit.record(ActionType.LOGIN, 'users', username, "session", user_id=username)
+        return self.sessions.create(user)
+
+    def get_session_user(self, token: str) -> Optional[Dict]:
+        """User behind a session token, or None if it is invalid or expired"""
+        session = self.sessions.validate(token)
+        return dict(session.user) if session else None
     
-    def logout(self):
-        """Logout current user"""
+    def logout(self, token: Optional[str] = None):
+        """Logout current user, or end the session behind token"""
+        if token is not None:
+            session = self.sessions.validate(token)
+            if not self.sessions.revoke(token):
+                logger.error("❌ No such session")
+            elif session is not None:
+                self._audit.record(ActionType.LOGOUT, 'users', session.user['username'], "session",
+                                   user_id=session.user['username'])
+            if token == self.current_token:
+                self.current_user = self.current_token = None
+            return
         if self.current_user:
-            print(f"👋 Goodbye, {self.current_user['full_name']}!")
-            self.current_user = None
+            logger.info("👋 Goodbye, %s!", self.current_user['full_name'])
+            if self.current_token:
+                self.sessions.revoke(self.current_token)
+            self._audit.record(ActionType.LOGOUT, 'users', self.current_user['username'],
+                               user_id=self.current_user['username'])
+            set_actor(None)
+            self.current_user = self.current_token = None
         else:
-            print("❌ No user is currently logged in")
+            logger.error("❌ No user is currently logged in")
     
     def get_current_user(self) -> Optional[Dict]:
         """Get current logged in user information"""
         return self.current_user
     
-    def has_permission(self, required_role: str) -> bool:
-        """Check if current user has required role permissions"""
-        if not self.current_user:
+    def has_permission(self, required_role: str, token: Optional[str] = None) -> bool:
+        """Check if current user (or the session behind token) has required role permissions"""
+        if token is not None:
+            session = self.sessions.validate(token)
+            role = session.role if session else None
+        else:
+            role = self.current_user['role'] if self.current_user else None
+        if role is None:
             return False
         
-        role_hierarchy = {'admin': 3, 'officer': 2, 'director': 1}
-        current_role_level = role_hierarchy.get(self.current_user['role'], 0)
-        required_role_level = role_hierarchy.get(required_role, 0)
+        current_role_level = ROLE_LEVELS.get(role, 0)
+        required_role_level = ROLE_LEVELS.get(required_role, 0)
         
         return current_role_level >= required_role_level
     
     def change_password(self, current_password: str, new_password: str) -> bool:
         """Change current user's password"""
         if not self.current_user:
-            print("❌ No user is logged in")
+            logger.error("❌ No user is logged in")
             return False
         
-        import sqlite3
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connection
         cursor = conn.cursor()
         
         # Verify current password
-        current_hash = self._hash_password(current_password)
-        cursor.execute(
-            "SELECT user_id FROM users WHERE user_id = ? AND password_hash = ?",
-            (self.current_user['user_id'], current_hash)
-        )
-        
-        if not cursor.fetchone():
-            print("❌ Current password is incorrect")
-            conn.close()
+        cursor.execute("SELECT password_hash FROM users WHERE user_id = ?", (self.current_user['user_id'],))
+        row = cursor.fetchone()
+        if row is None or not verify_password(current_password, row[0]):
+            logger.error("❌ Current password is incorrect")
             return False
         
         # Update to new password
@@ -133,7 +279,48 @@ class AuthService:
         )
         
         conn.commit()
-        conn.close()
-        print("✅ Password changed successfully!")
+        # The old password must not keep working from the login cache or old sessions
+        self._credentials.invalidate(_login_key(self.current_user['username']))
+        self.sessions.revoke_user(self.current_user['user_id'])
+        self.current_token = self.sessions.create(self.current_user)
+        self._audit.record(ActionType.UPDATE, 'users', self.current_user['username'], "password changed",
+                           user_id=self.current_user['username'])
+        logger.info("✅ Password changed successfully!")
         return True
-    
\ No newline at end of file
+
+    def import_staff(self, csv_path: str = "staff.csv") -> Dict[str, int]:
+        """Create or update users from a staff CSV (staff_id, first_name, last_name, email, role, password)
+
+        The username is the lower-cased email and password holds a bcrypt hash,
+        which login verifies and upgrades to scrypt. Without the bcrypt
+        package nobody imported could sign in, so ImportError is raised before
+        anything is written. Existing users get their name and role refreshed
+        but keep their password, so re-importing never undoes a password
+        change. Rows with an unknown role are skipped.
+        """
+        require_bcrypt()
+        counts = {'created': 0, 'updated': 0, 'skipped': 0}
+        cursor = self.connection.cursor()
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                role = STAFF_ROLES.get(row['role'].strip().lower())
+                if role is None:
+                    logger.warning("⚠️ Skipping %s: unknown role %s", row['staff_id'], row['role'])
+                    counts['skipped'] += 1
+                    continue
+                username = row['email'].strip().lower()
+                full_name = f"{row['first_name'].strip()} {row['last_name'].strip()}"
+                cursor.execute("SELECT 1 FROM users WHERE username = ?", (username,))
+                exists = cursor.fetchone() is not None
+                cursor.execute("""
+                    INSERT INTO users (username, password_hash, role, full_name) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(username) DO UPDATE SET role = excluded.role, full_name = excluded.full_name
+                """, (username, row['password'].strip(), role, full_name))
+                counts['updated' if exists else 'created'] += 1
+                self._credentials.invalidate(_login_key(username))
+        self.connection.commit()
+        self._audit.record(ActionType.IMPORT, 'users', csv_path,
+                           ", ".join(f"{count} {outcome}" for outcome, count in counts.items()))
+        logger.info("✅ Imported staff from %s: %s created, %s updated, %s skipped",
+                    csv_path, counts['created'], counts['updated'], counts['skipped'])
+        return counts
@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Figure is used directly (no pyplot), so rendering is always headless on the Agg
+# canvas and never opens windows or touches the process-wide backend
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_pdf import PdfPages
+
+from database.connection_pool import open_read_only
+
+logger = logging.getLogger(__name__)
+
+# Students handed to a worker process per task
+DEFAULT_CHUNK_SIZE = 50
+
+
+def _fetch_chart_data(conn, student_ids: List[int]) -> Tuple[Dict, Dict]:
+    """Survey and weekly attendance series for many students in two queries"""
+    ids = json.dumps(student_ids)
+    surveys = {student_id: [] for student_id in student_ids}
+    for row in conn.execute('''
+        SELECT student_id, week_number, stress_level, hours_slept
+        FROM wellbeing_surveys
+        WHERE student_id IN (SELECT value FROM json_each(?))
+        ORDER BY student_id, week_number
+    ''', (ids,)):
+        surveys[row['student_id']].append((row['week_number'], row['stress_level'], row['hours_slept']))
+
+    attendance = {student_id: [] for student_id in student_ids}
+    for row in conn.execute('''
+        SELECT student_id, week_number,
+               SUM(CASE WHEN status = 'Present' THEN 1 ELSE 0 END) * 100.0 / COUNT(*) AS rate
+        FROM attendance
+        WHERE student_id IN (SELECT value FROM json_each(?))
+        GROUP BY student_id, week_number
+        ORDER BY student_id, week_number
+    ''', (ids,)):
+        attendance[row['student_id']].append((row['week_number'], row['rate']))
+    return surveys, attendance
+
+
+class ChartRenderer:
+    """Draws the per-student charts, reusing the same two figures for every student"""
+
+    def __init__(self, dpi: int = 100):
+        self.dpi = dpi
+        self.wellbeing_figure = Figure(figsize=(10, 8))
+        self.stress_axes, self.sleep_axes = self.wellbeing_figure.subplots(2, 1)
+        self.attendance_figure = Figure(figsize=(10, 6))
+        self.attendance_axes = self.attendance_figure.subplots()
+
+    def draw_wellbeing(self, student_id: int, series: List[Tuple]) -> Figure:
+        weeks = [week for week, _, _ in series]
+        ax1, ax2 = self.stress_axes, self.sleep_axes
+        ax1.cla()
+        ax2.cla()
+
+        ax1.plot(weeks, [stress for _, stress, _ in series], marker='o', color='red', linewidth=2)
+        ax1.set_title(f'Stress Levels Over Time - Student {student_id}')
+        ax1.set_xlabel('Week Number')
+        ax1.set_ylabel('Stress Level (1-5)')
+        ax1.grid(True)
+        ax1.set_ylim(1, 5)
+
+        ax2.plot(weeks, [sleep for _, _, sleep in series], marker='s', color='blue', linewidth=2)
+        ax2.set_title(f'Sleep Hours Over Time - Student {student_id}')
+        ax2.set_xlabel('Week Number')
+        ax2.set_ylabel('Hours Slept')
+        ax2.grid(True)
+
+        self.wellbeing_figure.tight_layout()
+        return self.wellbeing_figure
+
+    def draw_attendance(self, student_id: int, series: List[Tuple]) -> Figure:
+        ax = self.attendance_axes
+        ax.cla()
+        ax.plot([week for week, _ in series], [rate for _, rate in series],
+                marker='o', color='green', linewidth=2)
+        ax.set_title(f'Attendance Rate Over Time - Student {student_id}')
+        ax.set_xlabel('Week Number')
+        ax.set_ylabel('Attendance Rate (%)')
+        ax.grid(True)
+        ax.set_ylim(0, 100)
+
+        self.attendance_figure.tight_layout()
+        return self.attendance_figure
+
+    def render_student(self, student_id: int, surveys: List[Tuple], attendance: List[Tuple],
+                       output_dir: str = None, pdf: PdfPages = None) -> List[str]:
+        """Write whichever charts have data, as PNGs in output_dir or as pages of pdf"""
+        written = []
+        charts = (('wellbeing', surveys, self.draw_wellbeing),
+                  ('attendance', attendance, self.draw_attendance))
+        for name, series, draw in charts:
+            if not series:
+                continue
+            figure = draw(student_id, series)
+            if pdf is not None:
+                pdf.savefig(figure)
+                written.append(f"{name}:{student_id}")
+            else:
+                path = os.path.join(output_dir, f'student_{student_id}_{name}.png')
+                figure.savefig(path, dpi=self.dpi)
+                written.append(path)
+        return written
+
+
+def _render_chunk(db_path: str, student_ids: List[int], output_dir: str, dpi: int) -> Dict:
+    """Worker entry point: render PNGs for a chunk of students over a read-only connection"""
+    started = time.perf_counter()
+    renderer = ChartRenderer(dpi)
+    conn = open_read_only(db_path)
+    files, failures = [], {}
+    try:
+        surveys, attendance = _fetch_chart_data(conn, student_ids)
+        for student_id in student_ids:
+            try:
+                files.extend(renderer.render_student(student_id, surveys[student_id],
+                                                     attendance[student_id], output_dir))
+            except Exception as e:  # one bad student must not sink the chunk
+                failures[student_id] = str(e)
+    finally:
+        conn.close()
+    return {'files': files, 'failures': failures, 'seconds': time.perf_counter() - started}
+
+
+def _all_student_ids(db_path: str) -> List[int]:
+    conn = open_read_only(db_path)
+    try:
+        return [row[0] for row in conn.execute("SELECT student_id FROM students ORDER BY student_id")]
+    finally:
+        conn.close()
+
+
+def render_cohort_charts(db_path: str, student_ids: Optional[Iterable[int]] = None,
+                         output_dir: str = "charts", workers: Optional[int] = None,
+                         pdf_path: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                         dpi: int = 100) -> Dict:
+    """Render wellbeing and attendance charts for a whole cohort without any GUI
+
+    PNGs are rendered across a process pool (workers=None uses one per CPU), each
+    worker reusing its figures across students. With pdf_path everything goes
+    into a single multi-page PDF instead, rendered in-process in one pass.
+    A student whose charts fail, or whose whole chunk fails, is listed in
+    failures with the error and the others carry on. Returns timing
+    statistics and those failures.
+    """
+    started = time.perf_counter()
+    student_ids = _all_student_ids(db_path) if student_ids is None else list(student_ids)
+    files, failures, render_seconds = [], {}, 0.0
+
+    if pdf_path:
+        renderer = ChartRenderer(dpi)
+        conn = open_read_only(db_path)
+        try:
+            with PdfPages(pdf_path) as pdf:
+                for start in range(0, len(student_ids), chunk_size):
+                    chunk = student_ids[start:start + chunk_size]
+                    surveys, attendance = _fetch_chart_data(conn, chunk)
+                    for student_id in chunk:
+                        try:
+                            files.extend(renderer.render_student(
+                                student_id, surveys[student_id], attendance[student_id], pdf=pdf))
+                        except Exception as e:
+                            failures[student_id] = str(e)
+        finally:
+            conn.close()
+        render_seconds = time.perf_counter() - started
+    else:
+        os.makedirs(output_dir, exist_ok=True)
+        chunks = [student_ids[start:start + chunk_size] for start in range(0, len(student_ids), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_render_chunk, db_path, chunk, output_dir, dpi): chunk
+                       for chunk in chunks}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:  # the chunk's query or its worker process failed
+                    logger.error("❌ Error rendering charts for %s students: %s", len(chunk), e)
+                    result = {'files': [], 'failures': {student_id: f"{type(e).__name__}: {e}"
+                                                        for student_id in chunk}, 'seconds': 0.0}
+                files.extend(result['files'])
+                failures.update(result['failures'])
+                render_seconds += result['seconds']
+
+    elapsed = time.perf_counter() - started
+    if failures:
+        logger.warning("⚠️ Charts failed for %s of %s students", len(failures), len(student_ids))
+    return {
+        'students': len(student_ids),
+        'charts': len(files),
+        'failures': failures,
+        'output': pdf_path or output_dir,
+        'elapsed_seconds': round(elapsed, 3),
+        'render_seconds': round(render_seconds, 3),
+        'seconds_per_chart': round(render_seconds / len(files), 4) if files else 0.0,
+        'charts_per_second': round(len(files) / elapsed, 2) if elapsed > 0 else 0.0,
+    }
@@ -0,0 +1,347 @@
+import json
+import logging
+import math
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from database.connection_pool import get_pool
+from database.listeners import WriteListener, get_listeners
+from utils.instrumentation import instrument_class
+
+logger = logging.getLogger(__name__)
+
+# Per-student value of each metric is binned onto a fixed grid: (lowest, highest, step).
+# Percentile ranks and quantiles are exact to within one step.
+METRIC_BINS = {
+    'stress': (1.0, 5.0, 0.1),         # average stress on the 1-5 scale
+    'sleep': (0.0, 24.0, 0.25),        # average hours slept
+    'attendance': (0.0, 100.0, 1.0),   # attendance rate in percent
+    'grade': (0.0, 100.0, 1.0),        # average coursework grade
+}
+
+# Layout of a student's running totals
+STRESS_SUM, STRESS_N, SLEEP_SUM, SLEEP_N, PRESENT, TOTAL, GRADE_SUM, GRADE_N = range(8)
+_FIELDS = 8
+
+
+class _Fenwick:
+    """Binary indexed tree of bucket counts: update, prefix sum and rank search in O(log n)"""
+
+    __slots__ = ('size', 'tree')
+
+    def __init__(self, size: int):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def add(self, index: int, delta: int):
+        index += 1
+        while index <= self.size:
+            self.tree[index] += delta
+            index += index & -index
+
+    def prefix(self, index: int) -> int:
+        """Total count of buckets 0..index-1"""
+        total = 0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+    def search(self, rank: int) -> int:
+        """Smallest bucket whose cumulative count reaches rank (1-based)"""
+        position, step = 0, 1 << self.size.bit_length()
+        while step:
+            following = position + step
+            if following <= self.size and self.tree[following] < rank:
+                position = following
+                rank -= self.tree[following]
+            step >>= 1
+        return position
+
+
+class _Distribution:
+    """Students binned by their value of one metric"""
+
+    __slots__ = ('low', 'step', 'counts', 'buckets', 'placed', 'size')
+
+    def __init__(self, low: float, high: float, step: float):
+        self.low = low
+        self.step = step
+        buckets = round((high - low) / step) + 1
+        self.counts = _Fenwick(buckets)
+        self.buckets: List[Dict[int, float]] = [{} for _ in range(buckets)]
+        self.placed: Dict[int, int] = {}
+        self.size = 0
+
+    def _bucket(self, value: float) -> int:
+        return min(max(round((value - self.low) / self.step), 0), len(self.buckets) - 1)
+
+    def value_of(self, bucket: int) -> float:
+        return round(self.low + bucket * self.step, 2)
+
+    def place(self, student_id: int, value: Optional[float]):
+        """Move student_id to the bucket of value (None removes them)"""
+        old = self.placed.pop(student_id, None)
+        if old is not None:
+            del self.buckets[old][student_id]
+            self.counts.add(old, -1)
+            self.size -= 1
+        if value is not None:
+            bucket = self._bucket(value)
+            self.buckets[bucket][student_id] = value
+            self.placed[student_id] = bucket
+            self.counts.add(bucket, 1)
+            self.size += 1
+
+    def percentile_rank(self, student_id: int) -> Optional[float]:
+        bucket = self.placed.get(student_id)
+        if bucket is None:
+            return None
+        below = self.counts.prefix(bucket)
+        # Ties (the student's bucket) count half, so the median student sits at 50
+        return round((below + 0.5 * len(self.buckets[bucket])) / self.size * 100, 2)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.size:
+            return None
+        rank = min(max(math.ceil(q * self.size), 1), self.size)
+        return self.value_of(self.counts.search(rank))
+
+    def extremes(self, k: int, highest: bool) -> List[Tuple[int, float]]:
+        """k students with the highest (or lowest) values, visiting at most every bucket once"""
+        found = []
+        order = range(len(self.buckets) - 1, -1, -1) if highest else range(len(self.buckets))
+        for bucket in order:
+            members = self.buckets[bucket]
+            if members:
+                found.extend(sorted(members.items(), key=lambda item: (-item[1] if highest else item[1], item[0])))
+                if len(found) >= k:
+                    break
+        return [(student_id, round(value, 2)) for student_id, value in found[:k]]
+
+
+def _metric_values(totals: Sequence[float]) -> Dict[str, Optional[float]]:
+    """Each metric's per-student value from running totals (None where there is no data)"""
+    def mean(total, count):
+        return total / count if count else None
+
+    return {
+        'stress': mean(totals[STRESS_SUM], totals[STRESS_N]),
+        'sleep': mean(totals[SLEEP_SUM], totals[SLEEP_N]),
+        'attendance': mean(totals[PRESENT] * 100, totals[TOTAL]),
+        'grade': mean(totals[GRADE_SUM], totals[GRADE_N]),
+    }
+
+
+@instrument_class
+class DistributionService(WriteListener):
+    """Where a student sits in the cohort on stress, sleep, attendance and grade
+
+    Every student's running totals are loaded once (from the trigger-maintained
+    aggregates) and each metric is kept as a fixed-bucket histogram indexed by
+    a Fenwick tree. A percentile rank or quantile costs O(log buckets) and
+    top/bottom-k visits at most every bucket once, independent of the number of
+    students. As a write listener, new surveys, attendance and coursework
+    written through DatabaseHandler move just the students concerned between
+    buckets; updates, deletes and imports mark the students for reloading,
+    which happens in one query before the next read.
+    """
+
+    def __init__(self, db_path: str = "student_wellbeing.db"):
+        self.db_path = db_path
+        self._totals: Dict[int, List[float]] = {}
+        self._distributions: Optional[Dict[str, _Distribution]] = None
+        self._stale = set()
+        # Sequence number of the last commit the totals already count: the
+        # full load's, or a later partial load's for the students it reloaded
+        self._loaded_at = 0
+        self._reloaded_at: Dict[int, int] = {}
+        self._lock = threading.RLock()
+        self._pool = get_pool(db_path)
+        self._pool.acquire()
+        self._listeners = get_listeners(db_path)
+        self._listeners.add(self)
+
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """The calling thread's pooled connection (None once closed)"""
+        return self._pool.connection() if self._pool else None
+
+    def close(self):
+        """Stop listening for writes and release the pooled database connection"""
+        self._listeners.remove(self)
+        if self._pool:
+            self._pool.release()
+            self._pool = None
+        with self._lock:
+            self._totals.clear()
+            self._reloaded_at.clear()
+            self._distributions = None
+
+    # Write listener hooks
+    def _apply(self, rows, sequence, deltas):
+        with self._lock:
+            if self._distributions is None:
+                return  # Nothing loaded yet; the first read loads everything
+            touched = set()
+            for row in rows:
+                student_id = row[0]
+                if sequence is not None and sequence <= self._reloaded_at.get(student_id, self._loaded_at):
+                    continue  # Committed before the load that read this student
+                totals = self._totals.setdefault(student_id, [0.0] * _FIELDS)
+                for field, value in deltas(row):
+                    totals[field] += value
+                touched.add(student_id)
+            self._place(touched)
+
+    def on_surveys(self, surveys, sequence=None):
+        self._apply(surveys, sequence, lambda row: (
+            (STRESS_SUM, row[2] or 0), (STRESS_N, row[2] is not None),
+            (SLEEP_SUM, row[3] or 0), (SLEEP_N, row[3] is not None)))
+
+    def on_attendance(self, records, sequence=None):
+        self._apply(records, sequence, lambda row: ((PRESENT, row[3] == 'Present'), (TOTAL, 1)))
+
+    def on_coursework(self, coursework, sequence=None):
+        self._apply(coursework, sequence, lambda row: ((GRADE_SUM, row[3] or 0), (GRADE_N, row[3] is not None)))
+
+    def on_students_changed(self, student_ids):
+        with self._lock:
+            if self._distributions is not None:
+                self._stale.update(student_ids)
+
+    # Loading
+    def _place(self, student_ids: Iterable[int]):
+        for student_id in student_ids:
+            totals = self._totals.get(student_id)
+            values = _metric_values(totals) if totals else dict.fromkeys(METRIC_BINS)
+            for metric, value in values.items():
+                self._distributions[metric].place(student_id, value)
+
+    def _load(self, student_ids: Optional[Iterable[int]] = None):
+        """(Re)load running totals from the aggregate tables, for everyone or just student_ids"""
+        if student_ids is None:
+            cohort, params = "SELECT student_id FROM students", []
+        else:
+            cohort = ("SELECT student_id FROM students WHERE student_id IN "
+                      "(SELECT CAST(value AS INTEGER) FROM json_each(?))")
+            params = [json.dumps([int(student_id) for student_id in student_ids])]
+        cursor = self.connection.cursor()
+        cursor.row_factory = None
+        with self._listeners.snapshot() as sequence:
+            cursor.execute(f"""
+                WITH cohort(student_id) AS ({cohort})
+                SELECT c.student_id, w.stress_sum, w.stress_count, w.sleep_sum, w.sleep_count,
+                       a.present_count, a.total_count, g.grade_sum, g.grade_count
+                FROM cohort c
+                LEFT JOIN student_wellbeing_stats w ON w.student_id = c.student_id
+                LEFT JOIN student_attendance_stats a ON a.student_id = c.student_id
+                LEFT JOIN (
+                    SELECT student_id, SUM(grade) AS grade_sum, COUNT(*) AS grade_count
+                    FROM coursework
+                    WHERE grade IS NOT NULL AND student_id IN (SELECT student_id FROM cohort)
+                    GROUP BY student_id
+                ) g ON g.student_id = c.student_id
+            """, params)
+            rows = cursor.fetchall()
+
+        if student_ids is None:
+            self._totals = {}
+            self._distributions = {metric: _Distribution(*bins) for metric, bins in METRIC_BINS.items()}
+            self._stale.clear()
+            self._loaded_at = sequence
+            self._reloaded_at.clear()
+        else:
+            # Deleted students come back without a row and leave every distribution
+            for student_id in student_ids:
+                self._totals.pop(student_id, None)
+                self._reloaded_at[student_id] = sequence
+        for student_id, *totals in rows:
+            self._totals[student_id] = [value or 0 for value in totals]
+        self._place(self._totals if student_ids is None else student_ids)
+
+    def warm(self) -> int:
+        """Load every student now rather than on the first query
+
+        Returns the number of students loaded, or -1 on a database error.
+        """
+        with self._lock:
+            try:
+                self._load()
+                return len(self._totals)
+            except sqlite3.Error as e:
+                logger.error("❌ Error loading cohort distributions: %s", e)
+                return -1
+
+    def _distribution(self, metric: str) -> Optional[_Distribution]:
+        """The up-to-date distribution of metric (callers hold the lock)"""
+        if metric not in METRIC_BINS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {', '.join(METRIC_BINS)}")
+        try:
+            if self._distributions is None:
+                self._load()
+            elif self._stale:
+                stale, self._stale = list(self._stale), set()
+                self._load(stale)
+        except sqlite3.Error as e:
+            logger.error("❌ Error loading cohort distributions: %s", e)
+            return None
+        return self._distributions[metric]
+
+    # Queries
+    def percentile_rank(self, student_id: int, metric: str) -> Optional[float]:
+        """Percent of the cohort below the student on metric (ties count half)
+
+        None if the student has no data for the metric.
+        """
+        with self._lock:
+            distribution = self._distribution(metric)
+            return distribution.percentile_rank(student_id) if distribution else None
+
+    def quantiles(self, metric: str, probabilities: Sequence[float] = (0.25, 0.5, 0.75)) -> Dict[float, Optional[float]]:
+        """Cohort value of metric at each probability, to within one bin"""
+        with self._lock:
+            distribution = self._distribution(metric)
+            return {p: distribution.quantile(p) if distribution else None for p in probabilities}
+
+    def top_k(self, metric: str, k: int = 10) -> List[Tuple[int, float]]:
+        """(student_id, value) of the k students with the highest values, highest first"""
+        with self._lock:
+            distribution = self._distribution(metric)
+            return distribution.extremes(k, highest=True) if distribution else []
+
+    def bottom_k(self, metric: str, k: int = 10) -> List[Tuple[int, float]]:
+        """(student_id, value) of the k students with the lowest values, lowest first"""
+        with self._lock:
+            distribution = self._distribution(metric)
+            return distribution.extremes(k, highest=False) if distribution else []
+
+    def histogram(self, metric: str) -> List[Tuple[float, int]]:
+        """(bin value, students) for every non-empty bin, e.g. for plotting"""
+        with self._lock:
+            distribution = self._distribution(metric)
+            if distribution is None:
+                return []
+            return [(distribution.value_of(bucket), len(members))
+                    for bucket, members in enumerate(distribution.buckets) if members]
+
+    def cohort_size(self, metric: str) -> int:
+        """Students with data for metric"""
+        with self._lock:
+            distribution = self._distribution(metric)
+            return distribution.size if distribution else 0
+
+    def get_position(self, student_id: int) -> Dict[str, Dict]:
+        """The student's value and percentile rank on every metric"""
+        with self._lock:
+            position = {}
+            for metric in METRIC_BINS:
+                distribution = self._distribution(metric)
+                bucket = distribution.placed.get(student_id) if distribution else None
+                position[metric] = {
+                    'value': round(distribution.buckets[bucket][student_id], 2) if bucket is not None else None,
+                    'percentile_rank': distribution.percentile_rank(student_id) if distribution else None,
+                    'cohort_size': distribution.size if distribution else 0,
+                }
+            return position
@@ -1,173 +1,378 @@
 import csv
+import gzip
+import io
 import json
+import logging
+import os
+import shutil
+import tempfile
 import pandas as pd
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional, Sequence
 import sqlite3
 
+from database.audit import get_audit_writer
+from database.connection_pool import get_pool
+from models.ActionType import ActionType
+from utils.instrumentation import instrument_class
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:  # optional: only needed for Parquet export/import
+    pa = None
+    ds = None
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the cursor per fetchmany() call while streaming exports
+DEFAULT_BATCH_SIZE = 1000
+
+# Query behind each CSV export; parameters are bound by the caller
+EXPORT_QUERIES = {
+    'students': "SELECT * FROM students",
+    'attendance_report': """
+        SELECT 
+            s.student_id,
+            s.name as student_name,
+            s.email,
+            COALESCE(a.total_count, 0) as total_classes,
+            COALESCE(a.present_count, 0) as classes_attended,
+            ROUND(a.present_count * 100.0 / NULLIF(a.total_count, 0), 2) as attendance_rate
+        FROM students s
+        LEFT JOIN student_attendance_stats a ON s.student_id = a.student_id
+        ORDER BY attendance_rate DESC
+    """,
+    'weekly_summary': """
+        SELECT 
+            w.week_number,
+            COALESCE(a.total_count, 0) as total_classes,
+            COALESCE(a.present_count, 0) as classes_attended,
+            ROUND(a.present_count * 100.0 / NULLIF(a.total_count, 0), 2) as attendance_rate,
+            COALESCE(ws.survey_count, 0) as surveys,
+            ROUND(ws.stress_sum * 1.0 / NULLIF(ws.stress_count, 0), 2) as average_stress,
+            ROUND(ws.sleep_sum / NULLIF(ws.sleep_count, 0), 2) as average_sleep,
+            COALESCE(ws.high_stress_count, 0) as high_stress_cases
+        FROM (SELECT week_number FROM weekly_attendance_stats
+              UNION SELECT week_number FROM weekly_wellbeing_stats) w
+        LEFT JOIN weekly_attendance_stats a ON a.week_number = w.week_number
+        LEFT JOIN weekly_wellbeing_stats ws ON ws.week_number = w.week_number
+        ORDER BY w.week_number
+    """,
+    'wellbeing_data': """
+        SELECT 
+            s.student_id,
+            s.name as student_name,
+            w.week_number,
+            w.stress_level,
+            w.hours_slept,
+            w.additional_notes,
+            w.survey_date
+        FROM wellbeing_surveys w
+        JOIN students s ON w.student_id = s.student_id
+        ORDER BY s.name, w.week_number
+    """,
+    'high_stress': """
+        SELECT 
+            s.student_id,
+            s.name as student_name,
+            s.email,
+            w.week_number,
+            w.stress_level,
+            w.hours_slept,
+            w.additional_notes,
+            w.survey_date
+        FROM wellbeing_surveys w
+        JOIN students s ON w.student_id = s.student_id
+        WHERE w.stress_level >= ?
+        ORDER BY w.stress_level DESC, s.name
+    """,
+}
+
+# Rows per Arrow record batch when writing Parquet; larger batches give larger row groups
+PARQUET_BATCH_SIZE = 50000
+
+# Column-oriented datasets: table, column types and default partition column
+PARQUET_DATASETS = {
+    'attendance': {
+        'table': 'attendance',
+        'columns': [('attendance_id', 'int64'), ('student_id', 'int64'), ('week_number', 'int32'),
+                    ('module_code', 'string'), ('status', 'string'), ('date_recorded', 'string')],
+        'partition_by': 'week_number',
+    },
+    'wellbeing': {
+        'table': 'wellbeing_surveys',
+        'columns': [('survey_id', 'int64'), ('student_id', 'int64'), ('week_number', 'int32'),
+                    ('stress_level', 'int8'), ('hours_slept', 'float32'),
+                    ('additional_notes', 'string'), ('survey_date', 'string')],
+        'partition_by': 'week_number',
+    },
+    'coursework': {
+        'table': 'coursework',
+        'columns': [('coursework_id', 'int64'), ('student_id', 'int64'), ('module_code', 'string'),
+                    ('assignment_name', 'string'), ('submission_date', 'string'),
+                    ('status', 'string'), ('grade', 'float64')],
+        'partition_by': 'module_code',
+    },
+}
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet export/import requires pyarrow (pip install pyarrow)")
+
+def _arrow_schema(dataset: str):
+    return pa.schema([(name, pa.type_for_alias(type_name))
+                      for name, type_name in PARQUET_DATASETS[dataset]['columns']])
+
+def _to_record_batch(rows: List[tuple], schema):
+    """Transpose fetched rows into typed Arrow columns"""
+    columns = list(zip(*rows))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema
+    )
+
+@instrument_class
 class ExportService:
-    def __init__(self, db_path: str = "student_wellbeing.db"):
+    def __init__(self, db_path: str = "student_wellbeing.db", batch_size: int = DEFAULT_BATCH_SIZE):
         self.db_path = db_path
+        self.batch_size = batch_size
+        self._audit = get_audit_writer(db_path)
+        self._pool = get_pool(db_path)
+        self._pool.acquire()
     
-    def export_students_to_csv(self, filename: str = None) -> str:
-        """Export all students to CSV"""
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """The calling thread's pooled connection (None once closed)"""
+        return self._pool.connection() if self._pool else None
+    
+    def close(self):
+        """Release the pooled database connection"""
+        if self._pool:
+            self._audit.flush()
+            self._pool.release()
+            self._pool = None
+    
+    def _iter_query(self, query: str, params: Sequence = ()) -> Iterator[tuple]:
+        """Yield the column names, then every result row, fetching batch_size rows at a time"""
+        # Consumers such as pyarrow's dataset writer may pull from another thread;
+        # pooled connections allow that and are only used by one consumer at a time
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(query, params)
+            yield tuple(description[0] for description in cursor.description)
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+    
+    def stream_csv(self, export_name: str, params: Sequence = ()) -> Iterator[str]:
+        """Generate CSV text for one of EXPORT_QUERIES, one chunk per fetched batch
+
+        Nothing is written to disk, so the chunks can be fed straight into an HTTP
+        response or any other sink. Memory use is bounded by batch_size. The
+        export is audited when the first chunk is requested.
+        """
+        self._audit.record(ActionType.EXPORT, 'export', export_name, "stream")
+        yield from self._csv_chunks(export_name, params)
+    
+    def _csv_chunks(self, export_name: str, params: Sequence) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        rows = self._iter_query(EXPORT_QUERIES[export_name], params)
+
+        writer.writerow(next(rows))
+        for count, row in enumerate(rows, start=1):
+            writer.writerow(row)
+            if count % self.batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    
+    def _write_csv(self, export_name: str, filename: Optional[str], default_prefix: str,
+                   params: Sequence = (), compress: bool = False) -> str:
+        """Stream an export into a (optionally gzip-compressed) CSV file"""
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"students_export_{timestamp}.csv"
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM students")
-        students = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
+            filename = f"{default_prefix}_{timestamp}.csv" + (".gz" if compress else "")
         
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(column_names)
-            writer.writerows(students)
-        
-        conn.close()
-        print(f"✅ Students exported to {filename}")
+        if compress:
+            csvfile = gzip.open(filename, 'wt', newline='', encoding='utf-8')
+        else:
+            csvfile = open(filename, 'w', newline='', encoding='utf-8')
+        with csvfile:
+            for chunk in self._csv_chunks(export_name, params):
+                csvfile.write(chunk)
+        self._audit.record(ActionType.EXPORT, 'export', export_name, filename)
         return filename
     
-    def export_attendance_report(self, filename: str = None) -> str:
+    def export_students_to_csv(self, filename: str = None, compress: bool = False) -> str:
+        """Export all students to CSV"""
+        filename = self._write_csv('students', filename, "students_export", compress=compress)
+        logger.info("✅ Students exported to %s", filename)
+        return filename
+    
+    def export_attendance_report(self, filename: str = None, compress: bool = False) -> str:
         """Export attendance summary report to CSV"""
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"attendance_report_{timestamp}.csv"
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT 
-                s.student_id,
-                s.name as student_name,
-                s.email,
-                COUNT(a.attendance_id) as total_classes,
-                SUM(CASE WHEN a.status = 'Present' THEN 1 ELSE 0 END) as classes_attended,
-                ROUND((SUM(CASE WHEN a.status = 'Present' THEN 1 ELSE 0 END) * 100.0 / COUNT(a.attendance_id)), 2) as attendance_rate
-            FROM students s
-            LEFT JOIN attendance a ON s.student_id = a.student_id
-            GROUP BY s.student_id, s.name, s.email
-            ORDER BY attendance_rate DESC
-        """
-        
-        cursor.execute(query)
-        results = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(column_names)
-            writer.writerows(results)
-        
-        conn.close()
-        print(f"✅ Attendance report exported to {filename}")
+        filename = self._write_csv('attendance_report', filename, "attendance_report", compress=compress)
+        logger.info("✅ Attendance report exported to %s", filename)
+        return filename
+    
+    def export_weekly_summary(self, filename: str = None, compress: bool = False) -> str:
+        """Export per-week attendance and wellbeing aggregates to CSV"""
+        filename = self._write_csv('weekly_summary', filename, "weekly_summary", compress=compress)
+        logger.info("✅ Weekly summary exported to %s", filename)
         return filename
     
-    def export_wellbeing_data(self, filename: str = None) -> str:
+    def export_wellbeing_data(self, filename: str = None, compress: bool = False) -> str:
         """Export wellbeing survey data to CSV"""
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"wellbeing_data_{timestamp}.csv"
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT 
-                s.student_id,
-                s.name as student_name,
-                w.week_number,
-                w.stress_level,
-                w.hours_slept,
-                w.additional_notes,
-                w.survey_date
-            FROM wellbeing_surveys w
-            JOIN students s ON w.student_id = s.student_id
-            ORDER BY s.name, w.week_number
-        """
-        
-        cursor.execute(query)
-        results = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(column_names)
-            writer.writerows(results)
-        
-        conn.close()
-        print(f"✅ Wellbeing data exported to {filename}")
+        filename = self._write_csv('wellbeing_data', filename, "wellbeing_data", compress=compress)
+        logger.info("✅ Wellbeing data exported to %s", filename)
         return filename
     
-    def export_high_stress_report(self, stress_threshold: int = 4, filename: str = None) -> str:
+    def export_high_stress_report(self, stress_threshold: int = 4, filename: str = None,
+                                  compress: bool = False) -> str:
         """Export report of students with high stress levels"""
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"high_stress_report_{timestamp}.csv"
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT 
-                s.student_id,
-                s.name as student_name,
-                s.email,
-                w.week_number,
-                w.stress_level,
-                w.hours_slept,
-                w.additional_notes,
-                w.survey_date
-            FROM wellbeing_surveys w
-            JOIN students s ON w.student_id = s.student_id
-            WHERE w.stress_level >= ?
-            ORDER BY w.stress_level DESC, s.name
-        """
-        
-        cursor.execute(query, (stress_threshold,))
-        results = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
-        
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(column_names)
-            writer.writerows(results)
-        
-        conn.close()
-        print(f"✅ High stress report exported to {filename}")
+        filename = self._write_csv('high_stress', filename, "high_stress_report",
+                                   (stress_threshold,), compress)
+        logger.info("✅ High stress report exported to %s", filename)
         return filename
     
+    def _export_parquet(self, dataset: str, path: Optional[str], partition_by: Optional[str],
+                        compression: str) -> str:
+        """Stream a table into a hive-partitioned Parquet dataset directory
+
+        The dataset is written to a fresh directory next to path, which then
+        replaces any earlier export at path, so partitions that no longer have
+        rows don't linger and a failed export leaves the old one in place.
+        """
+        _require_pyarrow()
+        spec = PARQUET_DATASETS[dataset]
+        partition_by = partition_by or spec['partition_by']
+        if not path:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = f"{dataset}_{timestamp}_parquet"
+
+        schema = _arrow_schema(dataset)
+        if partition_by not in schema.names:
+            raise ValueError(f"Cannot partition {dataset} by unknown column: {partition_by}")
+
+        # An earlier export at path is deleted, so refuse to delete anything else
+        if os.path.isdir(path) and any(not entry.startswith(f"{partition_by}=") for entry in os.listdir(path)):
+            raise ValueError(f"{path} already holds data not partitioned by {partition_by}")
+
+        query = (f"SELECT {', '.join(schema.names)} FROM {spec['table']} "
+                 f"ORDER BY {partition_by}")
+        rows = self._iter_query(query)
+        next(rows)  # column names are fixed by the schema
+
+        def batches() -> Iterator:
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == PARQUET_BATCH_SIZE:
+                    yield _to_record_batch(chunk, schema)
+                    chunk = []
+            if chunk:
+                yield _to_record_batch(chunk, schema)
+
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f".{os.path.basename(path)}.", dir=parent)
+        try:
+            ds.write_dataset(
+                batches(), staging, schema=schema, format='parquet',
+                partitioning=ds.partitioning(pa.schema([schema.field(partition_by)]), flavor='hive'),
+                file_options=ds.ParquetFileFormat().make_write_options(compression=compression),
+                existing_data_behavior='overwrite_or_ignore'
+            )
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            os.replace(staging, path)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self._audit.record(ActionType.EXPORT, 'export', dataset, path)
+        return path
+    
+    def export_attendance_to_parquet(self, path: str = None, partition_by: str = None,
+                                     compression: str = 'snappy') -> str:
+        """Export attendance as a Parquet dataset partitioned by week_number"""
+        path = self._export_parquet('attendance', path, partition_by, compression)
+        logger.info("✅ Attendance exported to Parquet dataset %s", path)
+        return path
+    
+    def export_wellbeing_to_parquet(self, path: str = None, partition_by: str = None,
+                                    compression: str = 'snappy') -> str:
+        """Export wellbeing surveys as a Parquet dataset partitioned by week_number"""
+        path = self._export_parquet('wellbeing', path, partition_by, compression)
+        logger.info("✅ Wellbeing surveys exported to Parquet dataset %s", path)
+        return path
+    
+    def export_coursework_to_parquet(self, path: str = None, partition_by: str = None,
+                                     compression: str = 'snappy') -> str:
+        """Export coursework as a Parquet dataset partitioned by module_code"""
+        path = self._export_parquet('coursework', path, partition_by, compression)
+        logger.info("✅ Coursework exported to Parquet dataset %s", path)
+        return path
+    
+    def _import_parquet(self, dataset: str, path: str, partition_by: Optional[str],
+                        partition_values: Optional[Iterable], columns: Optional[List[str]]) -> pd.DataFrame:
+        """Load a Parquet dataset written by _export_parquet back into a typed DataFrame"""
+        _require_pyarrow()
+        schema = _arrow_schema(dataset)
+        partition_by = partition_by or PARQUET_DATASETS[dataset]['partition_by']
+        data = ds.dataset(
+            path, format='parquet',
+            partitioning=ds.partitioning(pa.schema([schema.field(partition_by)]), flavor='hive')
+        )
+        # Only matching partition directories are opened when partition_values is given
+        row_filter = ds.field(partition_by).isin(list(partition_values)) if partition_values is not None else None
+        table = data.to_table(columns=columns, filter=row_filter)
+        # Partition columns come back last; restore the table's column order
+        ordered = [name for name in schema.names if name in table.column_names]
+        return table.select(ordered).to_pandas()
+    
+    def import_attendance_from_parquet(self, path: str, weeks: Iterable[int] = None,
+                                       columns: List[str] = None, partition_by: str = None) -> pd.DataFrame:
+        """Load an attendance Parquet dataset, optionally only the given weeks"""
+        return self._import_parquet('attendance', path, partition_by, weeks, columns)
+    
+    def import_wellbeing_from_parquet(self, path: str, weeks: Iterable[int] = None,
+                                      columns: List[str] = None, partition_by: str = None) -> pd.DataFrame:
+        """Load a wellbeing survey Parquet dataset, optionally only the given weeks"""
+        return self._import_parquet('wellbeing', path, partition_by, weeks, columns)
+    
+    def import_coursework_from_parquet(self, path: str, modules: Iterable[str] = None,
+                                       columns: List[str] = None, partition_by: str = None) -> pd.DataFrame:
+        """Load a coursework Parquet dataset, optionally only the given modules"""
+        return self._import_parquet('coursework', path, partition_by, modules, columns)
+    
     def generate_comprehensive_report(self) -> Dict:
         """Generate a comprehensive system report"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.connection.cursor()
         
-        # Get basic statistics
+        # Read the trigger-maintained aggregates rather than scanning the raw tables
         cursor.execute("SELECT COUNT(*) FROM students")
         total_students = cursor.fetchone()[0]
         
-        cursor.execute("SELECT COUNT(*) FROM attendance")
+        cursor.execute("SELECT COALESCE(SUM(total_count), 0) FROM student_attendance_stats")
         total_attendance_records = cursor.fetchone()[0]
         
-        cursor.execute("SELECT COUNT(*) FROM wellbeing_surveys")
-        total_surveys = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT AVG(stress_level) FROM wellbeing_surveys")
-        avg_stress = cursor.fetchone()[0] or 0
-        
-        cursor.execute("SELECT AVG(hours_slept) FROM wellbeing_surveys")
-        avg_sleep = cursor.fetchone()[0] or 0
-        
         cursor.execute('''
-            SELECT COUNT(*) FROM wellbeing_surveys WHERE stress_level >= 4
+            SELECT COALESCE(SUM(survey_count), 0),
+                   SUM(stress_sum) * 1.0 / NULLIF(SUM(stress_count), 0),
+                   SUM(sleep_sum) / NULLIF(SUM(sleep_count), 0),
+                   COALESCE(SUM(high_stress_count), 0)
+            FROM student_wellbeing_stats
         ''')
-        high_stress_count = cursor.fetchone()[0]
-        
-        conn.close()
+        total_surveys, avg_stress, avg_sleep, high_stress_count = cursor.fetchone()
+        avg_stress = avg_stress or 0
+        avg_sleep = avg_sleep or 0
         
         report = {
             'total_students': total_students,
@@ -186,5 +391,5 @@ class ExportService:
         with open(json_filename, 'w', encoding='utf-8') as jsonfile:
             json.dump(report, jsonfile, indent=2)
         
-        print(f"✅ Comprehensive report generated: {json_filename}")
+        logger.info("✅ Comprehensive report generated: %s", json_filename)
         return report
\ No newline at end of file
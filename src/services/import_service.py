@@ -0,0 +1,384 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from database.connection_pool import get_pool
+from database.listeners import get_listeners
+from database.result_cache import get_result_cache
+from models.WellbeingRecord import SLEEP_HOURS_RANGE, STRESS_LEVEL_RANGE
+from utils.instrumentation import instrument_class
+
+logger = logging.getLogger(__name__)
+
+# CSV rows read, validated and written per transaction
+DEFAULT_CHUNK_SIZE = 10000
+
+# data.csv has one attendance flag per student and week, not per module
+DEFAULT_MODULE_CODE = "GENERAL"
+
+# Rejected rows kept in the returned report; write rejects_path for all of them
+MAX_REPORTED_REJECTS = 100
+
+# assignment_due in data.csv is day-first, e.g. 10/01/2025
+DUE_DATE_FORMAT = "%d/%m/%Y"
+
+# Students without an email column get a placeholder on the reserved .invalid domain
+PLACEHOLDER_EMAIL_DOMAIN = "imported.invalid"
+
+# Every column is read as a string and converted column-wise below, so a
+# malformed value rejects its own row instead of failing the whole chunk
+CSV_DTYPES = {
+    'student_id': 'string',
+    'student_name': 'string',
+    'email': 'string',
+    'week': 'string',
+    'attended': 'string',
+    'assignment_due': 'string',
+    'submitted': 'string',
+    'stress_level': 'string',
+    'hours_slept': 'string',
+}
+REQUIRED_COLUMNS = ('student_id', 'student_name', 'week')
+
+# Staged rows of the current chunk; TEMP tables live on the importing connection only
+STAGING_TABLES = (
+    """CREATE TEMP TABLE IF NOT EXISTS import_students (
+        external_id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        email TEXT NOT NULL
+    )""",
+    """CREATE TEMP TABLE IF NOT EXISTS import_rows (
+        external_id TEXT NOT NULL,
+        week_number INTEGER NOT NULL,
+        status TEXT,
+        stress_level INTEGER,
+        hours_slept REAL,
+        assignment_name TEXT,
+        submission_date TEXT,
+        coursework_status TEXT,
+        student_id INTEGER,
+        PRIMARY KEY (external_id, week_number)
+    )""",
+    "CREATE INDEX IF NOT EXISTS temp.idx_import_rows_student ON import_rows (student_id, week_number)",
+)
+
+# (counter, statement) pairs run per chunk after staging. Each UPDATE only touches
+# rows whose values changed and each INSERT only keys that do not exist yet; both
+# are driven from the staged rows (CROSS JOIN pins the join order in SQLite) so
+# their cost scales with the chunk, not the table.
+UPSERT_STATEMENTS = [
+    ('students_updated', """
+        UPDATE students SET name =
+            (SELECT s.name FROM import_students s WHERE s.external_id = students.external_id)
+        WHERE student_id IN (
+            SELECT st.student_id FROM import_students s
+            CROSS JOIN students st ON st.external_id = s.external_id
+            WHERE st.name IS NOT s.name)
+    """),
+    ('students_created', """
+        INSERT INTO students (name, email, external_id)
+        SELECT s.name, s.email, s.external_id FROM import_students s
+        WHERE NOT EXISTS (SELECT 1 FROM students WHERE external_id = s.external_id)
+    """),
+    (None, """
+        UPDATE import_rows SET student_id =
+            (SELECT student_id FROM students WHERE external_id = import_rows.external_id)
+    """),
+    ('attendance_updated', """
+        UPDATE attendance SET status =
+            (SELECT r.status FROM import_rows r
+             WHERE r.student_id = attendance.student_id AND r.week_number = attendance.week_number)
+        WHERE attendance_id IN (
+            SELECT a.attendance_id FROM import_rows r
+            CROSS JOIN attendance a ON a.student_id = r.student_id AND a.week_number = r.week_number
+            WHERE r.status IS NOT NULL AND a.module_code = :module_code AND a.status IS NOT r.status)
+    """),
+    ('attendance_inserted', """
+        INSERT INTO attendance (student_id, week_number, module_code, status, date_recorded)
+        SELECT r.student_id, r.week_number, :module_code, r.status, COALESCE(:recorded_on, CURRENT_DATE)
+        FROM import_rows r
+        WHERE r.status IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM attendance a
+            WHERE a.student_id = r.student_id AND a.week_number = r.week_number
+              AND a.module_code = :module_code)
+    """),
+    ('surveys_updated', """
+        UPDATE wellbeing_surveys SET (stress_level, hours_slept) =
+            (SELECT COALESCE(r.stress_level, wellbeing_surveys.stress_level),
+                    COALESCE(r.hours_slept, wellbeing_surveys.hours_slept)
+             FROM import_rows r
+             WHERE r.student_id = wellbeing_surveys.student_id
+               AND r.week_number = wellbeing_surveys.week_number)
+        WHERE survey_id IN (
+            SELECT w.survey_id FROM import_rows r
+            CROSS JOIN wellbeing_surveys w ON w.student_id = r.student_id AND w.week_number = r.week_number
+            WHERE (r.stress_level IS NOT NULL AND w.stress_level IS NOT r.stress_level)
+               OR (r.hours_slept IS NOT NULL AND w.hours_slept IS NOT r.hours_slept))
+    """),
+    ('surveys_inserted', """
+        INSERT INTO wellbeing_surveys (student_id, week_number, stress_level, hours_slept, additional_notes,
+                                       survey_date)
+        SELECT r.student_id, r.week_number, r.stress_level, r.hours_slept, '', COALESCE(:recorded_on, CURRENT_DATE)
+        FROM import_rows r
+        WHERE (r.stress_level IS NOT NULL OR r.hours_slept IS NOT NULL) AND NOT EXISTS (
+            SELECT 1 FROM wellbeing_surveys w
+            WHERE w.student_id = r.student_id AND w.week_number = r.week_number)
+    """),
+    ('coursework_updated', """
+        UPDATE coursework SET (status, submission_date) =
+            (SELECT r.coursework_status, r.submission_date FROM import_rows r
+             WHERE r.student_id = coursework.student_id AND r.assignment_name = coursework.assignment_name)
+        WHERE coursework_id IN (
+            SELECT c.coursework_id FROM import_rows r
+            CROSS JOIN coursework c ON c.module_code = :module_code AND c.student_id = r.student_id
+                                   AND c.assignment_name = r.assignment_name
+            WHERE c.status IS NOT r.coursework_status OR c.submission_date IS NOT r.submission_date)
+    """),
+    ('coursework_inserted', """
+        INSERT INTO coursework (student_id, module_code, assignment_name, submission_date, status)
+        SELECT r.student_id, :module_code, r.assignment_name, r.submission_date, r.coursework_status
+        FROM import_rows r
+        WHERE r.assignment_name IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM coursework c
+            WHERE c.student_id = r.student_id AND c.module_code = :module_code
+              AND c.assignment_name = r.assignment_name)
+    """),
+]
+COUNTERS = [counter for counter, _ in UPSERT_STATEMENTS if counter]
+
+
+def _in_range(values: pd.Series, bounds: Tuple[float, float]) -> pd.Series:
+    return values.between(*bounds)
+
+
+def validate_rows(frame: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Split a chunk of raw CSV rows into typed valid rows and rejected rows
+
+    Applies the WellbeingRecord ranges and the 0/1 attendance and submission
+    flags column-wise. Rejected rows keep their raw values plus a 'reason'
+    column naming the first rule they broke. Empty optional values are allowed
+    and simply produce no attendance, survey or coursework row.
+    """
+    raw = {name: frame[name].str.strip().replace("", pd.NA) if name in frame
+           else pd.Series(pd.NA, index=frame.index, dtype='string')
+           for name in CSV_DTYPES}
+
+    def column(name: str) -> pd.Series:
+        return raw[name]
+
+    def number(name: str) -> pd.Series:
+        return pd.to_numeric(raw[name], errors='coerce')
+
+    external_id, name = column('student_id'), column('student_name')
+    week, attended, submitted = number('week'), number('attended'), number('submitted')
+    stress, sleep = number('stress_level'), number('hours_slept')
+    due = pd.to_datetime(column('assignment_due'), format=DUE_DATE_FORMAT, errors='coerce')
+
+    def given_but(name: str, valid: pd.Series) -> pd.Series:
+        # A value was supplied but failed to parse or broke the rule
+        return column(name).notna() & ~valid.fillna(False).astype(bool)
+
+    rules = [
+        (external_id.isna(), "missing student_id"),
+        (name.isna(), "missing student_name"),
+        (~(week.notna() & (week % 1 == 0) & (week >= 1)).astype(bool), "week must be a whole number >= 1"),
+        (given_but('attended', attended.isin([0, 1])), "attended must be 0 or 1"),
+        (given_but('submitted', submitted.isin([0, 1])), "submitted must be 0 or 1"),
+        (given_but('stress_level', (stress % 1 == 0) & _in_range(stress, STRESS_LEVEL_RANGE)),
+         "stress_level must be a whole number between %d and %d" % STRESS_LEVEL_RANGE),
+        (given_but('hours_slept', _in_range(sleep, SLEEP_HOURS_RANGE)),
+         "hours_slept must be between %d and %d" % SLEEP_HOURS_RANGE),
+        (given_but('assignment_due', due.notna()), "assignment_due must be a DD/MM/YYYY date"),
+    ]
+    reason = pd.Series(pd.NA, index=frame.index, dtype='object')
+    for failed, message in rules:
+        reason = reason.mask(reason.isna() & failed, message)
+
+    rejected = frame[reason.notna()].assign(reason=reason[reason.notna()])
+    ok = reason.isna()
+
+    email = column('email')
+    valid = pd.DataFrame({
+        'external_id': external_id[ok],
+        'name': name[ok],
+        'email': email[ok].fillna(external_id[ok].str.lower() + "@" + PLACEHOLDER_EMAIL_DOMAIN),
+        'week_number': week[ok].astype('Int64'),
+        'status': attended[ok].map({1: 'Present', 0: 'Absent'}),
+        'stress_level': stress[ok].astype('Int64'),
+        'hours_slept': sleep[ok],
+        'assignment_name': week[ok].astype('Int64').map("Week {} assignment".format).where(due[ok].notna()),
+        'submission_date': due[ok].dt.strftime('%Y-%m-%d').where(submitted[ok] == 1),
+        'coursework_status': submitted[ok].map({1: 'Submitted', 0: 'Missing'})
+                             .where(due[ok].notna()),
+    })
+    return valid, rejected
+
+
+def _records(frame: pd.DataFrame) -> List[tuple]:
+    """Rows as plain tuples with NA converted to None for sqlite3"""
+    return list(frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None))
+
+
+@instrument_class
+class ImportService:
+    """Streams CSV files shaped like data.csv into the normalised tables
+
+    Each chunk is validated, staged into TEMP tables and upserted in one
+    transaction keyed on (student external_id, week), so re-running an import
+    or appending new weeks only writes rows that are new or changed.
+    """
+
+    def __init__(self, db_path: str = "student_wellbeing.db", chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.db_path = db_path
+        self.chunk_size = chunk_size
+        self._cache = get_result_cache(db_path)
+        self._listeners = get_listeners(db_path)
+        self._pool = get_pool(db_path)
+        self._pool.acquire()
+
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """The calling thread's pooled connection (None once closed)"""
+        return self._pool.connection() if self._pool else None
+
+    def close(self):
+        """Release the pooled database connection"""
+        if self._pool:
+            self._pool.release()
+            self._pool = None
+
+    def import_csv(self, csv_path: str, module_code: str = DEFAULT_MODULE_CODE,
+                   rejects_path: Optional[str] = None, recorded_on: Optional[str] = None) -> Dict:
+        """Validate and upsert csv_path chunk by chunk, returning load statistics
+
+        Invalid rows are skipped and reported (all of them in rejects_path if
+        given, the first MAX_REPORTED_REJECTS in the result) without stopping
+        the load. So are the rows of a new student whose email another student
+        already has. A chunk that fails in the database anyway is rolled back
+        and its rows are reported as rejected too; earlier chunks stay committed.
+
+        New attendance and survey rows are dated recorded_on (YYYY-MM-DD,
+        default today); date a past term's data so ArchiveService files it
+        under that term.
+        """
+        if recorded_on is not None:
+            date.fromisoformat(recorded_on)
+        started = time.perf_counter()
+        report = {'file': csv_path, 'rows_read': 0, 'rows_loaded': 0, 'rows_rejected': 0,
+                  **{counter: 0 for counter in COUNTERS}, 'rejects': []}
+        if rejects_path and os.path.exists(rejects_path):
+            os.remove(rejects_path)
+
+        reader = pd.read_csv(csv_path, dtype=CSV_DTYPES, chunksize=self.chunk_size,
+                             keep_default_na=False, skipinitialspace=True)
+        cursor = self.connection.cursor()
+        try:
+            for statement in STAGING_TABLES:
+                cursor.execute(statement)
+            for chunk in reader:
+                missing = [name for name in REQUIRED_COLUMNS if name not in chunk]
+                if missing:
+                    raise ValueError(f"{csv_path} is missing required columns: {', '.join(missing)}")
+                # Header is line 1 and the index continues across chunks
+                chunk.insert(0, 'line', chunk.index + 2)
+
+                valid, rejected = validate_rows(chunk)
+                conflicts = self._email_conflicts(cursor, valid)
+                if conflicts.any():
+                    rejected = pd.concat([rejected, chunk.loc[valid.index[conflicts]].assign(
+                        reason="email already belongs to another student")])
+                    valid = valid[~conflicts]
+                counts = self._load_chunk(cursor, valid, module_code, recorded_on) if len(valid) else {}
+                if counts is None:
+                    rejected = pd.concat([rejected, chunk.loc[valid.index].assign(
+                        reason="database error, chunk rolled back")])
+                    valid = valid.iloc[0:0]
+                    counts = {}
+
+                report['rows_read'] += len(chunk)
+                report['rows_loaded'] += len(valid)
+                for counter, value in counts.items():
+                    report[counter] += value
+                self._report_rejects(report, rejected, rejects_path)
+        finally:
+            cursor.execute("DROP TABLE IF EXISTS temp.import_rows")
+            cursor.execute("DROP TABLE IF EXISTS temp.import_students")
+            cursor.close()
+
+        report['seconds'] = round(time.perf_counter() - started, 3)
+        logger.info("✅ Imported %s: %s rows loaded, %s rejected",
+                    csv_path, report['rows_loaded'], report['rows_rejected'])
+        return report
+
+    def _email_conflicts(self, cursor: sqlite3.Cursor, valid: pd.DataFrame) -> pd.Series:
+        """Flag rows of new students whose email is already taken
+
+        students.email is UNIQUE, so one such student would make the whole
+        chunk fail on insert. A new student clashes with an existing student
+        or with a new student earlier in the same chunk; existing students
+        keep their email, so they never clash.
+        """
+        students = valid.drop_duplicates('external_id', keep='last')
+        cursor.execute("""
+            SELECT value ->> 0 AS external_id, value ->> 1 AS email FROM json_each(?)
+            WHERE NOT EXISTS (SELECT 1 FROM students WHERE external_id = value ->> 0)
+        """, (json.dumps(_records(students[['external_id', 'email']])),))
+        new = pd.DataFrame(cursor.fetchall(), columns=['external_id', 'email'])
+        cursor.execute("SELECT email FROM students WHERE email IN (SELECT value FROM json_each(?))",
+                       (json.dumps(new['email'].tolist()),))
+        taken = {row[0] for row in cursor.fetchall()}
+        clashing = new['email'].isin(taken) | new['email'].duplicated(keep='first')
+        return valid['external_id'].isin(new.loc[clashing, 'external_id'])
+
+    def _load_chunk(self, cursor: sqlite3.Cursor, valid: pd.DataFrame, module_code: str,
+                    recorded_on: Optional[str]) -> Optional[Dict[str, int]]:
+        """Stage and upsert one validated chunk in a single transaction"""
+        # A later row for the same student and week overrides an earlier one
+        rows = valid.drop_duplicates(['external_id', 'week_number'], keep='last')
+        students = valid.drop_duplicates('external_id', keep='last')
+        counts = {}
+        try:
+            cursor.execute("BEGIN")
+            cursor.execute("DELETE FROM temp.import_students")
+            cursor.execute("DELETE FROM temp.import_rows")
+            cursor.executemany("INSERT INTO temp.import_students VALUES (?, ?, ?)",
+                               _records(students[['external_id', 'name', 'email']]))
+            cursor.executemany("INSERT INTO temp.import_rows VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL)",
+                               _records(rows[['external_id', 'week_number', 'status', 'stress_level',
+                                              'hours_slept', 'assignment_name', 'submission_date',
+                                              'coursework_status']]))
+            for counter, statement in UPSERT_STATEMENTS:
+                cursor.execute(statement, {'module_code': module_code, 'recorded_on': recorded_on})
+                if counter:
+                    counts[counter] = cursor.rowcount
+            student_ids = [row[0] for row in cursor.execute("SELECT DISTINCT student_id FROM temp.import_rows")]
+            self.connection.commit()
+        except sqlite3.Error as e:
+            self.connection.rollback()
+            logger.error("❌ Error importing chunk: %s", e)
+            return None
+
+        self._cache.invalidate_students(student_ids)
+        # Upserts can rewrite existing weeks, so listeners rebuild these students
+        self._listeners.students_changed(student_ids)
+        return counts
+
+    def _report_rejects(self, report: Dict, rejected: pd.DataFrame, rejects_path: Optional[str]):
+        if rejected.empty:
+            return
+        report['rows_rejected'] += len(rejected)
+        room = MAX_REPORTED_REJECTS - len(report['rejects'])
+        if room > 0:
+            report['rejects'].extend(
+                {'line': int(row.line), 'student_id': None if pd.isna(row.student_id) else row.student_id,
+                 'reason': row.reason}
+                for row in rejected.head(room).itertuples())
+        if rejects_path:
+            rejected.to_csv(rejects_path, mode='a', index=False,
+                            header=not os.path.exists(rejects_path))
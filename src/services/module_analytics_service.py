@@ -0,0 +1,181 @@
+import json
+import logging
+import sqlite3
+from typing import Iterable, Optional, Tuple
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+from database.connection_pool import get_pool
+from utils.instrumentation import instrument_class
+
+logger = logging.getLogger(__name__)
+
+HEATMAP_METRICS = ('attendance_rate', 'present', 'records')
+
+# Sessions with fewer attendance records than this are left out of worst_sessions
+MIN_SESSION_RECORDS = 5
+
+
+def _filters(modules: Optional[Iterable[str]], weeks: Optional[Tuple[int, int]],
+             alias: str = "") -> Tuple[str, list]:
+    """WHERE conditions restricting module_code and week_number, and their parameters"""
+    conditions, params = [], []
+    if modules is not None:
+        conditions.append(f"{alias}module_code IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(list(modules)))
+    if weeks is not None:
+        conditions.append(f"{alias}week_number BETWEEN ? AND ?")
+        params.extend(weeks)
+    return " AND ".join(conditions) or "1", params
+
+
+@instrument_class
+class ModuleAnalyticsService:
+    """Attendance by module and week across all students
+
+    attendance is the fact table; the modules and weeks dimension tables
+    (schema version 8, kept current by triggers) list every module and week
+    that has ever been recorded, so a module or week without sessions still
+    gets a row or column. Each method is one grouped pass over attendance,
+    answered from the (module_code, week_number, status) index, and returns
+    a DataFrame ready for plotting. modules restricts the result to some
+    module codes and weeks to an inclusive (first, last) week range.
+    """
+
+    def __init__(self, db_path: str = "student_wellbeing.db"):
+        self.db_path = db_path
+        self._pool = get_pool(db_path)
+        self._pool.acquire()
+
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """The calling thread's pooled connection (None once closed)"""
+        return self._pool.connection() if self._pool else None
+
+    def close(self):
+        """Release the pooled database connection"""
+        if self._pool:
+            self._pool.release()
+            self._pool = None
+
+    def _frame(self, query: str, params: list) -> pd.DataFrame:
+        cursor = self.connection.cursor()
+        cursor.execute(query, params)
+        columns = [description[0] for description in cursor.description]
+        return pd.DataFrame.from_records([tuple(row) for row in cursor.fetchall()], columns=columns)
+
+    def set_module_name(self, module_code: str, module_name: str) -> bool:
+        """Give a module a display name (adds the module if it is new)"""
+        try:
+            self.connection.execute("""
+                INSERT INTO modules (module_code, module_name) VALUES (?, ?)
+                ON CONFLICT(module_code) DO UPDATE SET module_name = excluded.module_name
+            """, (module_code, module_name))
+            self.connection.commit()
+            return True
+        except sqlite3.Error as e:
+            logger.error("❌ Error naming module %s: %s", module_code, e)
+            return False
+
+    def attendance_heatmap(self, metric: str = 'attendance_rate', modules: Optional[Iterable[str]] = None,
+                           weeks: Optional[Tuple[int, int]] = None) -> pd.DataFrame:
+        """Module x week grid of attendance_rate (%), present or records
+
+        Rows are module codes and columns week numbers, both from the
+        dimension tables; cells without sessions are NaN.
+        """
+        if metric not in HEATMAP_METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {', '.join(HEATMAP_METRICS)}")
+        attendance_filter, attendance_params = _filters(modules, weeks)
+        module_filter, module_params = _filters(modules, None, "m.")
+        week_filter, week_params = _filters(None, weeks, "w.")
+        cells = self._frame(f"""
+            SELECT m.module_code, w.week_number, a.present, a.records,
+                   ROUND(a.present * 100.0 / a.records, 2) AS attendance_rate
+            FROM modules m
+            CROSS JOIN weeks w
+            LEFT JOIN (
+                SELECT module_code, week_number, COUNT(*) AS records,
+                       SUM(CASE WHEN status = 'Present' THEN 1 ELSE 0 END) AS present
+                FROM attendance
+                WHERE {attendance_filter}
+                GROUP BY module_code, week_number
+            ) a ON a.module_code = m.module_code AND a.week_number = w.week_number
+            WHERE {module_filter} AND {week_filter}
+        """, attendance_params + module_params + week_params)
+        heatmap = cells.pivot(index='module_code', columns='week_number', values=metric).astype(float)
+        return heatmap.sort_index().sort_index(axis=1)
+
+    def module_ranking(self, modules: Optional[Iterable[str]] = None,
+                       weeks: Optional[Tuple[int, int]] = None) -> pd.DataFrame:
+        """Modules ranked by attendance rate, best first
+
+        Columns: module_code, module_name, students, sessions (weeks with any
+        records), records, present, attendance_rate (%) and rank (1 = best,
+        ties share a rank). Modules without records come last with rate NaN.
+        """
+        attendance_filter, attendance_params = _filters(modules, weeks)
+        module_filter, module_params = _filters(modules, None, "m.")
+        ranking = self._frame(f"""
+            SELECT m.module_code, m.module_name,
+                   COALESCE(a.students, 0) AS students, COALESCE(a.sessions, 0) AS sessions,
+                   COALESCE(a.records, 0) AS records, COALESCE(a.present, 0) AS present,
+                   ROUND(a.present * 100.0 / a.records, 2) AS attendance_rate
+            FROM modules m
+            LEFT JOIN (
+                SELECT module_code, COUNT(DISTINCT student_id) AS students,
+                       COUNT(DISTINCT week_number) AS sessions, COUNT(*) AS records,
+                       SUM(CASE WHEN status = 'Present' THEN 1 ELSE 0 END) AS present
+                FROM attendance
+                WHERE {attendance_filter}
+                GROUP BY module_code
+            ) a ON a.module_code = m.module_code
+            WHERE {module_filter}
+            ORDER BY attendance_rate IS NULL, attendance_rate DESC, m.module_code
+        """, attendance_params + module_params)
+        ranking['attendance_rate'] = ranking['attendance_rate'].astype(float)
+        ranking['rank'] = ranking['attendance_rate'].rank(method='min', ascending=False).astype('Int64')
+        return ranking
+
+    def worst_sessions(self, limit: int = 10, min_records: int = MIN_SESSION_RECORDS,
+                       modules: Optional[Iterable[str]] = None,
+                       weeks: Optional[Tuple[int, int]] = None) -> pd.DataFrame:
+        """The limit module-weeks with the lowest attendance rate, worst first
+
+        Sessions with fewer than min_records attendance records are skipped
+        so a handful of absences in a tiny class does not dominate.
+        """
+        attendance_filter, attendance_params = _filters(modules, weeks, "a.")
+        sessions = self._frame(f"""
+            SELECT a.module_code, m.module_name, a.week_number, COUNT(*) AS records,
+                   SUM(CASE WHEN a.status = 'Present' THEN 1 ELSE 0 END) AS present,
+                   ROUND(SUM(CASE WHEN a.status = 'Present' THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 2)
+                       AS attendance_rate
+            FROM attendance a
+            LEFT JOIN modules m ON m.module_code = a.module_code
+            WHERE a.module_code IS NOT NULL AND a.week_number IS NOT NULL AND {attendance_filter}
+            GROUP BY a.module_code, a.week_number
+            HAVING COUNT(*) >= ?
+            ORDER BY attendance_rate, records DESC, a.module_code, a.week_number
+            LIMIT ?
+        """, attendance_params + [min_records, limit])
+        sessions['attendance_rate'] = sessions['attendance_rate'].astype(float)
+        return sessions
+
+    def plot_attendance_heatmap(self, path: str = "module_attendance_heatmap.png",
+                                modules: Optional[Iterable[str]] = None,
+                                weeks: Optional[Tuple[int, int]] = None) -> str:
+        """Render attendance_heatmap as a PNG without any GUI and return its path"""
+        heatmap = self.attendance_heatmap('attendance_rate', modules, weeks)
+        figure = Figure(figsize=(max(6, 0.5 * len(heatmap.columns) + 2), max(3, 0.4 * len(heatmap) + 1.5)))
+        ax = figure.subplots()
+        image = ax.imshow(heatmap.to_numpy(), aspect='auto', cmap='RdYlGn', vmin=0, vmax=100)
+        ax.set_xticks(range(len(heatmap.columns)), [str(week) for week in heatmap.columns])
+        ax.set_yticks(range(len(heatmap.index)), list(heatmap.index))
+        ax.set_xlabel('Week Number')
+        ax.set_title('Attendance Rate by Module and Week (%)')
+        figure.colorbar(image, ax=ax)
+        figure.tight_layout()
+        figure.savefig(path)
+        return path
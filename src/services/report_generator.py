@@ -0,0 +1,176 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+from database.audit import get_audit_writer
+from database.connection_pool import open_read_only
+from models.ActionType import ActionType
+from services.chart_renderer import ChartRenderer, _all_student_ids, _fetch_chart_data
+from services.summary import cohort_summary_query, summary_from_row
+
+logger = logging.getLogger(__name__)
+
+REPORT_FORMATS = ('txt', 'json', 'pdf')
+
+# Students handed to a worker process per task; progress is reported per chunk
+DEFAULT_REPORT_CHUNK_SIZE = 25
+
+# Same default as AnalyticsService.identify_high_stress_weeks
+HIGH_STRESS_THRESHOLD = 4
+
+# Per worker process: one read-only connection and one set of figures, reused for every chunk
+_worker = {}
+
+
+def _init_worker(db_path: str, dpi: int):
+    _worker['conn'] = open_read_only(db_path)
+    _worker['renderer'] = ChartRenderer(dpi)
+    _worker['summary_figure'] = Figure(figsize=(8.5, 11))
+
+
+def format_report(student_id: int, summary: Dict, high_stress_weeks: List[Dict], emoji: bool = True) -> str:
+    """The text of AnalyticsService.generate_wellbeing_report
+
+    emoji=False leaves out the console markers, which PDF fonts cannot draw.
+    """
+    heading, warning = ("📊 ", "⚠️  ") if emoji else ("", "")
+    lines = [
+        f"{heading}Wellbeing Report - Student {student_id}",
+        "=" * 40,
+        f"Attendance Rate: {summary['attendance_rate']:.1f}%",
+        f"Average Stress Level: {summary['average_stress']:.1f}/5",
+        f"Average Sleep: {summary['average_sleep']:.1f} hours",
+        f"Average Grade: {summary['average_grade']:.1f}%",
+        f"Assignments Completed: {summary['assignments_completed']}",
+    ]
+    if high_stress_weeks:
+        lines += ["", f"{warning}High Stress Weeks ({len(high_stress_weeks)}):"]
+        lines += [f"  Week {week['week_number']}: Stress {week['stress_level']}/5, Sleep {week['hours_slept']} hours"
+                  for week in high_stress_weeks]
+    return "\n".join(lines) + "\n"
+
+
+def _fetch_report_data(conn, student_ids: List[int], threshold: int):
+    """Summaries and high-stress weeks for a chunk of students in two queries"""
+    query, params = cohort_summary_query(student_ids)
+    summaries = {row['student_id']: summary_from_row(row) for row in conn.execute(query, params)}
+
+    high_stress = {student_id: [] for student_id in student_ids}
+    for row in conn.execute('''
+        SELECT student_id, week_number, stress_level, hours_slept, additional_notes
+        FROM wellbeing_surveys
+        WHERE student_id IN (SELECT value FROM json_each(?)) AND stress_level >= ?
+        ORDER BY student_id, week_number
+    ''', (json.dumps(student_ids), threshold)):
+        high_stress[row['student_id']].append({key: row[key] for key in row.keys() if key != 'student_id'})
+    return summaries, high_stress
+
+
+def _write_pdf(path: str, report: str, student_id: int, surveys, attendance):
+    """Summary page with the plain-text report, then the student's charts"""
+    figure = _worker['summary_figure']
+    figure.clear()
+    figure.text(0.08, 0.92, report, va='top', family='monospace', fontsize=11)
+    with PdfPages(path) as pdf:
+        pdf.savefig(figure)
+        _worker['renderer'].render_student(student_id, surveys, attendance, pdf=pdf)
+
+
+def _report_chunk(student_ids: List[int], output_dir: str, formats: Sequence[str], threshold: int) -> Dict:
+    """Worker entry point: write every requested report format for a chunk of students"""
+    started = time.perf_counter()
+    conn = _worker['conn']
+    summaries, high_stress = _fetch_report_data(conn, student_ids, threshold)
+    surveys, attendance = _fetch_chart_data(conn, student_ids) if 'pdf' in formats else ({}, {})
+
+    files, failures = [], {}
+    for student_id in student_ids:
+        try:  # one bad student must not sink the chunk
+            summary = summaries[student_id]
+            report = format_report(student_id, summary, high_stress[student_id])
+            base = os.path.join(output_dir, f"student_{student_id}")
+            if 'txt' in formats:
+                with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+                    f.write(report)
+                files.append(f"{base}.txt")
+            if 'json' in formats:
+                with open(f"{base}.json", 'w', encoding='utf-8') as f:
+                    json.dump({'student_id': student_id, 'summary': summary,
+                               'high_stress_weeks': high_stress[student_id]}, f, indent=2)
+                files.append(f"{base}.json")
+            if 'pdf' in formats:
+                _write_pdf(f"{base}.pdf", format_report(student_id, summary, high_stress[student_id], emoji=False),
+                           student_id, surveys[student_id], attendance[student_id])
+                files.append(f"{base}.pdf")
+        except Exception as e:
+            failures[student_id] = f"{type(e).__name__}: {e}"
+    return {'files': files, 'failures': failures, 'seconds': time.perf_counter() - started}
+
+
+def _log_progress(done: int, total: int):
+    logger.info("📄 Reports: %s/%s students", done, total)
+
+
+def generate_cohort_reports(db_path: str, student_ids: Optional[Iterable[int]] = None,
+                            output_dir: str = "reports", workers: Optional[int] = None,
+                            formats: Sequence[str] = REPORT_FORMATS,
+                            progress: Optional[Callable[[int, int], None]] = None,
+                            chunk_size: int = DEFAULT_REPORT_CHUNK_SIZE,
+                            threshold: int = HIGH_STRESS_THRESHOLD, dpi: int = 100) -> Dict:
+    """Write a wellbeing report per student as student_<id>.txt/.json/.pdf in output_dir
+
+    Chunks of students are spread over a process pool (workers=None uses one
+    per CPU). Each worker opens one read-only connection and reuses it, and
+    its figures, for every chunk it takes. progress(done, total) is called
+    in this process as chunks finish (default: logged). A student whose
+    report fails, or whose whole chunk fails, is listed in failures with the
+    error and the others carry on. Returns throughput statistics.
+    """
+    unknown = set(formats) - set(REPORT_FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown report formats {sorted(unknown)}, expected some of {', '.join(REPORT_FORMATS)}")
+    progress = progress or _log_progress
+    started = time.perf_counter()
+    student_ids = _all_student_ids(db_path) if student_ids is None else list(student_ids)
+    os.makedirs(output_dir, exist_ok=True)
+
+    files, failures, worker_seconds, done = [], {}, 0.0, 0
+    chunks = [student_ids[start:start + chunk_size] for start in range(0, len(student_ids), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(db_path, dpi)) as executor:
+        futures = {executor.submit(_report_chunk, chunk, output_dir, tuple(formats), threshold): chunk
+                   for chunk in chunks}
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:  # the chunk's query or its worker process failed
+                result = {'files': [], 'failures': {student_id: f"{type(e).__name__}: {e}" for student_id in chunk},
+                          'seconds': 0.0}
+            files.extend(result['files'])
+            failures.update(result['failures'])
+            worker_seconds += result['seconds']
+            done += len(chunk)
+            progress(done, len(student_ids))
+
+    get_audit_writer(db_path).record(ActionType.EXPORT, 'export', 'cohort_reports',
+                                     f"{len(student_ids)} students to {output_dir}")
+    elapsed = time.perf_counter() - started
+    succeeded = len(student_ids) - len(failures)
+    if failures:
+        logger.warning("⚠️ %s of %s reports failed", len(failures), len(student_ids))
+    return {
+        'students': len(student_ids),
+        'succeeded': succeeded,
+        'files': len(files),
+        'failures': failures,
+        'output': output_dir,
+        'elapsed_seconds': round(elapsed, 3),
+        'worker_seconds': round(worker_seconds, 3),
+        'students_per_second': round(succeeded / elapsed, 2) if elapsed > 0 else 0.0,
+    }
@@ -0,0 +1,310 @@
+import json
+import logging
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from database.connection_pool import get_pool
+from database.migrations import HIGH_STRESS_THRESHOLD
+from models.Alert import Alert
+from models.AlertType import AlertType
+from utils.instrumentation import instrument_class
+
+logger = logging.getLogger(__name__)
+
+# Students evaluated per transaction
+DEFAULT_BATCH_SIZE = 5000
+
+# Consecutive absences, counted back from a student's latest class
+ABSENCE_STREAK = 3
+
+# Most recent surveys used for stress/sleep levels and trends
+TREND_WINDOW = 4
+# Fewer surveys than this in the window give no trend
+MIN_TREND_POINTS = 3
+# Least-squares slope per week over the window
+RISING_STRESS_SLOPE = 0.5
+FALLING_SLEEP_SLOPE = -0.5
+
+# Grades (percent): recent average below LOW_GRADE, or the latest grade at
+# least GRADE_DROP points below the student's earlier average
+RECENT_GRADES = 3
+LOW_GRADE = 40.0
+GRADE_DROP = 15.0
+
+# Rules raised by this engine; alerts under other rules are never auto-resolved
+RULE_TYPES = {
+    'absence_streak': AlertType.ATTENDANCE,
+    'high_stress': AlertType.WELLBEING,
+    'rising_stress': AlertType.WELLBEING,
+    'falling_sleep': AlertType.WELLBEING,
+    'low_grade': AlertType.ACADEMIC,
+    'grade_drop': AlertType.ACADEMIC,
+}
+
+FINDING_COLUMNS = ['student_id', 'alert_type', 'rule', 'reason']
+
+
+def _findings(rule: str, values: pd.Series, template: str) -> pd.DataFrame:
+    """One finding per student in values (indexed by student_id), reason from template"""
+    return pd.DataFrame({
+        'student_id': values.index.astype(int),
+        'alert_type': RULE_TYPES[rule].value,
+        'rule': rule,
+        'reason': [template.format(value) for value in values],
+    }, columns=FINDING_COLUMNS)
+
+
+def _trailing_absences(attendance: pd.DataFrame) -> pd.Series:
+    """Length of the run of absences ending at each student's latest class"""
+    if attendance.empty:
+        return pd.Series(dtype=int)
+    present = attendance['status'].eq('Present')
+    students = attendance['student_id']
+    # Every Present starts a new block; the trailing absences form the last block
+    block = present.groupby(students).cumsum()
+    last_block = block.groupby(students).transform('max')
+    return (~present & block.eq(last_block)).groupby(students).sum()
+
+
+def _window_stats(surveys: pd.DataFrame, column: str) -> pd.DataFrame:
+    """Mean, point count and least-squares slope per week of column over the window"""
+    values = surveys[['student_id', 'week_number', column]].dropna()
+    values = values.groupby('student_id').tail(TREND_WINDOW)
+    x, y = values['week_number'].astype(float), values[column].astype(float)
+    sums = pd.DataFrame({'student_id': values['student_id'], 'n': 1.0, 'x': x, 'y': y,
+                         'xx': x * x, 'xy': x * y}).groupby('student_id').sum()
+    denominator = sums['n'] * sums['xx'] - sums['x'] ** 2
+    slope = (sums['n'] * sums['xy'] - sums['x'] * sums['y']) / denominator.where(denominator > 0)
+    return pd.DataFrame({'mean': sums['y'] / sums['n'], 'n': sums['n'],
+                         'slope': slope.where(sums['n'] >= MIN_TREND_POINTS)})
+
+
+def evaluate_risk(attendance: pd.DataFrame, surveys: pd.DataFrame,
+                  coursework: pd.DataFrame) -> pd.DataFrame:
+    """Apply every rule to a batch of students' records in grouped, vectorised passes
+
+    Inputs must be sorted chronologically within each student (attendance by
+    week, surveys by week, graded coursework by submission date). Returns one
+    row per triggered rule with student_id, alert_type, rule and reason.
+    """
+    findings = []
+
+    streaks = _trailing_absences(attendance)
+    findings.append(_findings('absence_streak', streaks[streaks >= ABSENCE_STREAK],
+                              "Missed {} classes in a row"))
+
+    stress = _window_stats(surveys, 'stress_level')
+    findings.append(_findings('high_stress', stress['mean'][stress['mean'] >= HIGH_STRESS_THRESHOLD],
+                              f"Average stress {{:.1f}}/5 over the last {TREND_WINDOW} surveys"))
+    findings.append(_findings('rising_stress', stress['slope'][stress['slope'] >= RISING_STRESS_SLOPE],
+                              "Stress rising by {:.1f} levels per week"))
+    sleep = _window_stats(surveys, 'hours_slept')
+    findings.append(_findings('falling_sleep', -sleep['slope'][sleep['slope'] <= FALLING_SLEEP_SLOPE],
+                              "Sleep falling by {:.1f} hours per week"))
+
+    grades = coursework.dropna(subset=['grade'])
+    by_student = grades.groupby('student_id')['grade']
+    recent = grades.groupby('student_id').tail(RECENT_GRADES).groupby('student_id')['grade'].mean()
+    findings.append(_findings('low_grade', recent[recent < LOW_GRADE],
+                              f"Average of recent grades {{:.0f}}% is below {LOW_GRADE:.0f}%"))
+    count, total, latest = by_student.count(), by_student.sum(), by_student.last()
+    earlier = (total - latest) / (count - 1).where(count > 1)
+    drop = (earlier - latest)[earlier - latest >= GRADE_DROP]
+    findings.append(_findings('grade_drop', drop,
+                              "Latest grade is {:.0f} points below the earlier average"))
+
+    return pd.concat(findings, ignore_index=True)
+
+
+def _to_alert(row: sqlite3.Row) -> Alert:
+    created_at = row['created_at']
+    return Alert(
+        alert_id=row['alert_id'],
+        student_id=row['student_id'],
+        alert_type=row['alert_type'],
+        reason=row['reason'],
+        created_at=datetime.fromisoformat(created_at) if created_at else None,
+        resolved=bool(row['resolved']),
+    )
+
+
+@instrument_class
+class RiskService:
+    """Early-warning engine that turns attendance, wellbeing and grades into alerts
+
+    Triggers record every student whose records change in risk_dirty_students;
+    run() drains that set in batches, so only changed students are re-evaluated.
+    Alerts whose rule no longer applies are resolved automatically.
+    """
+
+    def __init__(self, db_path: str = "student_wellbeing.db", batch_size: int = DEFAULT_BATCH_SIZE):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self._pool = get_pool(db_path)
+        self._pool.acquire()
+
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """The calling thread's pooled connection (None once closed)"""
+        return self._pool.connection() if self._pool else None
+
+    def close(self):
+        """Release the pooled database connection"""
+        if self._pool:
+            self._pool.release()
+            self._pool = None
+
+    def pending_count(self) -> int:
+        """Number of students waiting to be re-evaluated"""
+        return self.connection.execute("SELECT COUNT(*) FROM risk_dirty_students").fetchone()[0]
+
+    def run(self, full: bool = False) -> Dict:
+        """Re-evaluate changed students (every student with full=True) and persist alerts
+
+        Each batch is claimed, evaluated and written in one transaction, so a
+        student changed mid-run is simply queued again for the next run.
+        """
+        started = time.perf_counter()
+        stats = {'students_evaluated': 0, 'alerts_raised': 0, 'alerts_updated': 0, 'alerts_resolved': 0}
+        conn = self.connection
+        try:
+            if full:
+                conn.execute("INSERT OR IGNORE INTO risk_dirty_students (student_id) "
+                             "SELECT student_id FROM students")
+                conn.commit()
+
+            while True:
+                conn.execute("BEGIN IMMEDIATE")
+                student_ids = [row[0] for row in conn.execute('''
+                    DELETE FROM risk_dirty_students WHERE student_id IN
+                        (SELECT student_id FROM risk_dirty_students ORDER BY student_id LIMIT ?)
+                    RETURNING student_id
+                ''', (self.batch_size,)).fetchall()]
+                if not student_ids:
+                    conn.rollback()
+                    break
+                findings = self.evaluate(student_ids)
+                for key, value in self._persist(student_ids, findings).items():
+                    stats[key] += value
+                conn.commit()
+                stats['students_evaluated'] += len(student_ids)
+        except sqlite3.Error as e:
+            logger.error("❌ Error running risk evaluation: %s", e)
+        finally:
+            # Also covers non-database errors: the claimed batch is put back
+            if conn.in_transaction:
+                conn.rollback()
+
+        stats['seconds'] = round(time.perf_counter() - started, 3)
+        logger.info("✅ Risk evaluation: %s students, %s new alerts, %s resolved",
+                    stats['students_evaluated'], stats['alerts_raised'], stats['alerts_resolved'])
+        return stats
+
+    def evaluate(self, student_ids: Iterable[int]) -> pd.DataFrame:
+        """Triggered rules for the given students, without persisting anything"""
+        ids = json.dumps([int(student_id) for student_id in student_ids])
+        # Only the tail of each history matters to the rules, so SQLite trims it
+        # first: attendance from the week of the last Present onwards, and the
+        # most recent TREND_WINDOW surveys
+        attendance = self._frame('''
+            WITH cohort(student_id) AS (SELECT value FROM json_each(?)),
+            last_present AS (
+                SELECT student_id, MAX(week_number) AS week_number FROM attendance
+                WHERE status = 'Present' AND student_id IN (SELECT student_id FROM cohort)
+                GROUP BY student_id
+            )
+            SELECT a.student_id, a.status FROM attendance a
+            LEFT JOIN last_present p ON p.student_id = a.student_id
+            WHERE a.student_id IN (SELECT student_id FROM cohort)
+              AND a.week_number >= COALESCE(p.week_number, 0)
+            ORDER BY a.student_id, a.week_number, a.attendance_id
+        ''', (ids,), ['student_id', 'status'])
+        surveys = self._frame('''
+            SELECT student_id, week_number, stress_level, hours_slept FROM (
+                SELECT student_id, week_number, stress_level, hours_slept, survey_id,
+                       ROW_NUMBER() OVER (PARTITION BY student_id
+                                          ORDER BY week_number DESC, survey_id DESC) AS recency
+                FROM wellbeing_surveys
+                WHERE student_id IN (SELECT value FROM json_each(?))
+            )
+            WHERE recency <= ?
+            ORDER BY student_id, week_number, survey_id
+        ''', (ids, TREND_WINDOW), ['student_id', 'week_number', 'stress_level', 'hours_slept'])
+        coursework = self._frame('''
+            SELECT student_id, grade FROM coursework
+            WHERE grade IS NOT NULL AND student_id IN (SELECT value FROM json_each(?))
+            ORDER BY student_id, submission_date, coursework_id
+        ''', (ids,), ['student_id', 'grade'])
+        return evaluate_risk(attendance, surveys, coursework)
+
+    def _frame(self, query: str, params: tuple, columns: List[str]) -> pd.DataFrame:
+        cursor = self.connection.cursor()
+        cursor.row_factory = None  # plain tuples; sqlite3.Row is slow to build in bulk
+        frame = pd.DataFrame.from_records(cursor.execute(query, params).fetchall(), columns=columns)
+        numeric = [column for column in columns if column != 'status']
+        frame[numeric] = frame[numeric].astype(float)
+        frame['student_id'] = frame['student_id'].astype(np.int64)
+        return frame
+
+    def _persist(self, student_ids: List[int], findings: pd.DataFrame) -> Dict[str, int]:
+        """Raise new alerts, refresh changed reasons and resolve alerts that no longer apply"""
+        conn = self.connection
+        existing = {(row['student_id'], row['rule']): (row['alert_id'], row['reason'])
+                    for row in conn.execute(f'''
+                        SELECT alert_id, student_id, rule, reason FROM alerts
+                        WHERE resolved = 0 AND student_id IN (SELECT value FROM json_each(?))
+                          AND rule IN ({", ".join("?" * len(RULE_TYPES))})
+                    ''', (json.dumps(student_ids), *RULE_TYPES))}
+
+        raised, updated, current = [], [], set()
+        for student_id, alert_type, rule, reason in findings.itertuples(index=False, name=None):
+            key = (int(student_id), rule)
+            current.add(key)
+            if key not in existing:
+                raised.append((key[0], alert_type, rule, reason))
+            elif existing[key][1] != reason:
+                updated.append((reason, existing[key][0]))
+        resolved = [(alert_id,) for key, (alert_id, _) in existing.items() if key not in current]
+
+        conn.executemany("INSERT INTO alerts (student_id, alert_type, rule, reason) VALUES (?, ?, ?, ?)",
+                         raised)
+        conn.executemany("UPDATE alerts SET reason = ? WHERE alert_id = ?", updated)
+        conn.executemany("UPDATE alerts SET resolved = 1, resolved_at = CURRENT_TIMESTAMP "
+                         "WHERE alert_id = ?", resolved)
+        return {'alerts_raised': len(raised), 'alerts_updated': len(updated),
+                'alerts_resolved': len(resolved)}
+
+    def get_open_alerts(self, student_id: Optional[int] = None,
+                        alert_type: Optional[AlertType] = None) -> List[Alert]:
+        """Unresolved alerts, newest first, optionally for one student or type"""
+        query = "SELECT * FROM alerts WHERE resolved = 0"
+        params = []
+        if student_id is not None:
+            query += " AND student_id = ?"
+            params.append(student_id)
+        if alert_type is not None:
+            query += " AND alert_type = ?"
+            params.append(AlertType(alert_type).value)
+        query += " ORDER BY created_at DESC, alert_id DESC"
+        try:
+            return [_to_alert(row) for row in self.connection.execute(query, params)]
+        except sqlite3.Error as e:
+            logger.error("❌ Error fetching alerts: %s", e)
+            return []
+
+    def resolve_alert(self, alert_id: int) -> bool:
+        """Mark an alert as resolved by staff"""
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("UPDATE alerts SET resolved = 1, resolved_at = CURRENT_TIMESTAMP "
+                           "WHERE alert_id = ? AND resolved = 0", (alert_id,))
+            self.connection.commit()
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            logger.error("❌ Error resolving alert: %s", e)
+            return False
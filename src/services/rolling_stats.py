@@ -0,0 +1,296 @@
+import json
+import logging
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from database.connection_pool import get_pool
+from database.listeners import WriteListener, get_listeners
+from utils.instrumentation import instrument_class
+
+logger = logging.getLogger(__name__)
+
+# Weeks in the "last N weeks" window used by the weekly dashboards
+DEFAULT_WINDOW_WEEKS = 4
+
+METRICS = ('stress', 'sleep', 'attendance')
+
+# Layout of a per-week bucket and of the running window sums
+STRESS_SUM, STRESS_N, SLEEP_SUM, SLEEP_N, PRESENT, TOTAL = range(6)
+_FIELDS = 6
+
+
+def _metric(sums, metric: str) -> Optional[float]:
+    """Average stress/sleep, or attendance rate in percent, from a bucket or window sum"""
+    if metric == 'stress':
+        total, count = sums[STRESS_SUM], sums[STRESS_N]
+    elif metric == 'sleep':
+        total, count = sums[SLEEP_SUM], sums[SLEEP_N]
+    elif metric == 'attendance':
+        total, count = sums[PRESENT] * 100, sums[TOTAL]
+    else:
+        raise ValueError(f"Unknown metric {metric!r}, expected one of {', '.join(METRICS)}")
+    return round(total / count, 2) if count else None
+
+
+def _change(new: Optional[float], old: Optional[float]) -> Optional[float]:
+    return round(new - old, 2) if new is not None and old is not None else None
+
+
+class _StudentWindow:
+    """Running sums for one student's current and previous window
+
+    The window ends at the latest week seen for the student. Only the weeks
+    inside the two windows are kept, as per-week buckets, so sliding forward
+    moves at most 2 * window_weeks buckets between the running sums.
+    """
+
+    __slots__ = ('size', 'latest_week', 'weeks', 'current', 'previous')
+
+    def __init__(self, size: int):
+        self.size = size
+        self.latest_week: Optional[int] = None
+        self.weeks: Dict[int, List[float]] = {}
+        self.current = [0.0] * _FIELDS
+        self.previous = [0.0] * _FIELDS
+
+    def _sums_for(self, week: int, latest_week: int) -> Optional[List[float]]:
+        age = latest_week - week
+        if age < self.size:
+            return self.current
+        if age < 2 * self.size:
+            return self.previous
+        return None
+
+    def _slide(self, latest_week: int):
+        previous_latest, self.latest_week = self.latest_week, latest_week
+        if previous_latest is None:
+            return
+        for week, bucket in list(self.weeks.items()):
+            source = self._sums_for(week, previous_latest)
+            target = self._sums_for(week, latest_week)
+            if source is target:
+                continue
+            for field, value in enumerate(bucket):
+                source[field] -= value
+                if target is not None:
+                    target[field] += value
+            if target is None:
+                del self.weeks[week]
+
+    def add(self, week: int, values):
+        if self.latest_week is None or week > self.latest_week:
+            self._slide(week)
+        sums = self._sums_for(week, self.latest_week)
+        if sums is None:
+            return  # Older than both windows
+        bucket = self.weeks.setdefault(week, [0.0] * _FIELDS)
+        for field, value in enumerate(values):
+            bucket[field] += value
+            sums[field] += value
+
+    def week(self, week: Optional[int]) -> Optional[List[float]]:
+        return self.weeks.get(week) if week is not None else None
+
+
+@instrument_class
+class RollingWindowStats(WriteListener):
+    """Moving averages over the last window_weeks weeks, kept up to date in memory
+
+    Registers itself as a write listener for db_path, so every survey and
+    attendance row written through DatabaseHandler in this process updates
+    the running sums of students already loaded. A student is loaded from
+    the database on first use (or in bulk with warm()); after that each
+    read and each new record costs O(1). Updates, deletes and CSV imports
+    drop the student, who is reloaded on the next read.
+    """
+
+    def __init__(self, db_path: str = "student_wellbeing.db", window_weeks: int = DEFAULT_WINDOW_WEEKS):
+        if window_weeks < 1:
+            raise ValueError(f"window_weeks must be a positive integer, got {window_weeks}")
+        self.db_path = db_path
+        self.window_weeks = window_weeks
+        self._windows: Dict[int, _StudentWindow] = {}
+        # Sequence number of the last commit each loaded window already counts
+        self._loaded_at: Dict[int, int] = {}
+        self._lock = threading.RLock()
+        self._pool = get_pool(db_path)
+        self._pool.acquire()
+        self._listeners = get_listeners(db_path)
+        self._listeners.add(self)
+
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """The calling thread's pooled connection (None once closed)"""
+        return self._pool.connection() if self._pool else None
+
+    def close(self):
+        """Stop listening for writes and release the pooled database connection"""
+        self._listeners.remove(self)
+        if self._pool:
+            self._pool.release()
+            self._pool = None
+        with self._lock:
+            self._windows.clear()
+            self._loaded_at.clear()
+
+    # Write listener hooks
+    def _unseen(self, student_id: int, sequence: Optional[int]) -> Optional[_StudentWindow]:
+        """student_id's window, unless it is not loaded or its load already counts the commit"""
+        if sequence is not None and sequence <= self._loaded_at.get(student_id, 0):
+            return None
+        return self._windows.get(student_id)
+
+    def on_attendance(self, records, sequence=None):
+        with self._lock:
+            for student_id, week_number, _module_code, status in records:
+                window = self._unseen(student_id, sequence)
+                if window is not None:
+                    window.add(week_number, (0, 0, 0, 0, status == 'Present', 1))
+
+    def on_surveys(self, surveys, sequence=None):
+        with self._lock:
+            for student_id, week_number, stress_level, hours_slept in surveys:
+                window = self._unseen(student_id, sequence)
+                if window is not None:
+                    window.add(week_number, (stress_level or 0, stress_level is not None,
+                                             hours_slept or 0, hours_slept is not None, 0, 0))
+
+    def on_students_changed(self, student_ids):
+        with self._lock:
+            for student_id in student_ids:
+                self._windows.pop(student_id, None)
+                self._loaded_at.pop(student_id, None)
+
+    # Loading
+    def warm(self, student_ids: Optional[Iterable[int]] = None) -> int:
+        """Load the windows of student_ids (default: every student) in one query
+
+        Returns the number of students loaded, or -1 on a database error.
+        """
+        with self._lock:
+            try:
+                return len(self._load(student_ids))
+            except sqlite3.Error as e:
+                logger.error("❌ Error loading rolling window statistics: %s", e)
+                return -1
+
+    def _load(self, student_ids: Optional[Iterable[int]]) -> Dict[int, _StudentWindow]:
+        """Rebuild windows from per-week aggregates of each student's last two windows"""
+        if student_ids is None:
+            cohort = "SELECT student_id FROM students"
+            params = []
+        else:
+            cohort = "SELECT DISTINCT CAST(value AS INTEGER) FROM json_each(?)"
+            params = [json.dumps([int(student_id) for student_id in student_ids])]
+
+        query = f"""
+            WITH cohort(student_id) AS ({cohort}),
+            latest AS (
+                SELECT student_id, MAX(week_number) AS week FROM (
+                    SELECT student_id, week_number FROM attendance
+                    WHERE student_id IN (SELECT student_id FROM cohort)
+                    UNION ALL
+                    SELECT student_id, week_number FROM wellbeing_surveys
+                    WHERE student_id IN (SELECT student_id FROM cohort)
+                )
+                GROUP BY student_id
+            ),
+            weekly AS (
+                SELECT student_id, week_number,
+                       SUM(stress_level), COUNT(stress_level), SUM(hours_slept), COUNT(hours_slept),
+                       0, 0
+                FROM wellbeing_surveys
+                WHERE student_id IN (SELECT student_id FROM cohort)
+                GROUP BY student_id, week_number
+                UNION ALL
+                SELECT student_id, week_number, 0, 0, 0, 0,
+                       SUM(CASE WHEN status = 'Present' THEN 1 ELSE 0 END), COUNT(*)
+                FROM attendance
+                WHERE student_id IN (SELECT student_id FROM cohort)
+                GROUP BY student_id, week_number
+            )
+            SELECT c.student_id, l.week, w.*
+            FROM cohort c
+            LEFT JOIN latest l ON l.student_id = c.student_id
+            LEFT JOIN weekly w ON w.student_id = c.student_id AND w.week_number > l.week - ?
+            ORDER BY c.student_id, w.week_number
+        """
+        cursor = self.connection.cursor()
+        cursor.row_factory = None
+        with self._listeners.snapshot() as sequence:
+            cursor.execute(query, params + [2 * self.window_weeks])
+            rows = cursor.fetchall()
+
+        loaded = {}
+        for student_id, latest_week, _, week_number, *values in rows:
+            window = loaded.get(student_id)
+            if window is None:
+                window = loaded[student_id] = _StudentWindow(self.window_weeks)
+                window.latest_week = latest_week
+            if week_number is not None:
+                window.add(week_number, [value or 0 for value in values])
+        self._windows.update(loaded)
+        self._loaded_at.update(dict.fromkeys(loaded, sequence))
+        return loaded
+
+    def _window(self, student_id: int) -> Optional[_StudentWindow]:
+        window = self._windows.get(student_id)
+        if window is None:
+            window = self._load([student_id]).get(student_id)
+        return window
+
+    # Queries
+    def moving_average(self, student_id: int, metric: str) -> Optional[float]:
+        """Average stress, sleep or attendance rate (%) over the current window"""
+        with self._lock:
+            try:
+                window = self._window(student_id)
+            except sqlite3.Error as e:
+                logger.error("❌ Error loading rolling window for student %s: %s", student_id, e)
+                return None
+            return _metric(window.current, metric) if window else None
+
+    def delta(self, student_id: int, metric: str) -> Optional[float]:
+        """Change of the moving average against the window before it"""
+        stats = self.get_window(student_id)
+        return stats['delta'][metric] if stats else None
+
+    def week_over_week(self, student_id: int, metric: str) -> Optional[float]:
+        """Change from the week before the latest week to the latest week"""
+        stats = self.get_window(student_id)
+        return stats['week_over_week'][metric] if stats else None
+
+    def get_window(self, student_id: int) -> Optional[Dict]:
+        """Current and previous window averages, their deltas and the week-over-week change
+
+        Each section maps stress, sleep and attendance (rate in percent) to a
+        value, or None where the student has no records for it. Returns None
+        on a database error.
+        """
+        with self._lock:
+            try:
+                window = self._window(student_id)
+            except sqlite3.Error as e:
+                logger.error("❌ Error loading rolling window for student %s: %s", student_id, e)
+                return None
+            if window is None:
+                return None
+
+            latest = window.week(window.latest_week)
+            before = window.week(window.latest_week - 1 if window.latest_week is not None else None)
+            current = {metric: _metric(window.current, metric) for metric in METRICS}
+            previous = {metric: _metric(window.previous, metric) for metric in METRICS}
+            return {
+                'student_id': student_id,
+                'window_weeks': self.window_weeks,
+                'latest_week': window.latest_week,
+                'current': current,
+                'previous': previous,
+                'delta': {metric: _change(current[metric], previous[metric]) for metric in METRICS},
+                'week_over_week': {
+                    metric: _change(_metric(latest, metric) if latest else None,
+                                    _metric(before, metric) if before else None)
+                    for metric in METRICS
+                },
+            }
@@ -0,0 +1,256 @@
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from database.connection_pool import get_pool
+from utils.instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+# Absolute session lifetime and the most sessions kept in memory per store
+DEFAULT_SESSION_TTL = 8 * 60 * 60
+DEFAULT_MAX_SESSIONS = 10000
+
+# Signing key shared by processes that must accept each other's tokens
+SECRET_ENV_VAR = "WELLBEING_SESSION_SECRET"
+
+
+@dataclass(slots=True)
+class Session:
+    session_id: str
+    user: Dict
+    created_at: float
+    expires_at: float
+
+    @property
+    def role(self) -> str:
+        return self.user['role']
+
+
+class SessionStore:
+    """Signed session tokens backed by a bounded, expiring in-memory map
+
+    A token is "<session_id>.<HMAC-SHA256 of session_id>". Validation checks
+    the signature first, so forged or mangled tokens are rejected without a
+    lookup, then finds the session in a dict: O(1) and no database access.
+    Sessions have a fixed lifetime, so insertion order is expiry order and
+    expired or least recently created sessions are dropped from the front.
+
+    With db_path, sessions are also written to a sessions table and a token
+    missing from memory (after a restart or eviction) is loaded back once.
+    Tokens only survive a restart if the secret does too: pass it in or set
+    WELLBEING_SESSION_SECRET; otherwise a random per-process key is used.
+    """
+
+    def __init__(self, secret: Optional[bytes] = None, ttl: float = DEFAULT_SESSION_TTL,
+                 max_sessions: int = DEFAULT_MAX_SESSIONS, db_path: Optional[str] = None):
+        if secret is None:
+            env_secret = os.environ.get(SECRET_ENV_VAR)
+            secret = env_secret.encode() if env_secret else secrets.token_bytes(32)
+        self._secret = secret
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._by_user: Dict[int, set] = {}
+        self._lock = threading.RLock()
+        self.evictions = 0
+        self.db_path = db_path
+        self._pool = None
+        if db_path is not None:
+            self._pool = get_pool(db_path)
+            self._pool.acquire()
+            self._create_sessions_table()
+
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """The calling thread's pooled connection (None when not persisting)"""
+        return self._pool.connection() if self._pool else None
+
+    def close(self):
+        """Release the pooled database connection, if persisting"""
+        if self._pool:
+            self._pool.release()
+            self._pool = None
+
+    def _create_sessions_table(self):
+        self.connection.execute('''
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                username TEXT NOT NULL,
+                role TEXT NOT NULL,
+                full_name TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions (user_id)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expiry ON sessions (expires_at)")
+        self.connection.commit()
+
+    def _sign(self, session_id: str) -> str:
+        digest = hmac.new(self._secret, session_id.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode('ascii')
+
+    def _session_id(self, token: str) -> Optional[str]:
+        """session_id of a correctly signed token, else None"""
+        session_id, _, signature = token.partition(".")
+        if not session_id or not hmac.compare_digest(self._sign(session_id), signature):
+            return None
+        return session_id
+
+    # Memory map maintenance (callers hold the lock)
+    def _remember(self, session: Session):
+        self._sessions[session.session_id] = session
+        self._by_user.setdefault(session.user['user_id'], set()).add(session.session_id)
+        now = time.time()
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.expires_at > now and len(self._sessions) <= self.max_sessions:
+                break
+            if oldest.expires_at > now:
+                self.evictions += 1
+            self._forget(oldest.session_id)
+
+    def _forget(self, session_id: str) -> Optional[Session]:
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            user_sessions = self._by_user.get(session.user['user_id'])
+            if user_sessions is not None:
+                user_sessions.discard(session_id)
+                if not user_sessions:
+                    del self._by_user[session.user['user_id']]
+        return session
+
+    def _load(self, session_id: str) -> Optional[Session]:
+        """Fetch a persisted session that is no longer (or not yet) in memory"""
+        try:
+            row = self.connection.execute(
+                "SELECT user_id, username, role, full_name, created_at, expires_at "
+                "FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error("❌ Error loading session: %s", e)
+            return None
+        if row is None:
+            return None
+        user = {'user_id': row[0], 'username': row[1], 'role': row[2], 'full_name': row[3]}
+        return Session(session_id, user, row[4], row[5])
+
+    # Public API
+    def create(self, user: Dict) -> str:
+        """Start a session for user (user_id, username, role, full_name) and return its token"""
+        now = time.time()
+        session = Session(secrets.token_urlsafe(24), dict(user), now, now + self.ttl)
+        if self._pool:
+            try:
+                self.connection.execute(
+                    "INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (session.session_id, user['user_id'], user['username'], user['role'],
+                     user['full_name'], session.created_at, session.expires_at)
+                )
+                self.connection.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+                self.connection.commit()
+            except sqlite3.Error as e:
+                logger.error("❌ Error persisting session: %s", e)
+        with self._lock:
+            self._remember(session)
+        return f"{session.session_id}.{self._sign(session.session_id)}"
+
+    def validate(self, token: Optional[str]) -> Optional[Session]:
+        """The live session for token, or None if it is forged, revoked or expired"""
+        session_id = self._session_id(token) if token else None
+        if session_id is None:
+            return None
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None and self._pool:
+            session = self._load(session_id)
+            if session is not None:
+                with self._lock:
+                    self._remember(session)
+        if session is None:
+            return None
+        if session.expires_at <= time.time():
+            with self._lock:
+                self._forget(session_id)
+            return None
+        return session
+
+    def revoke(self, token: str) -> bool:
+        """End the session behind token; False if there was none"""
+        session_id = self._session_id(token)
+        if session_id is None:
+            return False
+        with self._lock:
+            found = self._forget(session_id) is not None
+        if self._pool:
+            try:
+                cursor = self.connection.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                self.connection.commit()
+                found = found or cursor.rowcount > 0
+            except sqlite3.Error as e:
+                logger.error("❌ Error revoking session: %s", e)
+        return found
+
+    def revoke_user(self, user_id: int) -> int:
+        """End every session of user_id (e.g. after a password change)"""
+        with self._lock:
+            revoked = sum(self._forget(session_id) is not None
+                          for session_id in list(self._by_user.get(user_id, ())))
+        if self._pool:
+            try:
+                cursor = self.connection.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+                self.connection.commit()
+                revoked = max(revoked, cursor.rowcount)
+            except sqlite3.Error as e:
+                logger.error("❌ Error revoking sessions: %s", e)
+        return revoked
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+
+_stores: Dict[str, SessionStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_session_store(db_path: str) -> SessionStore:
+    """Return the process-wide in-memory session store for db_path
+
+    Every AuthService for a database shares it, so a token issued by one is
+    accepted by all of them. Pass AuthService a SessionStore(db_path=...) to
+    persist sessions instead.
+    """
+    if db_path == ":memory:":
+        return SessionStore()
+
+    key = os.path.abspath(db_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = SessionStore()
+        return store
+
+
+def _session_gauges() -> List[Tuple[str, Dict, float]]:
+    with _stores_lock:
+        stores = list(_stores.items())
+    gauges = []
+    for db_path, store in stores:
+        gauges.append(("sessions_active", {'database': db_path}, len(store)))
+        gauges.append(("sessions_evicted", {'database': db_path}, store.evictions))
+    return gauges
+
+
+metrics.register_collector(_session_gauges)
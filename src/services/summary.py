@@ -0,0 +1,84 @@
+import json
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+
+def _or_zero(value) -> float:
+    """Map missing (None/NaN) aggregates to 0, as the per-student API always has"""
+    return 0 if pd.isna(value) else float(value)
+
+
+def cohort_summary_query(student_ids: Optional[Iterable[int]] = None,
+                          module_code: Optional[str] = None) -> Tuple[str, list]:
+    """Build the grouped per-student summary query and its parameters
+
+    Explicit student_ids are passed as a single JSON array so cohorts of any size
+    fit in one statement; they are summarised even if no students row exists.
+    """
+    if student_ids is None:
+        cohort = "SELECT student_id FROM students"
+        cohort_params = []
+    else:
+        cohort = "SELECT DISTINCT CAST(value AS INTEGER) FROM json_each(?)"
+        cohort_params = [json.dumps([int(student_id) for student_id in student_ids])]
+
+    module_filter = " AND module_code = ?" if module_code is not None else ""
+    module_params = [module_code] if module_code is not None else []
+
+    # Without a module filter the trigger-maintained per-student aggregates answer
+    # attendance directly; per-module rates still need the raw attendance rows
+    if module_code is None:
+        attendance = """
+            SELECT student_id, total_count AS total_classes, present_count AS attended
+            FROM student_attendance_stats
+            WHERE student_id IN (SELECT student_id FROM cohort)"""
+        attendance_params = []
+    else:
+        attendance = f"""
+            SELECT student_id, COUNT(*) AS total_classes,
+                   SUM(CASE WHEN status = 'Present' THEN 1 ELSE 0 END) AS attended
+            FROM attendance
+            WHERE student_id IN (SELECT student_id FROM cohort){module_filter}
+            GROUP BY student_id"""
+        attendance_params = module_params
+
+    query = f"""
+        WITH cohort(student_id) AS ({cohort})
+        SELECT c.student_id,
+               COALESCE(a.total_classes, 0) AS total_classes,
+               COALESCE(a.attended, 0) AS attended,
+               w.avg_stress AS average_stress,
+               w.avg_sleep AS average_sleep,
+               cw.avg_grade AS average_grade,
+               COALESCE(cw.total_assignments, 0) AS assignments_completed
+        FROM cohort c
+        LEFT JOIN ({attendance}
+        ) a ON a.student_id = c.student_id
+        LEFT JOIN (
+            SELECT student_id,
+                   stress_sum * 1.0 / NULLIF(stress_count, 0) AS avg_stress,
+                   sleep_sum / NULLIF(sleep_count, 0) AS avg_sleep
+            FROM student_wellbeing_stats
+            WHERE student_id IN (SELECT student_id FROM cohort)
+        ) w ON w.student_id = c.student_id
+        LEFT JOIN (
+            SELECT student_id, COUNT(*) AS total_assignments, AVG(grade) AS avg_grade
+            FROM coursework
+            WHERE grade IS NOT NULL AND student_id IN (SELECT student_id FROM cohort){module_filter}
+            GROUP BY student_id
+        ) cw ON cw.student_id = c.student_id
+        ORDER BY c.student_id
+    """
+    return query, cohort_params + attendance_params + module_params
+
+
+def summary_from_row(row) -> Dict:
+    """The per-student summary dict for one row of cohort_summary_query"""
+    return {
+        'attendance_rate': (row['attended'] / row['total_classes'] * 100) if row['total_classes'] > 0 else 0.0,
+        'average_stress': _or_zero(row['average_stress']),
+        'average_sleep': _or_zero(row['average_sleep']),
+        'average_grade': _or_zero(row['average_grade']),
+        'assignments_completed': row['assignments_completed']
+    }
@@ -0,0 +1,298 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Prefix for every metric name in exported formats
+METRIC_PREFIX = "wellbeing_"
+
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is O(log buckets)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> Dict:
+        cumulative, running = [], 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            running += count
+            cumulative.append([bound, running])
+        return {'buckets': cumulative, 'sum': self.sum, 'count': self.count}
+
+
+class MetricsRegistry:
+    """Process-wide store of latency histograms and counters with pluggable sinks
+
+    Disabled by default so the hot paths only pay for a flag check; call
+    enable() to start recording. Collectors are callables polled at snapshot
+    time for metrics kept elsewhere (e.g. cache statistics).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple, Histogram] = {}
+        self._counters: Dict[Tuple, float] = {}
+        self._collectors: List[Callable[[], List[Tuple[str, Dict, float]]]] = []
+        self.sinks: List = []
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def register_collector(self, collector: Callable[[], List[Tuple[str, Dict, float]]]):
+        """collector() returns (name, labels, value) gauges"""
+        self._collectors.append(collector)
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            histograms = [dict(name=name, labels=dict(labels), **histogram.snapshot())
+                          for (name, labels), histogram in self._histograms.items()]
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in self._counters.items()]
+        gauges = [{'name': name, 'labels': labels, 'value': value}
+                  for collector in self._collectors for name, labels, value in collector()]
+        return {'timestamp': datetime.now().isoformat(), 'histograms': histograms,
+                'counters': counters, 'gauges': gauges}
+
+    def flush(self) -> Dict:
+        """Send a snapshot to every sink and return it"""
+        snapshot = self.snapshot()
+        for sink in self.sinks:
+            try:
+                sink.emit(snapshot)
+            except Exception:  # a broken sink must not break the caller
+                logger.exception("Metrics sink %r failed", sink)
+        return snapshot
+
+
+metrics = MetricsRegistry()
+
+
+# Sinks
+class InMemorySink:
+    """Keeps the most recent snapshots, e.g. for tests or an admin screen"""
+
+    def __init__(self, max_snapshots: int = 100):
+        self.max_snapshots = max_snapshots
+        self.snapshots: List[Dict] = []
+
+    def emit(self, snapshot: Dict):
+        self.snapshots.append(snapshot)
+        del self.snapshots[:-self.max_snapshots]
+
+    @property
+    def latest(self) -> Optional[Dict]:
+        return self.snapshots[-1] if self.snapshots else None
+
+
+class JsonLogSink:
+    """Appends one JSON line per snapshot to a file, or logs it if no path is given"""
+
+    def __init__(self, path: str = None):
+        self.path = path
+
+    def emit(self, snapshot: Dict):
+        line = json.dumps(snapshot, default=str)
+        if self.path:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+        else:
+            logger.info(line)
+
+
+class PrometheusSink:
+    """Writes the Prometheus text exposition format (e.g. for node_exporter's textfile collector)"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def emit(self, snapshot: Dict):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(render_prometheus(snapshot))
+        # Atomic replace so a scraper never reads a half-written file
+        os.replace(temp_path, self.path)
+
+
+def _format_labels(labels: Dict, extra: Dict = None) -> str:
+    items = list(labels.items()) + list((extra or {}).items())
+    if not items:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for _, value in items)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(items, escaped)) + "}"
+
+
+def render_prometheus(snapshot: Dict) -> str:
+    lines, typed = [], set()
+
+    def declare(name: str, metric_type: str):
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} {metric_type}")
+
+    for histogram in snapshot['histograms']:
+        name = METRIC_PREFIX + histogram['name']
+        declare(name, "histogram")
+        for bound, count in histogram['buckets']:
+            le = "+Inf" if bound == float('inf') else repr(bound)
+            lines.append(f"{name}_bucket{_format_labels(histogram['labels'], {'le': le})} {count}")
+        lines.append(f"{name}_sum{_format_labels(histogram['labels'])} {histogram['sum']}")
+        lines.append(f"{name}_count{_format_labels(histogram['labels'])} {histogram['count']}")
+    for counter in snapshot['counters']:
+        name = METRIC_PREFIX + counter['name']
+        declare(name, "counter")
+        lines.append(f"{name}{_format_labels(counter['labels'])} {counter['value']}")
+    for gauge in snapshot['gauges']:
+        name = METRIC_PREFIX + gauge['name']
+        declare(name, "gauge")
+        lines.append(f"{name}{_format_labels(gauge['labels'])} {gauge['value']}")
+    return "\n".join(lines) + "\n"
+
+
+# Hooks
+def _record_call(name: str, started: float, result=None, failed: bool = False):
+    metrics.observe("method_latency_seconds", time.perf_counter() - started, method=name)
+    if failed:
+        metrics.increment("method_errors_total", method=name)
+    elif isinstance(result, list):
+        metrics.increment("method_rows_returned_total", len(result), method=name)
+
+
+def instrumented(name: str = None):
+    """Record latency, errors and returned row counts of a function under name"""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        if inspect.isgeneratorfunction(func):
+            # Time the whole iteration, not just the creation of the generator
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                if not metrics.enabled:
+                    yield from func(*args, **kwargs)
+                    return
+                started = time.perf_counter()
+                try:
+                    yield from func(*args, **kwargs)
+                except Exception:
+                    _record_call(label, started, failed=True)
+                    raise
+                _record_call(label, started)
+            return generator_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                _record_call(label, started, failed=True)
+                raise
+            _record_call(label, started, result)
+            return result
+        return wrapper
+    return decorator
+
+
+def instrument_class(cls):
+    """Class decorator applying instrumented() to every public method"""
+    for attribute, value in list(vars(cls).items()):
+        if attribute.startswith('_') or not inspect.isfunction(value):
+            continue
+        setattr(cls, attribute, instrumented(f"{cls.__name__}.{attribute}")(value))
+    return cls
+
+
+def normalise_sql(sql: str) -> str:
+    """Collapse whitespace and IN-lists so one statement shape maps to one label"""
+    sql = _PLACEHOLDER_LIST.sub("(?)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()[:120]
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that times every statement and counts rows changed by DML"""
+
+    def _timed(self, method, sql, parameters):
+        if not metrics.enabled:
+            return method(self, sql, parameters)
+        started = time.perf_counter()
+        try:
+            return method(self, sql, parameters)
+        finally:
+            statement = normalise_sql(sql)
+            metrics.observe("sql_statement_seconds", time.perf_counter() - started, statement=statement)
+            if self.rowcount > 0:
+                metrics.increment("sql_rows_affected_total", self.rowcount, statement=statement)
+
+    def execute(self, sql, parameters=()):
+        return self._timed(sqlite3.Cursor.execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(sqlite3.Cursor.executemany, sql, seq_of_parameters)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors (including the implicit ones) are InstrumentedCursor"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    # Connection.execute() would otherwise run the statement without going
+    # through Cursor.execute(), bypassing the timing above
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
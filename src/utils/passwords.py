@@ -0,0 +1,82 @@
+import base64
+import hashlib
+import hmac
+import re
+import secrets
+from typing import Tuple
+
+try:
+    import bcrypt
+except ImportError:  # listed in requirements.txt; only bcrypt hashes need it
+    bcrypt = None
+
+# scrypt cost parameters for new hashes; raising them makes logins rehash old ones
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+SCRYPT_PREFIX = "scrypt"
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+_LEGACY_SHA256 = re.compile(r"[0-9a-f]{64}")
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode('ascii')
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # maxmem covers 128 * n * r bytes with headroom for the larger costs
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r, dklen=HASH_BYTES)
+
+
+def hash_password(password: str, n: int = SCRYPT_N, r: int = SCRYPT_R, p: int = SCRYPT_P) -> str:
+    """Salted scrypt hash as "scrypt$n$r$p$salt$hash" (salt and hash base64)"""
+    salt = secrets.token_bytes(SALT_BYTES)
+    return "$".join([SCRYPT_PREFIX, str(n), str(r), str(p), _b64(salt),
+                     _b64(_scrypt(password, salt, n, r, p))])
+
+
+def _scrypt_parts(stored: str) -> Tuple[int, int, int, bytes, bytes]:
+    _, n, r, p, salt, digest = stored.split("$")
+    return int(n), int(r), int(p), base64.b64decode(salt), base64.b64decode(digest)
+
+
+def require_bcrypt():
+    """Raise ImportError unless bcrypt hashes can be verified"""
+    if bcrypt is None:
+        raise ImportError("Verifying bcrypt password hashes requires bcrypt (pip install bcrypt)")
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """Check password against a scrypt, bcrypt or legacy unsalted SHA-256 hash
+
+    bcrypt hashes (as in staff.csv) need the bcrypt package; without it they
+    never verify. Comparisons are constant-time.
+    """
+    if stored.startswith(SCRYPT_PREFIX + "$"):
+        try:
+            n, r, p, salt, digest = _scrypt_parts(stored)
+        except ValueError:
+            return False
+        return hmac.compare_digest(_scrypt(password, salt, n, r, p), digest)
+    if stored.startswith(BCRYPT_PREFIXES):
+        if bcrypt is None:
+            return False
+        return bcrypt.checkpw(password.encode(), stored.encode())
+    if _LEGACY_SHA256.fullmatch(stored):
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+    return False
+
+
+def needs_rehash(stored: str) -> bool:
+    """True unless stored is a scrypt hash at the current cost parameters"""
+    if not stored.startswith(SCRYPT_PREFIX + "$"):
+        return True
+    try:
+        n, r, p, _, _ = _scrypt_parts(stored)
+    except ValueError:
+        return True
+    return (n, r, p) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
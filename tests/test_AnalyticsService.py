@@ -0,0 +1,87 @@
+import unittest
+import math
+import os
+import sys
+import tempfile
+
+# Path configuration
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..'))
+src_dir = os.path.join(project_root, 'src')
+for path in (project_root, src_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from database.db_handler import DatabaseHandler
+from services.analytics_service import AnalyticsService
+
+class TestCohortSummary(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "analytics.db")
+        self.db = DatabaseHandler(self.db_path)
+        self.alex = self.db.add_student("Alex Johnson", "alex@uni.com")
+        self.sam = self.db.add_student("Sam Lee", "sam@uni.com")
+        self.quiet = self.db.add_student("No Records", "quiet@uni.com")
+
+        self.db.record_attendance(self.alex, 1, "CS101", "Present")
+        self.db.record_attendance(self.alex, 2, "CS101", "Present")
+        self.db.record_attendance(self.alex, 1, "CS102", "Absent")
+        self.db.record_attendance(self.alex, 2, "CS102", "Absent")
+        self.db.add_wellbeing_survey(self.alex, 1, 2, 8.0)
+        self.db.add_wellbeing_survey(self.alex, 2, 4, 6.0)
+        self.db.add_coursework(self.alex, "CS101", "Essay", "2025-01-10", "Submitted", 70.0)
+        self.db.add_coursework(self.alex, "CS102", "Lab", "2025-01-17", "Submitted", 50.0)
+
+        self.db.record_attendance(self.sam, 1, "CS101", "Absent")
+        self.db.add_wellbeing_survey(self.sam, 1, 5, 4.0)
+        self.analytics = AnalyticsService(self.db_path)
+
+    def tearDown(self):
+        self.analytics.close()
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def test_whole_cohort_matches_per_student_summaries(self):
+        summary = self.analytics.get_cohort_summary()
+
+        self.assertEqual(list(summary.index), [self.alex, self.sam, self.quiet])
+        for student_id in summary.index:
+            single = self.analytics.get_student_performance_summary(student_id)
+            row = summary.loc[student_id]
+            self.assertAlmostEqual(row['attendance_rate'], single['attendance_rate'])
+            self.assertEqual(row['assignments_completed'], single['assignments_completed'])
+        self.assertAlmostEqual(summary.loc[self.alex, 'attendance_rate'], 50.0)
+        self.assertAlmostEqual(summary.loc[self.alex, 'average_stress'], 3.0)
+        self.assertAlmostEqual(summary.loc[self.alex, 'average_sleep'], 7.0)
+        self.assertAlmostEqual(summary.loc[self.alex, 'average_grade'], 60.0)
+
+    def test_subset_of_students(self):
+        summary = self.analytics.get_cohort_summary([self.sam])
+
+        self.assertEqual(list(summary.index), [self.sam])
+        self.assertEqual(summary.loc[self.sam, 'attendance_rate'], 0.0)
+        self.assertAlmostEqual(summary.loc[self.sam, 'average_stress'], 5.0)
+
+    def test_module_filter(self):
+        summary = self.analytics.get_cohort_summary([self.alex], module_code="CS101")
+
+        self.assertAlmostEqual(summary.loc[self.alex, 'attendance_rate'], 100.0)
+        self.assertEqual(summary.loc[self.alex, 'total_classes'], 2)
+        self.assertAlmostEqual(summary.loc[self.alex, 'average_grade'], 70.0)
+        self.assertEqual(summary.loc[self.alex, 'assignments_completed'], 1)
+
+    def test_student_without_records(self):
+        row = self.analytics.get_cohort_summary([self.quiet]).loc[self.quiet]
+        self.assertEqual((row['attendance_rate'], row['total_classes'], row['assignments_completed']), (0.0, 0, 0))
+        self.assertTrue(math.isnan(row['average_stress']))
+        self.assertTrue(math.isnan(row['average_grade']))
+
+        # The per-student API reports the missing means as 0
+        single = self.analytics.get_student_performance_summary(self.quiet)
+        self.assertEqual(single, {'attendance_rate': 0.0, 'average_stress': 0, 'average_sleep': 0,
+                                  'average_grade': 0, 'assignments_completed': 0})
+
+if __name__ == '__main__':
+    unittest.main()
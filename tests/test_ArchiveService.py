@@ -0,0 +1,113 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Path configuration
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..'))
+src_dir = os.path.join(project_root, 'src')
+for path in (project_root, src_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from database.db_handler import DatabaseHandler
+from services.archive_service import ArchiveService
+from services.import_service import ImportService
+
+class TestArchiveService(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "wellbeing.db")
+        self.db = DatabaseHandler(self.db_path)
+        self.archive = ArchiveService(self.db_path, os.path.join(self.temp_dir.name, "archive"))
+        self.student_id = self.db.add_student("Alex Johnson", "alex@uni.com")
+        conn = self.db.connection
+        # Last year's records, backdated, and this term's
+        conn.executemany(
+            "INSERT INTO attendance (student_id, week_number, module_code, status, date_recorded) VALUES (?, ?, ?, ?, ?)",
+            [(self.student_id, 1, "CS101", "Absent", "2024-10-01"), (self.student_id, 2, "CS101", "Absent", "2024-10-08")]
+        )
+        conn.execute(
+            "INSERT INTO wellbeing_surveys (student_id, week_number, stress_level, hours_slept, survey_date) VALUES (?, ?, ?, ?, ?)",
+            (self.student_id, 1, 5, 4.0, "2024-10-01")
+        )
+        conn.commit()
+        self.db.record_attendance(self.student_id, 1, "CS201", "Present")
+        self.db.add_wellbeing_survey(self.student_id, 1, 2, 8.0)
+
+    def tearDown(self):
+        self.archive.close()
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def test_closed_term_leaves_the_live_tables(self):
+        moved = self.archive.archive_term("2024_25", "2025-08-01")
+        self.assertEqual(moved, {'attendance': 2, 'wellbeing_surveys': 1})
+
+        # Live queries and the aggregates now only see the current term
+        self.assertEqual([row['module_code'] for row in self.db.get_attendance_by_student(self.student_id)], ["CS201"])
+        stats = self.db.connection.execute(
+            "SELECT present_count, total_count FROM student_attendance_stats WHERE student_id = ?",
+            (self.student_id,)).fetchone()
+        self.assertEqual(tuple(stats), (1, 1))
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, "archive", "wellbeing_2024_25.db")))
+
+        archives = self.archive.list_archives()
+        self.assertEqual([(a['term'], a['attendance_rows'], a['survey_rows']) for a in archives],
+                         [("2024_25", 2, 1)])
+
+    def test_history_views_union_live_and_archived_rows(self):
+        self.archive.archive_term("2024_25", "2025-08-01")
+        history = self.archive.get_attendance_history(self.student_id)
+        self.assertEqual([(row['module_code'], row['term']) for row in history],
+                         [("CS101", "2024_25"), ("CS101", "2024_25"), ("CS201", None)])
+        surveys = self.archive.get_survey_history(self.student_id)
+        self.assertEqual([row['stress_level'] for row in surveys], [5, 2])
+
+        # A fresh service (e.g. after a restart) finds the archive through the catalog
+        self.archive.close()
+        self.archive = ArchiveService(self.db_path)
+        count = self.archive.attach().execute("SELECT COUNT(*) FROM attendance_history").fetchone()[0]
+        self.assertEqual(count, 3)
+
+    def test_archiving_again_is_idempotent(self):
+        self.archive.archive_term("2024_25", "2025-08-01")
+        self.assertEqual(self.archive.archive_term("2024_25", "2025-08-01"),
+                         {'attendance': 0, 'wellbeing_surveys': 0})
+        self.assertEqual(len(self.archive.get_attendance_history(self.student_id)), 3)
+
+    def test_imported_past_term_is_archived(self):
+        csv_path = os.path.join(self.temp_dir.name, "last_year.csv")
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write("student_id,student_name,week,attended,stress_level,hours_slept\n"
+                    "S01,Emma Johnson,1,1,3,6.2\n"
+                    "S01,Emma Johnson,2,0,4,5.5\n")
+        importer = ImportService(self.db_path)
+        try:
+            importer.import_csv(csv_path, module_code="CS100", recorded_on="2024-11-01")
+        finally:
+            importer.close()
+
+        moved = self.archive.archive_term("2024_25", "2025-08-01")
+        self.assertEqual(moved, {'attendance': 4, 'wellbeing_surveys': 3})
+        remaining = self.db.connection.execute("SELECT module_code FROM attendance").fetchall()
+        self.assertEqual([row[0] for row in remaining], ["CS201"])
+
+    def test_undated_rows_are_archived(self):
+        conn = self.db.connection
+        conn.execute("INSERT INTO attendance (student_id, week_number, module_code, status, date_recorded) "
+                     "VALUES (?, 3, 'CS101', 'Present', NULL)", (self.student_id,))
+        conn.commit()
+
+        moved = self.archive.archive_term("2024_25", "2025-08-01")
+        self.assertEqual(moved['attendance'], 3)
+        self.assertEqual([row['module_code'] for row in self.db.get_attendance_by_student(self.student_id)], ["CS201"])
+
+    def test_invalid_term_name(self):
+        with self.assertRaises(ValueError):
+            self.archive.archive_term("2024-25; DROP TABLE students", "2025-08-01")
+
+if __name__ == '__main__':
+    unittest.main()
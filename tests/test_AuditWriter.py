@@ -0,0 +1,140 @@
+import unittest
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+# Path configuration
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..'))
+src_dir = os.path.join(project_root, 'src')
+for path in (project_root, src_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from database.audit import AuditWriter, acting_as, get_audit_writer
+from database.db_handler import DatabaseHandler
+from models.ActionType import ActionType
+from services.analytics_service import AnalyticsService
+from services.auth_service import AuthService
+from services.export_service import ExportService
+
+class TestAuditWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "audit.db")
+        self.db = DatabaseHandler(self.db_path)
+        self.audit = get_audit_writer(self.db_path)
+        self.student_id = self.db.add_student("Alex Johnson", "alex@uni.com")
+
+    def tearDown(self):
+        self.audit.close()
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def test_sensitive_views_are_audited(self):
+        self.db.get_student_by_id(self.student_id)
+        with acting_as("wellbeing_officer"):
+            self.db.get_surveys_by_student(self.student_id)
+
+        entries = self.audit.entries(entity_id=self.student_id)
+        self.assertEqual([(e.action_type, e.entity_type, e.user_id) for e in entries],
+                         [(ActionType.VIEW, 'wellbeing_surveys', "wellbeing_officer"),
+                          (ActionType.VIEW, 'students', "system")])
+        self.assertEqual(entries[0].entity_id, str(self.student_id))
+
+    def test_missing_student_is_not_audited(self):
+        self.assertIsNone(self.db.get_student_by_id(self.student_id + 1))
+        self.assertEqual(self.audit.entries(entity_id=self.student_id + 1), [])
+
+    def test_bulk_reads_are_audited_once_per_call(self):
+        self.db.get_all_students()
+        self.db.search_students("Alex")
+        list(self.db.iter_surveys(student_id=self.student_id))
+        self.db.get_attendance_batch([self.student_id])
+
+        entries = self.audit.entries()
+        self.assertEqual([(e.entity_type, e.entity_id) for e in entries],
+                         [('attendance', ""), ('wellbeing_surveys', str(self.student_id)),
+                          ('students', ""), ('students', "")])
+        self.assertEqual(entries[0].details, "batch of 1 students")
+        self.assertIn("'Alex'", entries[2].details)
+
+    def test_cached_analytics_are_audited_on_every_call(self):
+        analytics = AnalyticsService(self.db_path)
+        try:
+            analytics.get_student_performance_summary(self.student_id)
+            analytics.get_student_performance_summary(self.student_id)
+        finally:
+            analytics.close()
+        entries = self.audit.entries(entity_type='student_summary', entity_id=self.student_id)
+        self.assertEqual(len(entries), 2)
+
+    def test_exports_and_logins_are_audited(self):
+        exporter = ExportService(self.db_path)
+        auth = AuthService(self.db_path)
+        try:
+            self.assertFalse(auth.login("admin", "wrong"))
+            self.assertTrue(auth.login("admin", "admin123"))
+            filename = exporter.export_wellbeing_data(os.path.join(self.temp_dir.name, "wellbeing.csv"))
+            auth.logout()
+        finally:
+            exporter.close()
+            auth.close()
+
+        entries = self.audit.entries(user_id="admin")
+        self.assertEqual([(e.action_type, e.entity_id, e.details) for e in entries],
+                         [(ActionType.LOGOUT, "admin", ""),
+                          (ActionType.EXPORT, "wellbeing_data", filename),
+                          (ActionType.LOGIN, "admin", ""),
+                          (ActionType.LOGIN, "admin", "failed")])
+
+    def test_bounded_queue_loses_nothing(self):
+        writer = AuditWriter(self.db_path, max_queue=5, batch_size=50)
+        try:
+            for i in range(300):
+                writer.record(ActionType.VIEW, 'students', i)
+            self.assertTrue(writer.flush(timeout=10))
+            self.assertEqual((writer.written, writer.failed, writer.pending()), (300, 0, 0))
+        finally:
+            writer.close()
+        count = self.db.connection.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0]
+        self.assertEqual(count, 300)
+
+    def test_writer_survives_an_unexpected_error(self):
+        writer = AuditWriter(self.db_path)
+        try:
+            with mock.patch.object(writer, '_write', side_effect=RuntimeError("boom")):
+                writer.record(ActionType.VIEW, 'students', 1)
+                self.assertTrue(writer.flush(timeout=10))
+            writer.record(ActionType.VIEW, 'students', 2)
+            self.assertTrue(writer.flush(timeout=10))
+            self.assertEqual((writer.written, writer.failed, writer.pending()), (1, 1, 0))
+        finally:
+            writer.close()
+
+    def test_log_is_append_only(self):
+        self.db.get_student_by_id(self.student_id)
+        self.audit.flush()
+        with self.assertRaises(sqlite3.DatabaseError):
+            self.db.connection.execute("UPDATE audit_log SET user_id = 'someone else'")
+        with self.assertRaises(sqlite3.DatabaseError):
+            self.db.connection.execute("DELETE FROM audit_log")
+
+    def test_queued_entries_are_written_at_exit(self):
+        script = (
+            "from database.audit import get_audit_writer\n"
+            f"writer = get_audit_writer({self.db_path!r})\n"
+            "for i in range(1000):\n"
+            "    writer.record('EXPORT', 'export', i)\n"
+        )
+        subprocess.run([sys.executable, "-c", script], cwd=src_dir, check=True, timeout=60)
+        count = self.db.connection.execute(
+            "SELECT COUNT(*) FROM audit_log WHERE action_type = 'EXPORT'").fetchone()[0]
+        self.assertEqual(count, 1000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import unittest
+import hashlib
+import os
+import sys
+import tempfile
+from unittest import mock
+
+# Path configuration
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..'))
+src_dir = os.path.join(project_root, 'src')
+for path in (project_root, src_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from services.auth_service import AuthService
+from utils import passwords
+from utils.passwords import bcrypt, hash_password, needs_rehash, verify_password
+
+class TestPasswords(unittest.TestCase):
+
+    def test_scrypt_hashes_are_salted(self):
+        first, second = hash_password("secret"), hash_password("secret")
+        self.assertNotEqual(first, second)
+        self.assertTrue(verify_password("secret", first))
+        self.assertFalse(verify_password("Secret", first))
+        self.assertFalse(needs_rehash(first))
+
+    def test_legacy_and_weaker_hashes_need_rehash(self):
+        legacy = hashlib.sha256(b"secret").hexdigest()
+        self.assertTrue(verify_password("secret", legacy))
+        self.assertTrue(needs_rehash(legacy))
+        self.assertTrue(needs_rehash(hash_password("secret", n=2 ** 10)))
+        self.assertFalse(verify_password("secret", "not a hash"))
+
+    def test_bcrypt_hashes(self):
+        stored = bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=4)).decode()
+        self.assertTrue(verify_password("secret", stored))
+        self.assertTrue(needs_rehash(stored))
+
+class TestAuthService(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "auth.db")
+        self.auth = AuthService(self.db_path)
+
+    def tearDown(self):
+        self.auth.close()
+        self.temp_dir.cleanup()
+
+    def _stored_hash(self, username):
+        return self.auth.connection.execute(
+            "SELECT password_hash FROM users WHERE username = ?", (username,)
+        ).fetchone()[0]
+
+    def test_login_upgrades_legacy_sha256_hash(self):
+        self.auth.connection.execute("UPDATE users SET password_hash = ? WHERE username = 'admin'",
+                                     (hashlib.sha256(b"admin123").hexdigest(),))
+        self.auth.connection.commit()
+
+        self.assertTrue(self.auth.login("admin", "admin123"))
+        self.assertTrue(self._stored_hash("admin").startswith("scrypt$"))
+        self.assertTrue(self.auth.has_permission('officer'))
+        other = AuthService(self.db_path)
+        self.assertFalse(other.login("admin", "wrong"))
+        other.close()
+
+    def test_repeat_login_is_served_from_cache(self):
+        self.assertTrue(self.auth.login("wellbeing_officer", "officer123"))
+        # Break the stored hash: a cached login never reaches it
+        self.auth.connection.execute("UPDATE users SET password_hash = 'x' WHERE username = 'wellbeing_officer'")
+        self.auth.connection.commit()
+
+        other = AuthService(self.db_path)
+        self.assertTrue(other.login("wellbeing_officer", "officer123"))
+        self.assertFalse(other.login("wellbeing_officer", "officer124"))
+        self.assertFalse(other.has_permission('admin'))
+        other.close()
+
+    def test_change_password_evicts_cached_login(self):
+        self.assertTrue(self.auth.login("course_director", "director123"))
+        self.assertFalse(self.auth.change_password("wrong", "new-pass"))
+        self.assertTrue(self.auth.change_password("director123", "new-pass"))
+        self.assertFalse(self.auth.login("course_director", "director123"))
+        self.assertTrue(self.auth.login("course_director", "new-pass"))
+
+    def test_concurrent_user_sessions(self):
+        admin = self.auth.authenticate("admin", "admin123")
+        officer = self.auth.authenticate("wellbeing_officer", "officer123")
+        self.assertIsNone(self.auth.authenticate("admin", "wrong"))
+        self.assertIsNone(self.auth.get_current_user())
+
+        # Any service on the same database accepts the tokens
+        other = AuthService(self.db_path)
+        self.assertTrue(other.has_permission('admin', token=admin))
+        self.assertFalse(other.has_permission('admin', token=officer))
+        self.assertEqual(other.get_session_user(officer)['username'], "wellbeing_officer")
+        other.logout(officer)
+        self.assertFalse(self.auth.has_permission('director', token=officer))
+        self.assertFalse(self.auth.has_permission('director', token="forged.token"))
+        other.close()
+
+    def test_change_password_ends_other_sessions(self):
+        token = self.auth.authenticate("course_director", "director123")
+        self.assertTrue(self.auth.login("course_director", "director123"))
+        self.assertTrue(self.auth.change_password("director123", "new-pass"))
+        self.assertIsNone(self.auth.get_session_user(token))
+        self.assertTrue(self.auth.has_permission('director', token=self.auth.current_token))
+
+    def test_import_staff(self):
+        csv_path = os.path.join(self.temp_dir.name, "staff.csv")
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write("staff_id,first_name,last_name,email,role,password\n"
+                    "ST101,Sarah,Brooks,Sarah.Brooks@warwick.ac.uk,wellbeing_officer,$2b$12$abc\n"
+                    "ST102,Tom,Hill,tom.hill@warwick.ac.uk,caretaker,$2b$12$def\n")
+        self.assertEqual(self.auth.import_staff(csv_path), {'created': 1, 'updated': 0, 'skipped': 1})
+        self.assertEqual(self._stored_hash("sarah.brooks@warwick.ac.uk"), "$2b$12$abc")
+
+        # Re-importing refreshes details but keeps the password
+        self.auth.connection.execute("UPDATE users SET password_hash = 'changed' WHERE username LIKE 'sarah%'")
+        self.assertEqual(self.auth.import_staff(csv_path)['updated'], 1)
+        self.assertEqual(self._stored_hash("sarah.brooks@warwick.ac.uk"), "changed")
+
+    def test_imported_staff_can_log_in(self):
+        csv_path = os.path.join(self.temp_dir.name, "staff.csv")
+        stored = bcrypt.hashpw(b"staff-pass", bcrypt.gensalt(rounds=4)).decode()
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write("staff_id,first_name,last_name,email,role,password\n"
+                    f"ST101,Sarah,Brooks,sarah.brooks@warwick.ac.uk,wellbeing_officer,{stored}\n")
+        self.auth.import_staff(csv_path)
+        self.assertTrue(self.auth.login("sarah.brooks@warwick.ac.uk", "staff-pass"))
+        self.assertTrue(self._stored_hash("sarah.brooks@warwick.ac.uk").startswith("scrypt$"))
+
+    def test_import_staff_requires_bcrypt(self):
+        csv_path = os.path.join(self.temp_dir.name, "staff.csv")
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write("staff_id,first_name,last_name,email,role,password\n"
+                    "ST101,Sarah,Brooks,sarah.brooks@warwick.ac.uk,wellbeing_officer,$2b$12$abc\n")
+        with mock.patch.object(passwords, 'bcrypt', None):
+            with self.assertRaises(ImportError):
+                self.auth.import_staff(csv_path)
+        count = self.auth.connection.execute("SELECT COUNT(*) FROM users WHERE username LIKE 'sarah%'").fetchone()[0]
+        self.assertEqual(count, 0)
+
+if __name__ == '__main__':
+    unittest.main()
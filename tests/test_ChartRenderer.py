@@ -0,0 +1,64 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Path configuration
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..'))
+src_dir = os.path.join(project_root, 'src')
+for path in (project_root, src_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from database.db_handler import DatabaseHandler
+from services.chart_renderer import render_cohort_charts
+
+class TestChartRenderer(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "charts.db")
+        self.db = DatabaseHandler(self.db_path)
+        self.student_ids = []
+        for i in range(2):
+            student_id = self.db.add_student(f"Student {i}", f"student{i}@uni.com")
+            self.db.add_wellbeing_survey(student_id, 1, 2, 7.5)
+            self.db.add_wellbeing_survey(student_id, 2, 4, 5.0)
+            self.db.record_attendance(student_id, 1, "CS101", "Present")
+            self.student_ids.append(student_id)
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def test_png_charts_per_student(self):
+        output_dir = os.path.join(self.temp_dir.name, "charts")
+        stats = render_cohort_charts(self.db_path, output_dir=output_dir, workers=1)
+
+        self.assertEqual((stats['students'], stats['charts'], stats['failures']), (2, 4, {}))
+        expected = {f"student_{student_id}_{name}.png"
+                    for student_id in self.student_ids for name in ('wellbeing', 'attendance')}
+        self.assertEqual(set(os.listdir(output_dir)), expected)
+        for name in expected:
+            with open(os.path.join(output_dir, name), 'rb') as f:
+                self.assertEqual(f.read(8), b"\x89PNG\r\n\x1a\n")
+
+    def test_single_pdf_for_the_cohort(self):
+        pdf_path = os.path.join(self.temp_dir.name, "cohort.pdf")
+        stats = render_cohort_charts(self.db_path, pdf_path=pdf_path)
+
+        self.assertEqual((stats['charts'], stats['failures'], stats['output']), (4, {}, pdf_path))
+        with open(pdf_path, 'rb') as f:
+            self.assertEqual(f.read(5), b"%PDF-")
+
+    def test_failed_chunk_is_reported_not_raised(self):
+        missing = os.path.join(self.temp_dir.name, "missing.db")
+        stats = render_cohort_charts(missing, self.student_ids, os.path.join(self.temp_dir.name, "out"),
+                                     workers=1)
+
+        self.assertEqual(stats['charts'], 0)
+        self.assertEqual(sorted(stats['failures']), self.student_ids)
+
+if __name__ == '__main__':
+    unittest.main()
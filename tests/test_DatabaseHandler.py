@@ -0,0 +1,300 @@
+import unittest
+import os
+import sys
+import asyncio
+import sqlite3
+import tempfile
+import threading
+from unittest import mock
+
+# Path configuration (the application modules import each other relative to src/)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..'))
+src_dir = os.path.join(project_root, 'src')
+for path in (project_root, src_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from database.db_handler import DatabaseHandler
+from database.async_db_handler import AsyncDatabaseHandler
+from database.connection_pool import get_pool
+from database import migrations
+from database.migrations import LATEST_VERSION, apply_migrations, get_schema_version
+
+class TestDatabaseHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db = DatabaseHandler(os.path.join(self.tmp_dir.name, "test.db"))
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp_dir.cleanup()
+
+    def test_bulk_add_students_returns_ids_in_order(self):
+        rows = ((f"Student {i}", f"s{i}@university.com") for i in range(5))  # generator input
+        student_ids = self.db.bulk_add_students(rows, chunk_size=2)
+        self.assertEqual(len(student_ids), 5)
+        for i, student_id in enumerate(student_ids):
+            self.assertEqual(self.db.get_student_by_id(student_id)['email'], f"s{i}@university.com")
+
+    def test_bulk_add_students_rolls_back_on_error(self):
+        rows = [("A", "dup@university.com"), ("B", "dup@university.com")]
+        self.assertEqual(self.db.bulk_add_students(rows), [])
+        self.assertEqual(self.db.get_all_students(), [])
+
+    def test_bulk_record_attendance(self):
+        student_id = self.db.add_student("Alex", "alex@university.com")
+        rows = [(student_id, week, "CS101", "Present" if week % 2 else "Absent") for week in range(1, 8)]
+        self.assertEqual(self.db.bulk_record_attendance(rows, chunk_size=3), 7)
+        self.assertEqual(len(self.db.get_attendance_by_student(student_id)), 7)
+
+    def test_bulk_add_surveys_accepts_dicts_and_defaults(self):
+        student_id = self.db.add_student("Alex", "alex@university.com")
+        rows = [
+            {"student_id": student_id, "week_number": 1, "stress_level": 3, "hours_slept": 7.0},
+            (student_id, 2, 4, 6.5, "Deadline week"),
+        ]
+        self.assertEqual(self.db.bulk_add_surveys(rows), 2)
+        surveys = self.db.get_surveys_by_student(student_id)
+        self.assertEqual([s['additional_notes'] for s in surveys], ["", "Deadline week"])
+
+    def test_bulk_insert_is_atomic(self):
+        student_id = self.db.add_student("Alex", "alex@university.com")
+        rows = [(student_id, 1, 3, 7.0), (student_id, 2, 9, 7.0)]  # stress 9 violates CHECK
+        self.assertEqual(self.db.bulk_add_surveys(rows, chunk_size=1), -1)
+        self.assertEqual(self.db.get_surveys_by_student(student_id), [])
+
+    def test_bulk_add_coursework(self):
+        student_id = self.db.add_student("Alex", "alex@university.com")
+        rows = [
+            (student_id, "CS101", "Python Basics", "2024-01-20", "Submitted", 88.0),
+            (student_id, "CS101", "Final Project", "2024-03-01", "Missing"),
+        ]
+        self.assertEqual(self.db.bulk_add_coursework(rows), 2)
+        grades = [c['grade'] for c in self.db.get_coursework_by_student(student_id)]
+        self.assertEqual(grades, [88.0, None])
+
+    def test_new_database_is_at_latest_schema_version(self):
+        self.assertEqual(get_schema_version(self.db.connection), LATEST_VERSION)
+
+    def test_record_batches(self):
+        first = self.db.add_student("A", "a@university.com")
+        second = self.db.add_student("B", "b@university.com")
+        self.db.bulk_add_surveys([(second, 1, 4, 6.5), (first, 2, 2, 8.0), (first, 1, 3, 7.0)])
+        self.db.bulk_record_attendance([(first, 1, "CS101", "Present"), (second, 1, "CS101", "Absent")])
+
+        surveys = self.db.get_survey_batch()
+        self.assertEqual(list(zip(surveys.student_id, surveys.week_number, surveys.stress_level)),
+                         [(first, 1, 3), (first, 2, 2), (second, 1, 4)])
+        attendance = self.db.get_attendance_batch([second])
+        self.assertEqual((len(attendance), list(attendance.present)), (1, [False]))
+
+    def test_keyset_pagination(self):
+        student_ids = self.db.bulk_add_students((f"Student {i}", f"s{i}@university.com") for i in range(7))
+        first_page = self.db.get_students_page(limit=3)
+        self.assertEqual([s['student_id'] for s in first_page], student_ids[:3])
+        next_page = self.db.get_students_page(first_page[-1]['student_id'], 3)
+        self.assertEqual([s['student_id'] for s in next_page], student_ids[3:6])
+
+        streamed = self.db.iter_students(page_size=2)
+        self.assertNotIsInstance(streamed, list)
+        self.assertEqual([s['student_id'] for s in streamed], student_ids)
+        self.assertEqual([s['student_id'] for s in self.db.iter_students(student_ids[1], limit=4, page_size=3)],
+                         student_ids[2:6])
+        with self.assertRaises(ValueError):
+            list(self.db.iter_students(page_size=0))
+
+        self.db.bulk_record_attendance((sid, week, "CS101", "Present")
+                                       for week in (1, 2) for sid in student_ids[:3])
+        attendance = list(self.db.iter_attendance(student_id=student_ids[1], page_size=1))
+        self.assertEqual([(a['week_number'], a['student_name']) for a in attendance],
+                         [(1, "Student 1"), (2, "Student 1")])
+        self.assertEqual(len(list(self.db.iter_attendance(page_size=4))), 6)
+
+    def test_search_students_ranked_prefix_search(self):
+        alice = self.db.add_student("Alice Jones", "alice.jones@university.com")
+        self.db.add_student("Bob Alison", "bob@university.com")
+        self.db.add_student("Carol King", "carol@alimail.com")
+        self.db.add_wellbeing_survey(alice, 1, 4, 5.0, "Worried about deadlines")
+        # bm25 needs terms that only some students match
+        self.db.bulk_add_students((f"Student {i}", f"s{i}@university.com") for i in range(5))
+
+        # Name matches rank above email-only matches
+        names = [s['name'] for s in self.db.search_students("ali")]
+        self.assertEqual(sorted(names[:2]), ["Alice Jones", "Bob Alison"])
+        self.assertEqual(names[2:], ["Carol King"])
+        self.assertEqual([s['name'] for s in self.db.search_students("ali jo")], ["Alice Jones"])
+        self.assertEqual([s['student_id'] for s in self.db.search_students("deadline")], [alice])
+        self.assertEqual([s['name'] for s in self.db.search_students("ali", limit=2, offset=1)],
+                         names[1:])
+
+    def test_search_index_follows_updates_and_deletes(self):
+        student_id = self.db.add_student("Alice Jones", "alice@university.com")
+        self.assertEqual(len(self.db.search_students("alice")), 1)
+
+        self.db.update_student(student_id, name="Alicia Smith")
+        self.assertEqual(self.db.search_students("jones"), [])
+        self.assertEqual(len(self.db.search_students("smi")), 1)
+
+        self.db.delete_student(student_id)
+        self.assertEqual(self.db.search_students("alicia"), [])
+        # Terms without any words fall back to a substring scan
+        self.assertEqual(self.db.search_students("@"), [])
+
+    def test_existing_database_is_migrated_in_place(self):
+        # A pre-migration database: tables exist, no indexes, user_version 0
+        legacy_path = os.path.join(self.tmp_dir.name, "legacy.db")
+        conn = sqlite3.connect(legacy_path)
+        conn.execute("""CREATE TABLE students (
+            student_id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL, created_date DATE DEFAULT CURRENT_DATE)""")
+        conn.execute("INSERT INTO students (name, email) VALUES ('Old', 'old@university.com')")
+        conn.commit()
+        conn.close()
+
+        legacy = DatabaseHandler(legacy_path)
+        try:
+            self.assertEqual(get_schema_version(legacy.connection), LATEST_VERSION)
+            self.assertEqual(len(legacy.get_all_students()), 1)
+            plan = legacy.connection.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM attendance WHERE student_id = ? ORDER BY week_number", (1,)
+            ).fetchall()
+            self.assertIn("idx_attendance_student_week", " ".join(row[-1] for row in plan))
+        finally:
+            legacy.close()
+
+    def test_migration_applied_by_another_connection_is_skipped(self):
+        # This connection read user_version before another one finished migrating
+        real_version = migrations.get_schema_version
+        reads = []
+
+        def stale_first_read(connection):
+            reads.append(1)
+            return 1 if len(reads) == 1 else real_version(connection)
+
+        conn = sqlite3.connect(self.db.db_path)
+        try:
+            with mock.patch.object(migrations, 'get_schema_version', stale_first_read):
+                self.assertEqual(apply_migrations(conn), LATEST_VERSION)
+        finally:
+            conn.close()
+        self.assertEqual(len(self.db.get_all_students()), 0)
+
+    def test_pool_shares_connection_per_thread(self):
+        pool = get_pool(self.db.db_path)
+        self.assertIs(pool.connection(), self.db.connection)
+        self.assertEqual(self.db.connection.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.db.connection))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], self.db.connection)
+
+    def test_last_release_closes_pooled_connections(self):
+        second = DatabaseHandler(self.db.db_path)
+        conn = second.connection
+        second.close()
+        conn.execute("SELECT 1")  # still leased by self.db
+
+        self.db.close()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_thread_exit_closes_its_connection(self):
+        pool = get_pool(self.db.db_path)
+        before = len(pool._connections)
+        other = []
+        thread = threading.Thread(target=lambda: other.append(pool.connection()))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(len(pool._connections), before)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            other[0].execute("SELECT 1")
+        self.db.connection.execute("SELECT 1")  # the main thread's connection is untouched
+
+    def test_aggregate_tables_follow_inserts_updates_and_deletes(self):
+        a = self.db.add_student("A", "a@university.com")
+        b = self.db.add_student("B", "b@university.com")
+        self.db.bulk_record_attendance([(a, 1, "CS101", "Present"), (a, 2, "CS101", "Absent"),
+                                        (b, 1, "CS101", "Present")])
+        self.db.bulk_add_surveys([(a, 1, 5, 6.0), (a, 2, 3, 8.0), (b, 1, 4, 7.5)])
+        absent_id = self.db.get_attendance_by_student(a)[1]['attendance_id']
+        self.db.update_attendance(absent_id, "Present")
+        self.db.delete_student(b)
+
+        conn = self.db.connection
+        self.assertEqual(
+            [tuple(r) for r in conn.execute(
+                "SELECT student_id, present_count, total_count FROM student_attendance_stats WHERE total_count > 0")],
+            [(a, 2, 2)]
+        )
+        self.assertEqual(
+            tuple(conn.execute("SELECT present_count, total_count FROM weekly_attendance_stats WHERE week_number = 1").fetchone()),
+            (1, 1)
+        )
+        self.assertEqual(
+            tuple(conn.execute(
+                "SELECT survey_count, stress_sum, sleep_sum, high_stress_count FROM student_wellbeing_stats "
+                "WHERE student_id = ?", (a,)).fetchone()),
+            (2, 8, 14.0, 1)
+        )
+        self.assertEqual(
+            tuple(conn.execute("SELECT survey_count, high_stress_count FROM weekly_wellbeing_stats "
+                               "WHERE week_number = 1").fetchone()),
+            (1, 1)
+        )
+
+class TestAsyncDatabaseHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "test.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_concurrent_reads_after_serialised_writes(self):
+        async def scenario():
+            async with AsyncDatabaseHandler(self.db_path) as db:
+                student_ids = await asyncio.gather(
+                    *(db.add_student(f"Student {i}", f"s{i}@university.com") for i in range(5))
+                )
+                await db.bulk_record_attendance((sid, 1, "CS101", "Present") for sid in student_ids)
+                students = await asyncio.gather(*(db.get_student_by_id(sid) for sid in student_ids))
+                attendance = await db.get_attendance_by_student(student_ids[0])
+            return student_ids, students, attendance
+
+        student_ids, students, attendance = asyncio.run(scenario())
+        self.assertEqual(sorted(student_ids), [1, 2, 3, 4, 5])
+        self.assertEqual([s['student_id'] for s in students], student_ids)
+        self.assertEqual(len(attendance), 1)
+
+    def test_async_keyset_iteration(self):
+        async def scenario():
+            async with AsyncDatabaseHandler(self.db_path) as db:
+                await db.bulk_add_students((f"Student {i}", f"s{i}@university.com") for i in range(5))
+                return [s['name'] async for s in db.iter_students(limit=4, page_size=3)]
+
+        self.assertEqual(asyncio.run(scenario()), [f"Student {i}" for i in range(4)])
+
+    def test_async_search_after_writes(self):
+        async def scenario():
+            async with AsyncDatabaseHandler(self.db_path) as db:
+                await db.add_student("Ada Lovelace", "ada@university.com")
+                first = await db.search_students("Ada")
+                await db.add_student("Ada Byron", "byron@university.com")
+                return first, await db.search_students("Ada")
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual([s['name'] for s in first], ["Ada Lovelace"])
+        self.assertEqual(sorted(s['name'] for s in second), ["Ada Byron", "Ada Lovelace"])
+
+    def test_memory_database_rejected(self):
+        with self.assertRaises(ValueError):
+            AsyncDatabaseHandler(":memory:")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+import os
+import random
+import sys
+import tempfile
+
+# Path configuration
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..'))
+src_dir = os.path.join(project_root, 'src')
+for path in (project_root, src_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from database.db_handler import DatabaseHandler
+from database.listeners import get_listeners
+from services.analytics_service import AnalyticsService
+from services.distribution_service import DistributionService, _Fenwick
+
+class TestDistributionService(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "distribution.db")
+        self.db = DatabaseHandler(self.db_path)
+        self.distribution = DistributionService(self.db_path)
+        # Students 1..5 with average stress 1..5 and matching attendance
+        self.student_ids = []
+        for i in range(1, 6):
+            student_id = self.db.add_student(f"Student {i}", f"student{i}@uni.com")
+            self.db.add_wellbeing_survey(student_id, 1, i, 4.0 + i)
+            self.db.record_attendance(student_id, 1, "CS101", "Present" if i % 2 else "Absent")
+            self.db.add_coursework(student_id, "CS101", "Essay", "2025-01-10", "Submitted", 50.0 + 10 * i)
+            self.student_ids.append(student_id)
+
+    def tearDown(self):
+        self.distribution.close()
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def test_fenwick_search(self):
+        tree = _Fenwick(10)
+        for bucket, count in [(2, 3), (5, 1), (9, 2)]:
+            tree.add(bucket, count)
+        self.assertEqual(tree.prefix(6), 4)
+        self.assertEqual([tree.search(rank) for rank in range(1, 7)], [2, 2, 2, 5, 9, 9])
+
+    def test_cohort_queries(self):
+        first, middle, last = self.student_ids[0], self.student_ids[2], self.student_ids[4]
+        self.assertEqual(self.distribution.percentile_rank(middle, 'stress'), 50.0)
+        self.assertEqual(self.distribution.percentile_rank(last, 'grade'), 90.0)
+        self.assertEqual(self.distribution.quantiles('sleep', (0.0, 0.5, 1.0)), {0.0: 5.0, 0.5: 7.0, 1.0: 9.0})
+        self.assertEqual(self.distribution.top_k('stress', 2), [(last, 5.0), (self.student_ids[3], 4.0)])
+        self.assertEqual(self.distribution.bottom_k('grade', 1), [(first, 60.0)])
+        self.assertEqual(self.distribution.histogram('attendance'), [(0.0, 2), (100.0, 3)])
+
+        # Same values as the per-student summary
+        summary = AnalyticsService(self.db_path)
+        try:
+            expected = summary.get_student_performance_summary(middle)
+        finally:
+            summary.close()
+        position = self.distribution.get_position(middle)
+        self.assertEqual(position['grade']['value'], expected['average_grade'])
+        self.assertEqual(position['attendance']['value'], expected['attendance_rate'])
+
+    def test_new_writes_move_students_incrementally(self):
+        first = self.student_ids[0]
+        self.assertEqual(self.distribution.percentile_rank(first, 'stress'), 10.0)
+        self.db.add_wellbeing_survey(first, 2, 5, 6.0)  # average stress 3.0
+        self.assertEqual(self.distribution.percentile_rank(first, 'stress'), 40.0)
+
+        newcomer = self.db.add_student("New Student", "new@uni.com")
+        self.assertIsNone(self.distribution.percentile_rank(newcomer, 'grade'))
+        self.db.bulk_add_coursework([(newcomer, "CS101", "Essay", "2025-01-10", "Submitted", 10.0)])
+        self.assertEqual(self.distribution.bottom_k('grade', 1), [(newcomer, 10.0)])
+
+        # Deletes are picked up on the next read
+        self.db.delete_student(newcomer)
+        self.assertEqual(self.distribution.cohort_size('grade'), 5)
+
+    def test_matches_a_full_reload(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            student_id = rng.choice(self.student_ids)
+            self.db.add_wellbeing_survey(student_id, rng.randint(2, 12), rng.randint(1, 5), rng.uniform(3, 10))
+        fresh = DistributionService(self.db_path)
+        try:
+            for metric in ('stress', 'sleep'):
+                self.assertEqual(self.distribution.histogram(metric), fresh.histogram(metric))
+                for student_id in self.student_ids:
+                    self.assertEqual(self.distribution.percentile_rank(student_id, metric),
+                                     fresh.percentile_rank(student_id, metric))
+        finally:
+            fresh.close()
+
+    def test_load_between_commit_and_notification_counts_write_once(self):
+        first = self.student_ids[0]
+        listeners = get_listeners(self.db_path)
+
+        def commit_survey(stress):
+            self.db.connection.execute(
+                "INSERT INTO wellbeing_surveys (student_id, week_number, stress_level, hours_slept) VALUES (?, 2, ?, 6.0)",
+                (first, stress))
+            return listeners.commit(self.db.connection)
+
+        # Full load between the commit and its notification
+        sequence = commit_survey(5)  # average stress 3.0
+        self.assertEqual(self.distribution.warm(), 5)
+        listeners.surveys_added([(first, 2, 5, 6.0)], sequence)
+        self.assertEqual(self.distribution.get_position(first)['stress']['value'], 3.0)
+
+        # Reload of a stale student between the commit and its notification
+        listeners.students_changed([first])
+        sequence = commit_survey(5)  # average stress 3.67
+        self.assertEqual(self.distribution.get_position(first)['stress']['value'], 3.67)
+        listeners.surveys_added([(first, 2, 5, 6.0)], sequence)
+        self.assertEqual(self.distribution.get_position(first)['stress']['value'], 3.67)
+
+        # Later writes still move the student
+        self.db.add_wellbeing_survey(first, 3, 5, 6.0)  # average stress 4.0
+        self.assertEqual(self.distribution.get_position(first)['stress']['value'], 4.0)
+
+    def test_unknown_metric(self):
+        with self.assertRaises(ValueError):
+            self.distribution.top_k('happiness')
+
+if __name__ == '__main__':
+    unittest.main()
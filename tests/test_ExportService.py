@@ -0,0 +1,100 @@
+import unittest
+import csv
+import gzip
+import os
+import sys
+import tempfile
+
+# Path configuration
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..'))
+src_dir = os.path.join(project_root, 'src')
+for path in (project_root, src_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from database.db_handler import DatabaseHandler
+from services.export_service import ExportService, pa
+
+class TestExportService(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "export.db")
+        self.db = DatabaseHandler(self.db_path)
+        for i in range(5):
+            student_id = self.db.add_student(f"Student {i}", f"student{i}@uni.com")
+            for week in (1, 2):
+                self.db.add_wellbeing_survey(student_id, week, 1 + (i + week) % 5, 6.5, "Notes, with a comma")
+                self.db.record_attendance(student_id, week, "CS101", "Present" if (i + week) % 2 else "Absent")
+        # Small batches so every export spans several fetches and chunks
+        self.exporter = ExportService(self.db_path, batch_size=3)
+
+    def tearDown(self):
+        self.exporter.close()
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def _read(self, path):
+        with open(path, newline='', encoding='utf-8') as f:
+            return f.read()
+
+    def test_gzip_export_reads_back_as_the_plain_csv(self):
+        plain = self.exporter.export_wellbeing_data(self._path("wellbeing.csv"))
+        compressed = self.exporter.export_wellbeing_data(self._path("wellbeing.csv.gz"), compress=True)
+
+        with gzip.open(compressed, 'rt', newline='', encoding='utf-8') as f:
+            self.assertEqual(f.read(), self._read(plain))
+        rows = list(csv.DictReader(self._read(plain).splitlines()))
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(rows[0]['additional_notes'], "Notes, with a comma")
+
+    def test_attendance_report_counts_zero_for_students_without_attendance(self):
+        student_id = self.db.add_student("New Student", "new@uni.com")
+        path = self.exporter.export_attendance_report(self._path("attendance.csv"))
+
+        rows = {int(row['student_id']): row for row in csv.DictReader(self._read(path).splitlines())}
+        self.assertEqual((rows[student_id]['total_classes'], rows[student_id]['classes_attended'],
+                          rows[student_id]['attendance_rate']), ("0", "0", ""))
+
+    def test_stream_csv_matches_the_file_export(self):
+        plain = self.exporter.export_high_stress_report(3, self._path("high_stress.csv"))
+        chunks = list(self.exporter.stream_csv('high_stress', (3,)))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), self._read(plain))
+
+    @unittest.skipIf(pa is None, "pyarrow not installed")
+    def test_parquet_round_trip(self):
+        path = self.exporter.export_attendance_to_parquet(self._path("attendance_parquet"))
+        self.assertEqual(sorted(os.listdir(path)), ["week_number=1", "week_number=2"])
+
+        frame = self.exporter.import_attendance_from_parquet(path)
+        expected = self.db.get_all_attendance()
+        self.assertEqual(len(frame), len(expected))
+        self.assertEqual(sorted(zip(frame['attendance_id'], frame['status'])),
+                         sorted((row['attendance_id'], row['status']) for row in expected))
+
+        week_two = self.exporter.import_attendance_from_parquet(path, weeks=[2], columns=['student_id', 'week_number'])
+        self.assertEqual(list(week_two.columns), ['student_id', 'week_number'])
+        self.assertEqual(set(week_two['week_number']), {2})
+        self.assertEqual(len(week_two), 5)
+
+    @unittest.skipIf(pa is None, "pyarrow not installed")
+    def test_parquet_export_replaces_partitions_of_the_previous_export(self):
+        path = self.exporter.export_attendance_to_parquet(self._path("attendance_parquet"))
+        for row in self.db.get_all_attendance():
+            if row['week_number'] == 2:
+                self.db.delete_attendance(row['attendance_id'])
+
+        self.assertEqual(self.exporter.export_attendance_to_parquet(path), path)
+        self.assertEqual(os.listdir(path), ["week_number=1"])
+        self.assertEqual(set(self.exporter.import_attendance_from_parquet(path)['week_number']), {1})
+        self.assertEqual([name for name in os.listdir(self.temp_dir.name) if "parquet" in name],
+                         ["attendance_parquet"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Path configuration
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..'))
+src_dir = os.path.join(project_root, 'src')
+for path in (project_root, src_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from database.db_handler import DatabaseHandler
+from services.analytics_service import AnalyticsService
+from services.import_service import ImportService
+
+HEADER = "student_id,student_name,week,attended,assignment_due,submitted,stress_level,hours_slept\n"
+
+class TestImportService(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "import.db")
+        self.db = DatabaseHandler(self.db_path)
+        self.importer = ImportService(self.db_path, chunk_size=2)
+
+    def tearDown(self):
+        self.importer.close()
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def _write_csv(self, name, rows):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(HEADER + "".join(row + "\n" for row in rows))
+        return path
+
+    def test_import_normalises_rows(self):
+        path = self._write_csv("week1.csv", [
+            "S01,Emma Johnson,1,1,10/01/2025,1,3,6.2",
+            "S02,Liam Smith,1,0,10/01/2025,0,4,5.5",
+            "S01,Emma Johnson,2,1,17/01/2025,1,2,6.8",
+        ])
+        report = self.importer.import_csv(path)
+
+        self.assertEqual((report['rows_loaded'], report['rows_rejected']), (3, 0))
+        self.assertEqual(report['students_created'], 2)
+        students = {s['external_id']: s for s in self.db.get_all_students()}
+        emma = students['S01']['student_id']
+        self.assertEqual([a['status'] for a in self.db.get_attendance_by_student(students['S02']['student_id'])],
+                         ['Absent'])
+        surveys = self.db.get_surveys_by_student(emma)
+        self.assertEqual([(s['week_number'], s['stress_level'], s['hours_slept']) for s in surveys],
+                         [(1, 3, 6.2), (2, 2, 6.8)])
+        coursework = self.db.get_coursework_by_student(emma)
+        self.assertEqual({c['submission_date'] for c in coursework}, {'2025-01-10', '2025-01-17'})
+
+    def test_reimport_only_writes_changes(self):
+        rows = ["S01,Emma Johnson,1,1,10/01/2025,1,3,6.2", "S02,Liam Smith,1,0,10/01/2025,0,4,5.5"]
+        self.importer.import_csv(self._write_csv("a.csv", rows))
+
+        # Same file plus a corrected survey and a new week
+        rows[1] = "S02,Liam Smith,1,0,10/01/2025,0,5,4.5"
+        rows.append("S02,Liam Smith,2,1,17/01/2025,1,3,7.0")
+        report = self.importer.import_csv(self._write_csv("b.csv", rows))
+
+        self.assertEqual(report['students_created'], 0)
+        self.assertEqual((report['surveys_updated'], report['surveys_inserted']), (1, 1))
+        self.assertEqual((report['attendance_updated'], report['attendance_inserted']), (0, 1))
+        self.assertEqual(len(self.db.get_all_attendance()), 3)
+
+    def test_partial_reimport_keeps_the_other_survey_fields(self):
+        rows = ["S01,Emma Johnson,1,1,10/01/2025,1,3,6.2"]
+        self.importer.import_csv(self._write_csv("a.csv", rows))
+        emma = self.db.get_all_students()[0]['student_id']
+        self.db.connection.execute("UPDATE wellbeing_surveys SET additional_notes = 'Exam week'")
+        self.db.connection.commit()
+
+        # Only hours_slept is given this time
+        report = self.importer.import_csv(self._write_csv("b.csv", ["S01,Emma Johnson,1,1,10/01/2025,1,,7.5"]))
+
+        self.assertEqual((report['surveys_updated'], report['surveys_inserted']), (1, 0))
+        survey = self.db.get_surveys_by_student(emma)[0]
+        self.assertEqual((survey['stress_level'], survey['hours_slept'], survey['additional_notes']),
+                         (3, 7.5, 'Exam week'))
+
+        # Nothing changes when the given fields already match
+        report = self.importer.import_csv(self._write_csv("c.csv", ["S01,Emma Johnson,1,1,10/01/2025,1,,7.5"]))
+        self.assertEqual(report['surveys_updated'], 0)
+
+    def test_invalid_rows_are_reported_not_loaded(self):
+        rejects_path = os.path.join(self.temp_dir.name, "rejects.csv")
+        path = self._write_csv("bad.csv", [
+            "S01,Emma Johnson,1,1,10/01/2025,1,3,6.2",
+            "S02,Liam Smith,1,1,10/01/2025,1,7,6.0",
+            "S03,Olivia Brown,0,1,10/01/2025,1,3,6.0",
+            "S04,Noah Davis,1,yes,10/01/2025,1,3,6.0",
+            "S05,Ava Wilson,1,1,10/01/2025,1,3,25",
+            ",Nobody,1,1,10/01/2025,1,3,6.0",
+        ])
+        report = self.importer.import_csv(path, rejects_path=rejects_path)
+
+        self.assertEqual((report['rows_loaded'], report['rows_rejected']), (1, 5))
+        self.assertEqual([r['line'] for r in report['rejects']], [3, 4, 5, 6, 7])
+        self.assertIn("stress_level", report['rejects'][0]['reason'])
+        self.assertEqual(len(self.db.get_all_students()), 1)
+        with open(rejects_path, encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 6)
+
+    def test_email_conflicts_reject_only_those_rows(self):
+        self.db.add_student("Existing Student", "taken@university.com")
+        rejects_path = os.path.join(self.temp_dir.name, "rejects.csv")
+        path = os.path.join(self.temp_dir.name, "emails.csv")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("student_id,student_name,email,week,attended\n"
+                    "S01,Emma Johnson,emma@university.com,1,1\n"
+                    "S03,Olivia Brown,emma@university.com,1,0\n"
+                    "S02,Liam Smith,taken@university.com,1,1\n"
+                    "S01,Emma Johnson,emma@university.com,2,1\n")
+        report = self.importer.import_csv(path, rejects_path=rejects_path)
+
+        self.assertEqual((report['rows_loaded'], report['rows_rejected']), (2, 2))
+        self.assertEqual(sorted(r['student_id'] for r in report['rejects']), ['S02', 'S03'])
+        self.assertTrue(all("email" in r['reason'] for r in report['rejects']))
+        students = {s['external_id']: s for s in self.db.get_all_students()}
+        self.assertEqual(set(students), {None, 'S01'})
+        self.assertEqual(len(self.db.get_attendance_by_student(students['S01']['student_id'])), 2)
+        with open(rejects_path, encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 3)
+
+    def test_recorded_on_dates_new_rows(self):
+        path = self._write_csv("a.csv", ["S01,Emma Johnson,1,1,10/01/2025,1,3,6.2"])
+        self.importer.import_csv(path, recorded_on="2024-11-01")
+        conn = self.db.connection
+        self.assertEqual(conn.execute("SELECT date_recorded FROM attendance").fetchone()[0], "2024-11-01")
+        self.assertEqual(conn.execute("SELECT survey_date FROM wellbeing_surveys").fetchone()[0], "2024-11-01")
+        with self.assertRaises(ValueError):
+            self.importer.import_csv(path, recorded_on="01/11/2024")
+
+    def test_missing_required_column(self):
+        path = os.path.join(self.temp_dir.name, "no_week.csv")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("student_id,student_name\nS01,Emma Johnson\n")
+        with self.assertRaises(ValueError):
+            self.importer.import_csv(path)
+
+    def test_import_invalidates_cached_analytics(self):
+        self.importer.import_csv(self._write_csv("a.csv", ["S01,Emma Johnson,1,1,10/01/2025,1,3,6.2"]))
+        student_id = self.db.get_all_students()[0]['student_id']
+        analytics = AnalyticsService(self.db_path)
+        self.assertEqual(len(analytics.get_stress_trends(student_id)), 1)
+        self.importer.import_csv(self._write_csv("b.csv", ["S01,Emma Johnson,2,1,17/01/2025,1,4,5.0"]))
+        self.assertEqual(len(analytics.get_stress_trends(student_id)), 2)
+        analytics.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Path configuration
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..'))
+src_dir = os.path.join(project_root, 'src')
+for path in (project_root, src_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from database.db_handler import DatabaseHandler
+from services.analytics_service import AnalyticsService
+from utils.instrumentation import (InMemorySink, PrometheusSink, instrumented, metrics,
+                                   normalise_sql, render_prometheus)
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "metrics.db")
+        metrics.reset()
+        metrics.enable()
+        self.db = DatabaseHandler(self.db_path)
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def _histogram(self, snapshot, name, **labels):
+        for histogram in snapshot['histograms']:
+            if histogram['name'] == name and all(histogram['labels'].get(k) == v for k, v in labels.items()):
+                return histogram
+        return None
+
+    def test_method_latency_and_rows(self):
+        student_id = self.db.add_student("Alex Johnson", "alex@uni.com")
+        self.db.bulk_record_attendance([(student_id, week, "CS101", "Present") for week in (1, 2, 3)])
+        self.assertEqual(len(self.db.get_attendance_by_student(student_id)), 3)
+
+        snapshot = metrics.snapshot()
+        histogram = self._histogram(snapshot, "method_latency_seconds",
+                                    method="DatabaseHandler.get_attendance_by_student")
+        self.assertEqual(histogram['count'], 1)
+        self.assertEqual(histogram['buckets'][-1][1], 1)
+        rows = [c for c in snapshot['counters'] if c['name'] == "method_rows_returned_total"
+                and c['labels']['method'] == "DatabaseHandler.get_attendance_by_student"]
+        self.assertEqual(rows[0]['value'], 3)
+
+    def test_sql_statements_are_timed(self):
+        self.db.add_student("Alex Johnson", "alex@uni.com")
+        statements = {h['labels']['statement'] for h in metrics.snapshot()['histograms']
+                      if h['name'] == "sql_statement_seconds"}
+        self.assertIn("INSERT INTO students (name, email) VALUES (?)", statements)
+
+    def test_errors_are_counted(self):
+        @instrumented("failing")
+        def failing():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            failing()
+        errors = [c for c in metrics.snapshot()['counters'] if c['name'] == "method_errors_total"]
+        self.assertEqual(errors[0]['labels'], {'method': "failing"})
+
+    def test_disabled_registry_records_nothing(self):
+        metrics.disable()
+        metrics.reset()
+        self.db.add_student("Alex Johnson", "alex@uni.com")
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['histograms'], [])
+        self.assertEqual(snapshot['counters'], [])
+
+    def test_cache_hit_rate_gauge(self):
+        student_id = self.db.add_student("Alex Johnson", "alex@uni.com")
+        analytics = AnalyticsService(self.db_path)
+        analytics.get_stress_trends(student_id)
+        analytics.get_stress_trends(student_id)
+        analytics.close()
+        gauges = {g['name']: g['value'] for g in metrics.snapshot()['gauges']
+                  if g['labels']['database'] == os.path.abspath(self.db_path)}
+        self.assertEqual(gauges['result_cache_hits'], 1)
+        self.assertEqual(gauges['result_cache_hit_rate'], 0.5)
+
+    def test_sinks(self):
+        self.db.add_student("Alex Johnson", "alex@uni.com")
+        memory = InMemorySink()
+        prometheus_path = os.path.join(self.temp_dir.name, "metrics.prom")
+        metrics.sinks[:] = [memory, PrometheusSink(prometheus_path)]
+        try:
+            metrics.flush()
+        finally:
+            metrics.sinks.clear()
+        self.assertIsNotNone(memory.latest)
+        with open(prometheus_path, encoding='utf-8') as f:
+            text = f.read()
+        self.assertIn("# TYPE wellbeing_method_latency_seconds histogram", text)
+        self.assertIn('method="DatabaseHandler.add_student",le="+Inf"} 1', text)
+        self.assertEqual(text, render_prometheus(memory.latest))
+
+    def test_normalise_sql(self):
+        self.assertEqual(normalise_sql("SELECT *\n  FROM t WHERE id IN (?, ?, ?)"),
+                         "SELECT * FROM t WHERE id IN (?)")
+
+if __name__ == '__main__':
+    unittest.main()
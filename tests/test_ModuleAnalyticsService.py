@@ -0,0 +1,87 @@
+import unittest
+import math
+import os
+import sys
+import tempfile
+
+# Path configuration
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..'))
+src_dir = os.path.join(project_root, 'src')
+for path in (project_root, src_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from database.db_handler import DatabaseHandler
+from services.module_analytics_service import ModuleAnalyticsService
+
+class TestModuleAnalyticsService(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "modules.db")
+        self.db = DatabaseHandler(self.db_path)
+        student_ids = [self.db.add_student(f"Student {i}", f"student{i}@uni.com") for i in range(4)]
+        records = []
+        for i, student_id in enumerate(student_ids):
+            # CS101 is fully attended in week 1, half in week 2; MA201 has one absentee each week
+            records += [(student_id, 1, "CS101", "Present"),
+                        (student_id, 2, "CS101", "Present" if i < 2 else "Absent"),
+                        (student_id, 1, "MA201", "Absent" if i == 0 else "Present"),
+                        (student_id, 3, "MA201", "Absent" if i == 0 else "Present")]
+        self.db.bulk_record_attendance(records)
+        # Known module with coursework but no sessions yet
+        self.db.add_coursework(student_ids[0], "PH301", "Lab report", "2025-01-10", "Submitted", 70.0)
+        self.analytics = ModuleAnalyticsService(self.db_path)
+
+    def tearDown(self):
+        self.analytics.close()
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def test_heatmap_covers_every_module_and_week(self):
+        heatmap = self.analytics.attendance_heatmap()
+        self.assertEqual(list(heatmap.index), ["CS101", "MA201", "PH301"])
+        self.assertEqual(list(heatmap.columns), [1, 2, 3])
+        self.assertEqual(heatmap.loc["CS101", 2], 50.0)
+        self.assertEqual(heatmap.loc["MA201", 3], 75.0)
+        self.assertTrue(math.isnan(heatmap.loc["CS101", 3]))
+        self.assertTrue(heatmap.loc["PH301"].isna().all())
+
+        records = self.analytics.attendance_heatmap('records', modules=["MA201"], weeks=(1, 2))
+        self.assertEqual((list(records.index), list(records.columns)), (["MA201"], [1, 2]))
+        self.assertEqual(records.loc["MA201", 1], 4.0)
+        self.assertTrue(math.isnan(records.loc["MA201", 2]))
+
+    def test_module_ranking(self):
+        self.assertTrue(self.analytics.set_module_name("MA201", "Calculus"))
+        ranking = self.analytics.module_ranking()
+        self.assertEqual(list(ranking['module_code']), ["CS101", "MA201", "PH301"])
+        self.assertEqual(list(ranking['attendance_rate'][:2]), [75.0, 75.0])
+        self.assertEqual(list(ranking['rank'][:2]), [1, 1])
+        self.assertEqual(ranking.set_index('module_code').loc["MA201", 'module_name'], "Calculus")
+        self.assertEqual(ranking.set_index('module_code').loc["CS101", 'sessions'], 2)
+
+        first_week = self.analytics.module_ranking(weeks=(1, 1))
+        self.assertEqual(list(first_week['module_code'][:2]), ["CS101", "MA201"])
+        self.assertEqual(list(first_week['attendance_rate'][:2]), [100.0, 75.0])
+
+    def test_worst_sessions(self):
+        worst = self.analytics.worst_sessions(limit=2, min_records=1)
+        self.assertEqual(list(zip(worst['module_code'], worst['week_number'], worst['attendance_rate'])),
+                         [("CS101", 2, 50.0), ("MA201", 1, 75.0)])
+        self.assertTrue(self.analytics.worst_sessions(min_records=5).empty)
+
+    def test_dimensions_follow_new_records(self):
+        student_id = self.db.add_student("Late Joiner", "late@uni.com")
+        self.db.record_attendance(student_id, 9, "EN100", "Present")
+        heatmap = self.analytics.attendance_heatmap()
+        self.assertIn("EN100", heatmap.index)
+        self.assertIn(9, heatmap.columns)
+
+    def test_plot_attendance_heatmap(self):
+        path = self.analytics.plot_attendance_heatmap(os.path.join(self.temp_dir.name, "heatmap.png"))
+        self.assertTrue(os.path.getsize(path) > 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Path Configuration
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# Imports
+from src.models.AttendanceStatus import AttendanceStatus
+from src.models.RecordBatch import MISSING_STATUS, MISSING_STRESS, RecordBatch
+
+class TestRecordBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.batch = RecordBatch.from_rows([
+            (101, 1, 3, 7.5, "Present"),
+            (101, 2, None, None, AttendanceStatus.ABSENT),
+            (202, 1, 5, 6.0, None),
+        ])
+
+    def test_typed_columns(self):
+        # Test compact column storage: 16 bytes per row
+        self.assertEqual(len(self.batch), 3)
+        self.assertEqual(self.batch.nbytes, 3 * 16)
+        self.assertEqual(self.batch.stress_level.dtype, np.int8)
+        self.assertEqual(list(self.batch.stress_level), [3, MISSING_STRESS, 5])
+        self.assertTrue(np.isnan(self.batch.hours_slept[1]))
+        self.assertEqual(self.batch.status[2], MISSING_STATUS)
+        self.assertEqual(list(self.batch.present), [True, False, False])
+
+    def test_views_share_memory(self):
+        # Test zero-copy access for analytics
+        columns = self.batch.columns()
+        self.assertTrue(np.shares_memory(columns['student_id'], self.batch.student_id))
+        with self.assertRaises(ValueError):
+            columns['stress_level'][0] = 1  # read-only view
+
+        self.assertTrue(np.shares_memory(self.batch.slice(1).week_number, self.batch.week_number))
+        frame = self.batch.to_frame()
+        self.assertTrue(np.shares_memory(frame['hours_slept'].to_numpy(), self.batch.hours_slept))
+        self.assertEqual(list(frame['status'][:2]), ["PRESENT", "ABSENT"])
+        self.assertTrue(pd.isna(frame['status'][2]))
+        self.assertTrue(pd.isna(frame['stress_level'][1]))
+
+    def test_round_trip_through_frame(self):
+        batch = RecordBatch.from_frame(self.batch.to_frame())
+        for name, column in self.batch.columns().items():
+            np.testing.assert_array_equal(getattr(batch, name), column)
+        self.assertEqual(list(self.batch.select(self.batch.student_id == 202).student_id), [202])
+
+    def test_column_validation(self):
+        # Test range checks over whole columns
+        with self.assertRaisesRegex(ValueError, r"Stress level must be between 1 and 5, got 6 \(row 1"):
+            RecordBatch([1, 2], [1, 1], stress_level=[3, 6])
+        with self.assertRaisesRegex(ValueError, "Sleep hours must be between 0 and 24"):
+            RecordBatch([1], [1], hours_slept=[25.0])
+        with self.assertRaisesRegex(ValueError, "Invalid status"):
+            RecordBatch([1], [1], status=["SKIPPING"])
+
+        # A value that would wrap around in int8 is rejected, not stored as a valid level
+        with self.assertRaisesRegex(ValueError, "do not fit int8"):
+            RecordBatch([1], [1], stress_level=[259])
+
+        # Known-clean data can skip validation
+        self.assertEqual(len(RecordBatch([1], [1], stress_level=[6], validate=False)), 1)
+
+if __name__ == '__main__':
+    unittest.main()
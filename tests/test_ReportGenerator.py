@@ -0,0 +1,97 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+
+# Path configuration
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..'))
+src_dir = os.path.join(project_root, 'src')
+for path in (project_root, src_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from database.db_handler import DatabaseHandler
+from services.analytics_service import AnalyticsService
+from services.report_generator import format_report
+
+class TestReportGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "reports.db")
+        self.output_dir = os.path.join(self.temp_dir.name, "reports")
+        self.db = DatabaseHandler(self.db_path)
+        self.student_ids = []
+        for i in range(5):
+            student_id = self.db.add_student(f"Student {i}", f"student{i}@uni.com")
+            self.db.add_wellbeing_survey(student_id, 1, 2, 7.5)
+            self.db.add_wellbeing_survey(student_id, 2, 5, 4.0, "Exams")
+            self.db.record_attendance(student_id, 1, "CS101", "Present")
+            self.db.record_attendance(student_id, 2, "CS101", "Absent")
+            self.student_ids.append(student_id)
+        self.analytics = AnalyticsService(self.db_path)
+
+    def tearDown(self):
+        self.analytics.close()
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def test_reports_match_the_single_student_report(self):
+        progress = []
+        result = self.analytics.generate_cohort_reports(
+            self.student_ids, workers=2, output_dir=self.output_dir,
+            progress=lambda done, total: progress.append((done, total)))
+
+        self.assertEqual((result['students'], result['succeeded'], result['files']), (5, 5, 15))
+        self.assertEqual(result['failures'], {})
+        self.assertEqual(progress[-1], (5, 5))
+
+        student_id = self.student_ids[0]
+        with open(os.path.join(self.output_dir, f"student_{student_id}.json"), encoding='utf-8') as f:
+            report = json.load(f)
+        self.assertEqual(report['summary'], self.analytics.get_student_performance_summary(student_id))
+        self.assertEqual(report['high_stress_weeks'], self.analytics.identify_high_stress_weeks(student_id))
+        with open(os.path.join(self.output_dir, f"student_{student_id}.txt"), encoding='utf-8') as f:
+            text = f.read()
+        self.assertIn("Attendance Rate: 50.0%", text)
+        self.assertIn("Week 2: Stress 5/5, Sleep 4.0 hours", text)
+        self.assertTrue(os.path.getsize(os.path.join(self.output_dir, f"student_{student_id}.pdf")) > 0)
+
+    def test_one_failing_student_does_not_stop_the_rest(self):
+        broken = self.student_ids[2]
+        os.makedirs(os.path.join(self.output_dir, f"student_{broken}.txt"))
+
+        result = self.analytics.generate_cohort_reports(self.student_ids, workers=1, output_dir=self.output_dir,
+                                                        formats=['txt'])
+        self.assertEqual(list(result['failures']), [broken])
+        self.assertEqual(result['succeeded'], 4)
+
+    def test_console_report_is_the_report_text(self):
+        student_id = self.student_ids[0]
+        output = StringIO()
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)  # the plots are saved to the working directory
+        try:
+            with redirect_stdout(output):
+                self.analytics.generate_wellbeing_report(student_id, show_plots=False)
+        finally:
+            os.chdir(cwd)
+        summary = self.analytics.get_student_performance_summary(student_id)
+        high_stress = self.analytics.identify_high_stress_weeks(student_id)
+        self.assertEqual(output.getvalue(), "\n" + format_report(student_id, summary, high_stress))
+
+        # PDF summary pages use the text without the console emoji
+        plain = format_report(student_id, summary, high_stress, emoji=False)
+        self.assertTrue(plain.isascii())
+        self.assertIn("High Stress Weeks (1):", plain)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            self.analytics.generate_cohort_reports(self.student_ids, output_dir=self.output_dir, formats=['docx'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import os
+import sys
+import time
+
+# Path configuration
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..'))
+src_dir = os.path.join(project_root, 'src')
+for path in (project_root, src_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from database.result_cache import ResultCache
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResultCache(max_size=3, ttl=60)
+
+    def test_hit_and_miss_counters(self):
+        self.assertIsNone(self.cache.get(("trends", 1, ())))
+        self.cache.set(("trends", 1, ()), [{"week_number": 1}])
+        self.assertEqual(self.cache.get(("trends", 1, ())), [{"week_number": 1}])
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_returned_values_are_copies(self):
+        self.cache.set(("trends", 1, ()), [{"week_number": 1}])
+        self.cache.get(("trends", 1, ())).append("mutated")
+        self.assertEqual(self.cache.get(("trends", 1, ())), [{"week_number": 1}])
+
+    def test_lru_eviction(self):
+        for student_id in (1, 2, 3):
+            self.cache.set(("summary", student_id, ()), student_id)
+        self.cache.get(("summary", 1, ()))  # 2 is now least recently used
+        self.cache.set(("summary", 4, ()), 4)
+        self.assertIsNone(self.cache.get(("summary", 2, ())))
+        self.assertEqual(self.cache.get(("summary", 1, ())), 1)
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_ttl_expiry(self):
+        cache = ResultCache(ttl=0.01)
+        cache.set(("summary", 1, ()), 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get(("summary", 1, ())))
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_invalidate_student_only_drops_that_student_and_cohort_entries(self):
+        self.cache.set(("summary", 1, ()), "one")
+        self.cache.set(("summary", 2, ()), "two")
+        self.cache.set(("cohort", None, ()), "all")
+        self.assertEqual(self.cache.invalidate_student(1), 2)
+        self.assertIsNone(self.cache.get(("summary", 1, ())))
+        self.assertIsNone(self.cache.get(("cohort", None, ())))
+        self.assertEqual(self.cache.get(("summary", 2, ())), "two")
+
+    def test_invalidate_single_key_keeps_cohort_entries(self):
+        self.cache.set(("login", "alice", ()), "alice")
+        self.cache.set(("cohort", None, ()), "all")
+        self.assertTrue(self.cache.invalidate(("login", "alice", ())))
+        self.assertFalse(self.cache.invalidate(("login", "alice", ())))
+        self.assertIsNone(self.cache.get(("login", "alice", ())))
+        self.assertEqual(self.cache.get(("cohort", None, ())), "all")
+
+    def test_set_skips_values_computed_before_an_invalidation(self):
+        before = self.cache.generation(1)
+        cohort_before = self.cache.generation(None)
+        other_before = self.cache.generation(2)
+        self.cache.invalidate_student(1)  # A write lands while the values are computed
+        self.cache.set(("summary", 1, ()), "stale", before)
+        self.cache.set(("cohort", None, ()), "stale", cohort_before)
+        self.cache.set(("summary", 2, ()), "two", other_before)
+        self.assertIsNone(self.cache.get(("summary", 1, ())))
+        self.assertIsNone(self.cache.get(("cohort", None, ())))
+        self.assertEqual(self.cache.get(("summary", 2, ())), "two")
+
+        before = self.cache.generation(2)
+        self.cache.clear()
+        self.cache.set(("summary", 2, ()), "stale", before)
+        self.assertIsNone(self.cache.get(("summary", 2, ())))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+# Path configuration
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..'))
+src_dir = os.path.join(project_root, 'src')
+for path in (project_root, src_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from database.db_handler import DatabaseHandler
+from models.AlertType import AlertType
+from services.risk_service import RiskService, evaluate_risk
+
+def _rules(findings):
+    return {(row.student_id, row.rule) for row in findings.itertuples()}
+
+class TestEvaluateRisk(unittest.TestCase):
+
+    def _evaluate(self, attendance=(), surveys=(), coursework=()):
+        return evaluate_risk(
+            pd.DataFrame(list(attendance), columns=['student_id', 'status']),
+            pd.DataFrame(list(surveys), columns=['student_id', 'week_number', 'stress_level', 'hours_slept'],
+                         dtype=float).astype({'student_id': int}),
+            pd.DataFrame(list(coursework), columns=['student_id', 'grade'], dtype=float).astype({'student_id': int}),
+        )
+
+    def test_only_trailing_absences_count(self):
+        findings = self._evaluate(attendance=[
+            (1, 'Absent'), (1, 'Absent'), (1, 'Absent'), (1, 'Present'),   # recovered
+            (2, 'Present'), (2, 'Absent'), (2, 'Absent'), (2, 'Absent'),   # current streak
+        ])
+        self.assertEqual(_rules(findings), {(2, 'absence_streak')})
+        self.assertEqual(findings.iloc[0]['reason'], "Missed 3 classes in a row")
+
+    def test_stress_and_sleep_trends(self):
+        findings = self._evaluate(surveys=[
+            (1, 1, 3, 8.0), (1, 2, 4, 7.0), (1, 3, 5, 6.0), (1, 4, 5, 5.0),
+            (2, 1, 2, 7.0), (2, 2, 2, 7.0), (2, 3, 2, 7.0),
+        ])
+        self.assertEqual(_rules(findings),
+                         {(1, 'high_stress'), (1, 'rising_stress'), (1, 'falling_sleep')})
+
+    def test_grade_rules(self):
+        findings = self._evaluate(coursework=[
+            (1, 80.0), (1, 78.0), (1, 55.0),   # drop of 24 points
+            (2, 35.0), (2, 38.0),              # consistently failing
+        ])
+        self.assertEqual(_rules(findings), {(1, 'grade_drop'), (2, 'low_grade')})
+
+class TestRiskService(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "risk.db")
+        self.db = DatabaseHandler(self.db_path)
+        self.risk = RiskService(self.db_path)
+        self.student_id = self.db.add_student("Alex Johnson", "alex@uni.com")
+        self.other_id = self.db.add_student("Sam Lee", "sam@uni.com")
+
+    def tearDown(self):
+        self.risk.close()
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def test_run_persists_alerts(self):
+        for week in (1, 2, 3):
+            self.db.record_attendance(self.student_id, week, "CS101", "Absent")
+        stats = self.risk.run()
+
+        # Only students whose records changed are queued
+        self.assertEqual(stats['students_evaluated'], 1)
+        self.assertEqual(stats['alerts_raised'], 1)
+        alerts = self.risk.get_open_alerts(self.student_id)
+        self.assertEqual(len(alerts), 1)
+        self.assertEqual(alerts[0].alert_type, AlertType.ATTENDANCE)
+        self.assertFalse(alerts[0].resolved)
+
+    def test_incremental_runs_only_reevaluate_changed_students(self):
+        self.risk.run()
+        self.assertEqual(self.risk.pending_count(), 0)
+        self.assertEqual(self.risk.run()['students_evaluated'], 0)
+
+        self.db.record_attendance(self.other_id, 1, "CS101", "Present")
+        self.assertEqual(self.risk.pending_count(), 1)
+        self.assertEqual(self.risk.run()['students_evaluated'], 1)
+        self.assertEqual(self.risk.run(full=True)['students_evaluated'], 2)
+
+    def test_alerts_resolve_when_rule_no_longer_applies(self):
+        for week in (1, 2, 3):
+            self.db.record_attendance(self.student_id, week, "CS101", "Absent")
+        self.risk.run()
+        self.risk.run()  # no duplicate alert for the same rule
+        self.assertEqual(len(self.risk.get_open_alerts(self.student_id)), 1)
+
+        self.db.record_attendance(self.student_id, 4, "CS101", "Present")
+        stats = self.risk.run()
+        self.assertEqual(stats['alerts_resolved'], 1)
+        self.assertEqual(self.risk.get_open_alerts(self.student_id), [])
+
+    def test_resolve_alert(self):
+        for week in (1, 2, 3):
+            self.db.record_attendance(self.student_id, week, "CS101", "Absent")
+        self.risk.run()
+        alert = self.risk.get_open_alerts(alert_type=AlertType.ATTENDANCE)[0]
+        self.assertTrue(self.risk.resolve_alert(alert.alert_id))
+        self.assertFalse(self.risk.resolve_alert(alert.alert_id))
+        self.assertEqual(self.risk.get_open_alerts(), [])
+
+    def test_deleting_student_removes_alerts(self):
+        for week in (1, 2, 3):
+            self.db.record_attendance(self.student_id, week, "CS101", "Absent")
+        self.risk.run()
+        self.db.delete_student(self.student_id)
+        self.assertEqual(self.risk.get_open_alerts(), [])
+        self.assertEqual(self.risk.pending_count(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
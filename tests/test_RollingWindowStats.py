@@ -0,0 +1,108 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Path configuration
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..'))
+src_dir = os.path.join(project_root, 'src')
+for path in (project_root, src_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from database.db_handler import DatabaseHandler
+from database.listeners import get_listeners
+from services.rolling_stats import RollingWindowStats
+
+class TestRollingWindowStats(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "rolling.db")
+        self.db = DatabaseHandler(self.db_path)
+        self.stats = RollingWindowStats(self.db_path, window_weeks=2)
+        self.student_id = self.db.add_student("Alex Johnson", "alex@uni.com")
+
+    def tearDown(self):
+        self.stats.close()
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def _add_weeks(self, weeks, student_id=None):
+        student_id = student_id or self.student_id
+        for week, stress, sleep, status in weeks:
+            self.db.add_wellbeing_survey(student_id, week, stress, sleep)
+            self.db.record_attendance(student_id, week, "CS101", status)
+
+    def _assert_matches_fresh_load(self, student_id=None):
+        fresh = RollingWindowStats(self.db_path, window_weeks=2)
+        try:
+            self.assertEqual(self.stats.get_window(student_id or self.student_id),
+                             fresh.get_window(student_id or self.student_id))
+        finally:
+            fresh.close()
+
+    def test_window_loaded_from_history(self):
+        self._add_weeks([(1, 1, 9.0, 'Present'), (2, 2, 8.0, 'Present'),
+                         (3, 3, 7.0, 'Absent'), (4, 5, 5.0, 'Present')])
+        window = self.stats.get_window(self.student_id)
+
+        self.assertEqual(window['latest_week'], 4)
+        self.assertEqual(window['current'], {'stress': 4.0, 'sleep': 6.0, 'attendance': 50.0})
+        self.assertEqual(window['previous'], {'stress': 1.5, 'sleep': 8.5, 'attendance': 100.0})
+        self.assertEqual(window['delta'], {'stress': 2.5, 'sleep': -2.5, 'attendance': -50.0})
+        self.assertEqual(window['week_over_week'], {'stress': 2.0, 'sleep': -2.0, 'attendance': 100.0})
+
+    def test_new_records_slide_the_loaded_window(self):
+        self._add_weeks([(1, 1, 9.0, 'Present'), (2, 2, 8.0, 'Present')])
+        self.assertEqual(self.stats.moving_average(self.student_id, 'stress'), 1.5)
+
+        self._add_weeks([(3, 3, 7.0, 'Absent'), (4, 5, 5.0, 'Present'), (5, 4, 6.0, 'Present')])
+        self.assertEqual(self.stats.moving_average(self.student_id, 'stress'), 4.5)
+        self.assertEqual(self.stats.delta(self.student_id, 'stress'), 2.0)
+        self.assertEqual(self.stats.week_over_week(self.student_id, 'sleep'), 1.0)
+        self._assert_matches_fresh_load()
+
+        # A late record for an old week only lands in the window it belongs to
+        self.db.add_wellbeing_survey(self.student_id, 3, 5, 7.0)
+        self.assertEqual(self.stats.get_window(self.student_id)['previous']['stress'], 3.33)
+        self._assert_matches_fresh_load()
+
+    def test_bulk_loads_and_deletes_are_seen(self):
+        other_id = self.db.add_student("Sam Lee", "sam@uni.com")
+        self.assertEqual(self.stats.warm(), 2)
+        self.assertIsNone(self.stats.moving_average(other_id, 'attendance'))
+
+        self.db.bulk_record_attendance([(other_id, 1, "CS101", "Present"), (other_id, 2, "CS101", "Absent")])
+        self.assertEqual(self.stats.moving_average(other_id, 'attendance'), 50.0)
+
+        attendance_id = self.db.get_attendance_by_student(other_id)[1]['attendance_id']
+        self.db.update_attendance(attendance_id, 'Present')
+        self.assertEqual(self.stats.moving_average(other_id, 'attendance'), 100.0)
+        self._assert_matches_fresh_load(other_id)
+
+    def test_load_between_commit_and_announcement_counts_record_once(self):
+        self._add_weeks([(1, 2, 8.0, 'Present')])
+        listeners = get_listeners(self.db_path)
+        self.db.connection.execute(
+            "INSERT INTO wellbeing_surveys (student_id, week_number, stress_level, hours_slept) VALUES (?, 1, 4, 6.0)",
+            (self.student_id,))
+        sequence = listeners.commit(self.db.connection)
+
+        # Another thread loads the student before the writer announces the survey
+        self.assertEqual(self.stats.warm([self.student_id]), 1)
+        listeners.surveys_added([(self.student_id, 1, 4, 6.0)], sequence)
+
+        self.assertEqual(self.stats.moving_average(self.student_id, 'stress'), 3.0)
+        self._assert_matches_fresh_load()
+
+        self.db.add_wellbeing_survey(self.student_id, 1, 5, 5.0)
+        self.assertEqual(self.stats.moving_average(self.student_id, 'stress'), 3.67)
+
+    def test_unknown_metric(self):
+        with self.assertRaises(ValueError):
+            self.stats.moving_average(self.student_id, 'grade')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+# Path configuration
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..'))
+src_dir = os.path.join(project_root, 'src')
+for path in (project_root, src_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from services.session_store import SessionStore
+
+def _user(user_id, role='officer'):
+    return {'user_id': user_id, 'username': f"user{user_id}", 'role': role, 'full_name': f"User {user_id}"}
+
+class TestSessionStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = SessionStore(secret=b"test-secret", ttl=60, max_sessions=3)
+
+    def test_tokens_are_signed(self):
+        token = self.store.create(_user(1))
+        self.assertEqual(self.store.validate(token).user['username'], "user1")
+
+        session_id, signature = token.split(".")
+        self.assertIsNone(self.store.validate(f"{session_id}.{signature[:-1]}x"))
+        self.assertIsNone(self.store.validate(session_id))
+        self.assertIsNone(SessionStore(secret=b"other").validate(token))
+
+    def test_sessions_expire(self):
+        token = self.store.create(_user(1))
+        with mock.patch("services.session_store.time.time", return_value=time.time() + 61):
+            self.assertIsNone(self.store.validate(token))
+        self.assertEqual(len(self.store), 0)
+
+    def test_oldest_sessions_are_evicted_beyond_capacity(self):
+        tokens = [self.store.create(_user(i)) for i in range(5)]
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(self.store.evictions, 2)
+        self.assertIsNone(self.store.validate(tokens[0]))
+        self.assertIsNotNone(self.store.validate(tokens[4]))
+
+    def test_revoke(self):
+        first, second = self.store.create(_user(1)), self.store.create(_user(1))
+        other = self.store.create(_user(2))
+        self.assertTrue(self.store.revoke(first))
+        self.assertFalse(self.store.revoke(first))
+        self.assertEqual(self.store.revoke_user(1), 1)
+        self.assertIsNone(self.store.validate(second))
+        self.assertIsNotNone(self.store.validate(other))
+
+    def test_persisted_sessions_survive_a_restart(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "sessions.db")
+            store = SessionStore(secret=b"shared", db_path=db_path)
+            token = store.create(_user(7, 'admin'))
+            revoked = store.create(_user(8))
+            store.revoke(revoked)
+            store.close()
+
+            restarted = SessionStore(secret=b"shared", db_path=db_path)
+            self.assertEqual(restarted.validate(token).role, 'admin')
+            self.assertIsNone(restarted.validate(revoked))
+            restarted.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,6 +29,12 @@ class TestWellbeingRecord(unittest.TestCase):
         self.assertEqual(self.record.sleep_hours, 7.5)
         self.assertEqual(self.record.week_start, date(2025, 12, 1))
 
+    def test_slots(self):
+        # Test records carry no per-instance __dict__
+        self.assertFalse(hasattr(self.record, '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.record.notes = "not a field"
+
     def test_default_values(self):
         # Test default parameters
         # We didn't pass source_type in setUp, it should default to "survey".